@@ -0,0 +1,134 @@
+"""FuzzyMatcher.search() must rank exactly like scoring every path."""
+import random
+import threading
+
+import pytest
+
+from zenpad import fuzzy
+
+WORDS = ("src lib test core util quick open dialog window editor analysis session "
+         "file index main config render widget model view parser token buffer cache").split()
+EXTS = (".py", ".js", ".c", ".h", ".md", ".json", ".rs")
+
+
+def _corpus(n, seed=7):
+    rng = random.Random(seed)
+
+    def name():
+        parts = [rng.choice(WORDS) for _ in range(rng.randint(1, 3))]
+        style = rng.random()
+        if style < 0.3:
+            return "".join(p.capitalize() for p in parts)
+        return ("_" if style < 0.6 else "-").join(parts)
+
+    paths = {"WindowEditor.rs", "src/ui/Window/Editor.rs", "quick/open/QuickOpenDialog.py"}
+    while len(paths) < n:
+        paths.add("/".join(name() for _ in range(rng.randint(1, 5))) + rng.choice(EXTS))
+    return sorted(paths)
+
+
+def _exhaustive(paths, query, limit, boosts=None):
+    query = "".join(query.lower().split())
+    scored = []
+    for i, path in enumerate(paths):
+        match = fuzzy.score_path(query, path)
+        if match:
+            bonus = (boosts or {}).get(path, 0)
+            scored.append(((match.score + bonus, -len(path), -i), match._replace(score=match.score + bonus)))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [match for _, match in scored[:limit]]
+
+
+QUERIES = ("q", "wi", "winedit", "quickopendialog", "src/json", "edtr", "cfg", "m", "tokbuf", "xyz")
+
+
+@pytest.fixture(scope="module")
+def paths():
+    return _corpus(5000)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_exhaustive_ranking(paths, query):
+    matcher = fuzzy.FuzzyMatcher(paths, pool_size=50)
+    for limit in (1, 10, 30):
+        assert matcher.search(query, limit) == _exhaustive(paths, query, limit)
+
+
+def test_incremental_typing_and_growing_index(paths):
+    matcher = fuzzy.FuzzyMatcher(paths[:3000], pool_size=50)
+    for i in range(1, len("winedit") + 1):
+        assert matcher.search("winedit"[:i]) == _exhaustive(paths[:3000], "winedit"[:i], 30)
+    matcher.add_paths(paths[3000:])
+    assert matcher.search("winedit") == _exhaustive(paths, "winedit", 30)
+    assert any(m.path == "WindowEditor.rs" for m in matcher.search("winedit", 5))
+
+
+def test_frecency_boosts(paths):
+    rng = random.Random(3)
+    scores = {path: rng.uniform(0.5, 50) for path in rng.sample(paths, 200)}
+    matcher = fuzzy.FuzzyMatcher(paths, pool_size=50)
+    matcher.set_boosts(scores)
+    boosts = {p: int(fuzzy.BONUS_FRECENCY * fuzzy.math.log2(1 + s)) for p, s in scores.items()}
+    for query in QUERIES:
+        assert matcher.search(query) == _exhaustive(paths, query, 30, boosts)
+
+
+def test_non_ascii_paths():
+    paths = ["docs/Ünïcode/Straße.md", "docs/unicode/strasse.md", "ÄÖÜ/ÉditeurFenêtre.py", "src/éditeur.py"]
+    matcher = fuzzy.FuzzyMatcher(paths, pool_size=0)
+    for query in ("str", "édit", "ü", "docs"):
+        assert matcher.search(query) == _exhaustive(paths, query, 30)
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _CancelledTask:
+    def check_cancelled(self):
+        raise _Cancelled()
+
+
+def test_search_polls_task(paths):
+    matcher = fuzzy.FuzzyMatcher(paths, pool_size=50)
+    with pytest.raises(_Cancelled):
+        matcher.search("winedit", task=_CancelledTask())
+
+
+def test_search_while_paths_are_added(paths):
+    matcher = fuzzy.FuzzyMatcher(paths[:1000], pool_size=50)
+    done = threading.Event()
+
+    def add():
+        for start in range(1000, len(paths), 500):
+            matcher.add_paths(paths[start:start + 500])
+            matcher.prewarm()
+        done.set()
+
+    thread = threading.Thread(target=add)
+    thread.start()
+    while not done.is_set():
+        size = len(matcher)
+        results = matcher.search("edit")
+        assert all(paths.index(m.path) < len(matcher) for m in results)
+        assert len(results) <= 30 and size <= len(matcher)
+    thread.join()
+    assert matcher.search("edit") == _exhaustive(paths, "edit", 30)
+
+
+def test_removed_paths(paths):
+    matcher = fuzzy.FuzzyMatcher(paths, pool_size=50)
+    matcher.search("winedit")
+    rng = random.Random(11)
+    gone = set(rng.sample(paths, 2000)) | {"WindowEditor.rs"}
+    matcher.remove_paths(gone)
+    kept = [p for p in paths if p not in gone]
+    assert len(matcher) == len(kept) and matcher.removed == len(gone)
+    for query in QUERIES:
+        assert [m.path for m in matcher.search(query)] == [m.path for m in _exhaustive(kept, query, 30)]
+    assert all(m.path not in gone for m in matcher.search(""))
+    matcher.add_paths(["WindowEditor.rs"])
+    assert matcher.search("winedit", 1)[0].path == "WindowEditor.rs"
+    compacted = matcher.compacted()
+    assert compacted.removed == 0 and len(compacted) == len(kept) + 1
+    assert [m.path for m in compacted.search("winedit")] == [m.path for m in matcher.search("winedit")]
@@ -0,0 +1,19 @@
+"""Ignore patterns git cannot parse are skipped, not fatal."""
+import pytest
+
+from zenpad.ignore import IgnoreLevel
+
+
+@pytest.mark.parametrize("patterns, path, ignored", [
+    (["[z-a]"], "z", None),
+    (["[z-a]", "*.log"], "x.log", True),
+    (["a[]b"], "a[]b", True),
+    (["a[]]b"], "a]b", True),
+    (["f[\\]]o"], "f]o", True),
+    (["f[\\-x]o"], "f-o", True),
+    (["f[!a]o"], "fbo", True),
+    (["f[!a]o"], "f/o", None),
+    (["x[a"], "x[a", True),
+])
+def test_bracket_expressions(patterns, path, ignored):
+    assert IgnoreLevel("", patterns).match(path) is ignored
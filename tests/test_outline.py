@@ -0,0 +1,50 @@
+"""OutlineIndex.items() on complete and unfinished JSON documents."""
+import json
+import random
+
+import pytest
+
+from zenpad import outline
+
+
+def _document(rng, depth=0):
+    kind = rng.random()
+    if depth > 3 or kind < 0.3:
+        return rng.choice([1, -2.5, "text", "a]b}", True, None])
+    if kind < 0.65:
+        return [_document(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {f"k{i}": _document(rng, depth + 1) for i in range(rng.randint(0, 4))}
+
+
+def _expand(index, text, node=-1):
+    """Every row of the tree, expanding all containers."""
+    rows = list(index.items(text, node))
+    assert [row.node for row in rows if row.node >= 0] == list(index.children(node))
+    for row in rows:
+        if row.node >= 0:
+            rows.extend(_expand(index, text, row.node))
+    return rows
+
+
+@pytest.mark.parametrize("text", ['[[1,', '{"a": {"b": 1', '[{}, [1', '[1, [2]', '{"a": 1'])
+def test_unfinished_documents(text):
+    _expand(outline.build(text, "json"), text)
+
+
+def test_unfinished_scalar_is_listed():
+    text = '{"a": {"b": 1}, "c": 42'
+    index = outline.build(text, "json")
+    assert [(row.label, row.value) for row in index.items(text, 0)] == [("a", ""), ("c", "42")]
+
+
+def test_every_prefix_of_random_documents():
+    rng = random.Random(5)
+    for _ in range(100):
+        text = json.dumps(_document(rng))
+        index = outline.build(text, "json")
+        rows = list(index.items(text, 0)) if len(index) else []
+        value = json.loads(text)
+        if isinstance(value, (list, dict)):
+            assert len(rows) == len(value)
+        for cut in range(1, len(text)):
+            _expand(outline.build(text[:cut], "json"), text[:cut])
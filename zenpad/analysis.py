@@ -1,604 +1,1696 @@
-import json
-import xml.dom.minidom
-import binascii
-import re
-import csv
-import io
-import datetime
-import dataclasses
-from typing import List, Dict, Optional, Any, Tuple
-
-# --- Smart Log Engine (Phase 1) ---
-
-@dataclasses.dataclass
-class LogEntry:
-    """ECS-compatible log event structure for SOC tools (Splunk/ELK/Wazuh)"""
-    timestamp: str = ""         # @timestamp (ISO 8601)
-    timestamp_raw: str = ""     # Original timestamp string
-    source_type: str = ""       # Profile name (syslog, access, kernel, etc.)
-    level: str = ""             # log.level
-    message: str = ""           # Main content
-    raw_log: str = ""           # Original line(s) preserved
-    host: str = ""              # host.name
-    program: str = ""           # process.name / app
-    pid: str = ""               # process.pid
-    # Additional fields for specific log types
-    extra: Dict[str, Any] = dataclasses.field(default_factory=dict)
-
-    def to_ecs_dict(self) -> Dict[str, Any]:
-        """Output flat ECS-compatible dict (only non-empty fields, raw_log last)"""
-        result = {}
-        # Core fields first
-        if self.timestamp:
-            result["@timestamp"] = self.timestamp
-        if self.timestamp_raw:
-            result["timestamp_raw"] = self.timestamp_raw
-        if self.source_type:
-            result["source_type"] = self.source_type
-        if self.level:
-            result["level"] = self.level
-        if self.host:
-            result["host"] = self.host
-        if self.program:
-            result["program"] = self.program
-        if self.pid:
-            result["pid"] = self.pid
-        if self.message:
-            result["message"] = self.message
-        # Extra fields (ip, status, bytes, etc.)
-        result.update(self.extra)
-        # raw_log always last
-        if self.raw_log:
-            result["raw_log"] = self.raw_log
-        return result
-
-@dataclasses.dataclass
-class LogProfile:
-    name: str
-    regex: re.Pattern
-    date_fmt: Optional[str] = None
-    level_map: Optional[Dict[str, str]] = None
-
-    def normalize_level(self, raw_lvl: str) -> str:
-        if not self.level_map:
-            return raw_lvl.upper()
-        return self.level_map.get(raw_lvl.upper(), raw_lvl.upper())
-
-    def parse_date(self, raw_date: str) -> Tuple[str, bool]:
-        """Returns (normalized_date, success)"""
-        # Strategy:
-        # 1. Try profile's specific format
-        # 2. Try common formats (ISO, simple)
-        # 3. Fail
-        
-        candidates = []
-        if self.date_fmt:
-            candidates.append(self.date_fmt)
-        
-        # Common fallbacks
-        candidates.extend([
-            "%Y-%m-%d %H:%M:%S,%f",
-            "%Y-%m-%d %H:%M:%S",
-            "%d/%b/%Y:%H:%M:%S %z", # Common Log Format
-            "%Y-%m-%dT%H:%M:%S.%fZ",
-            "%Y-%m-%dT%H:%M:%SZ"
-        ])
-
-        for fmt in candidates:
-            try:
-                dt = datetime.datetime.strptime(raw_date, fmt)
-                return dt.isoformat(), True
-            except ValueError:
-                continue
-        
-        return raw_date, False
-
-# --- Profiles Registry ---
-
-LOG_PROFILES = [
-    # 1. Java / Spring Standard
-    # Example: [2010-04-24 07:51:54,393] INFO - [main] Message...
-    LogProfile(
-        name="Java Application Log",
-        regex=re.compile(r'^\[(?P<ts>.*?)\]\s+(?P<lvl>\w+)\s+-\s+\[(?P<thread>.*?)\]\s+(?P<msg>.*)'),
-        date_fmt="%Y-%m-%d %H:%M:%S,%f",
-        level_map={"INF": "INFO", "ERR": "ERROR", "WRN": "WARN", "DBG": "DEBUG"}
-    ),
-
-    # 2. Web Access Log (Combined)
-    # Example: 127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET /index.html" 200 2326
-    LogProfile(
-        name="Web Access Log",
-        regex=re.compile(r'^(?P<ip>\S+)\s\S+\s\S+\s\[(?P<ts>.*?)\]\s"(?P<req>.*?)"\s(?P<status>\d{3})\s(?P<bytes>\S+).*'),
-        date_fmt="%d/%b/%Y:%H:%M:%S %z"
-    ),
-
-    # 3. Simple Syslog / Message
-    # Example: 2023-10-27 10:00:00 INFO Some message
-    LogProfile(
-        name="Simple Timestamp Log",
-        regex=re.compile(r'^(?P<ts>\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}(?:,\d{3})?)\s+(?P<lvl>\w+)\s+(?P<msg>.*)'),
-        date_fmt="%Y-%m-%d %H:%M:%S"
-    ),
-
-    # 4. Standard Linux Syslog (RFC 3164)
-    # Example: Oct 11 22:14:15 myhost sshd[1234]: Failed password...
-    LogProfile(
-        name="Linux Syslog (Standard)",
-        regex=re.compile(r'^(?P<ts>[A-Z][a-z]{2}\s+\d{1,2}\s\d{2}:\d{2}:\d{2})\s+(?P<host>\S+)\s+(?P<app>[\w\-\.]+)(?:\[(?P<pid>\d+)\])?:\s+(?P<msg>.*)'),
-        # RFC 3164 does not have year. We leave it raw for now.
-        date_fmt=None 
-    ),
-
-    # 5. Linux Kernel Ring Buffer (dmesg)
-    # Example: [    0.000000] Linux version...
-    LogProfile(
-        name="Linux Kernel Log",
-        regex=re.compile(r'^\[\s*(?P<ts_rel>\d+\.\d+)\]\s+(?P<msg>.*)'),
-        # Relative timestamp, no absolute date format
-        date_fmt=None
-    ),
-
-    # 6. Nginx Error Log
-    # Example: 2023/10/27 10:00:00 [error] 1234#0: *1 connection timed out...
-    LogProfile(
-        name="Nginx Error Log",
-        regex=re.compile(r'^(?P<ts>\d{4}/\d{2}/\d{2}\s\d{2}:\d{2}:\d{2})\s\[(?P<lvl>\w+)\]\s(?P<pid>\d+)#(?P<tid>\d+):\s(?P<msg>.*)'),
-        date_fmt="%Y/%m/%d %H:%M:%S"
-    ),
-
-    # 7. Apache Error Log
-    # Example: [Fri Oct 27 10:00:00.123456 2023] [core:error] [pid 1234] ...
-    LogProfile(
-        name="Apache Error Log",
-        regex=re.compile(r'^\[(?P<ts>.*?)\]\s\[(?P<module>.*?):(?P<lvl>\w+)\]\s\[pid\s(?P<pid>\d+)\]\s(?P<msg>.*)'),
-        # Complex Apache timestamp, letting it fall back to generic parser or raw
-        date_fmt=None
-    )
-]
-
-GENERIC_PROFILE = LogProfile(name="Generic Log (Fallback)", regex=re.compile(r'^(?P<msg>.*)'))
-
-def parse_log(text: str) -> List[Dict[str, Any]]:
-    """
-    Smart Log Engine (Phase 3 - SOC Compatible).
-    Returns a flat array of ECS-compatible events.
-    Output format matches Splunk/ELK/Wazuh expectations.
-    
-    Note: JSON detection is handled by the caller (window.py) to allow user override.
-    """
-    if not text:
-        return []
-
-    lines = text.splitlines()
-    
-    # 2. Detect Best Profile
-    sample_lines = [l for l in lines[:50] if l.strip()]
-    best_profile = GENERIC_PROFILE
-    best_score = 0.0
-
-    if sample_lines:
-        for profile in LOG_PROFILES:
-            matches = sum(1 for line in sample_lines if profile.regex.match(line.strip()))
-            score = matches / len(sample_lines)
-            if score > best_score:
-                best_score = score
-                best_profile = profile
-    
-    # Fall back to Generic if no good match
-    if best_score < 0.4:
-        best_profile = GENERIC_PROFILE
-
-    # 3. Parse Lines
-    events = []
-    current_entry: Optional[LogEntry] = None
-    
-    for line in lines:
-        raw_line = line.rstrip('\r\n')
-        clean_line = line.strip()
-        
-        if not clean_line:
-            # Preserve empty lines in multiline context
-            if current_entry:
-                current_entry.raw_log += "\n"
-                current_entry.message += "\n"
-            continue
-        
-        # Generic Profile: One event per line, no parsing
-        if best_profile == GENERIC_PROFILE:
-            events.append(LogEntry(
-                source_type="plain",
-                message=raw_line,
-                raw_log=raw_line
-            ).to_ecs_dict())
-            continue
-        
-        # Try to match structured profile
-        match = best_profile.regex.match(clean_line)
-        
-        if match:
-            # Flush previous entry
-            if current_entry:
-                events.append(current_entry.to_ecs_dict())
-            
-            groups = match.groupdict()
-            
-            # Extract timestamp
-            raw_ts = groups.get("ts", "") or groups.get("ts_rel", "")
-            norm_ts, _ = best_profile.parse_date(raw_ts) if raw_ts else (raw_ts, False)
-            
-            # Extract level
-            level = best_profile.normalize_level(groups.get("lvl", ""))
-            
-            # Extract message
-            msg = groups.get("msg", "")
-            # Special handling for web access logs
-            if "req" in groups:
-                msg = f"{groups.get('req', '')} [{groups.get('status', '')}]"
-            
-            # Extract host/program/pid (ECS fields)
-            host = groups.get("host", "")
-            program = groups.get("app", "") or groups.get("module", "")
-            pid = groups.get("pid", "")
-            
-            # Collect extra fields (ip, thread, etc.)
-            extra = {}
-            for k, v in groups.items():
-                if k not in ["ts", "ts_rel", "lvl", "msg", "req", "host", "app", "module", "pid"] and v:
-                    extra[k] = v
-            
-            # Map profile to source_type
-            source_type_map = {
-                "Java Application Log": "java",
-                "Web Access Log": "access",
-                "Simple Timestamp Log": "simple",
-                "Linux Syslog (Standard)": "syslog",
-                "Linux Kernel Log": "kernel",
-                "Nginx Error Log": "nginx",
-                "Apache Error Log": "apache"
-            }
-            source_type = source_type_map.get(best_profile.name, "unknown")
-            
-            current_entry = LogEntry(
-                timestamp=norm_ts,
-                timestamp_raw=raw_ts,
-                source_type=source_type,
-                level=level,
-                message=msg,
-                raw_log=raw_line,
-                host=host,
-                program=program,
-                pid=pid or "",
-                extra=extra
-            )
-        else:
-            # Multiline continuation (stack traces, etc.)
-            if current_entry:
-                current_entry.raw_log += "\n" + raw_line
-                current_entry.message += "\n" + raw_line
-            else:
-                # Orphan line at start
-                events.append(LogEntry(
-                    source_type="plain",
-                    message=raw_line,
-                    raw_log=raw_line
-                ).to_ecs_dict())
-    
-    # Flush final entry
-    if current_entry:
-        events.append(current_entry.to_ecs_dict())
-
-    return events
-
-
-def format_json(text):
-    """
-    Formats a JSON string with 4-space indentation.
-    Returns: (success: bool, content: str, error: str)
-    """
-    try:
-        if not text.strip():
-            return False, "", "Empty selection"
-        
-        parsed = json.loads(text)
-        formatted = json.dumps(parsed, indent=4)
-        return True, formatted, None
-    except json.JSONDecodeError as e:
-        return False, "", f"Invalid JSON: {e}"
-
-def convert_to_json(text):
-    """
-    Wrapper for Smart Log Engine to match Window interface.
-    Returns: (success, json_string, error_msg)
-    """
-    result = parse_log(text)
-    
-    # Handle empty result
-    if not result:
-        return False, "", "No log entries found"
-
-    try:
-        json_str = json.dumps(result, indent=2)
-        return True, json_str, None
-    except Exception as e:
-        return False, "", str(e)
-
-
-# --- Previous Utils (Preserved) ---
-
-def detect_language_by_content(text):
-    """
-    Analyzes text content to guess the programming language.
-    Returns a GtkSourceView language ID or None.
-    """
-    text = text.strip()
-    if not text:
-        return None
-        
-    # 1. Shebang (Highest Priority)
-    first_line = text.splitlines()[0]
-    if first_line.startswith("#!"):
-        if "python" in first_line: return "python"
-        if "bash" in first_line or "sh" in first_line: return "sh"
-        if "node" in first_line: return "js"
-        if "perl" in first_line: return "perl"
-        if "ruby" in first_line: return "ruby"
-        if "php" in first_line: return "php"
-
-    # 2. Strong Structure Indicators (Go, Java, C++, Python Defs, XML/HTML)
-    sample = text[:1500]
-    
-    # Go (Strong) - Check BEFORE Java since both use 'package'
-    if "package main" in sample and "func " in sample: return "go"
-    if 'import "' in sample and "func " in sample: return "go"
-    
-    # Java (Strong)
-    if "public class " in sample and "{" in sample: return "java"
-    if "public static void main" in sample: return "java"
-    if "package " in sample and ";" in sample and "func " not in sample: return "java"
-    
-    # Rust (Strong) - Check before JS since both use 'fn'/'let'
-    if "fn main()" in sample and "{" in sample: return "rust"
-    if "let mut " in sample: return "rust"
-    if "println!(" in sample or "eprintln!(" in sample: return "rust"
-    if re.search(r'fn\s+\w+\s*\([^)]*\)\s*(->\s*\w+)?\s*\{', sample): return "rust"
-    
-    # Haskell (Strong)
-    if ":: IO ()" in sample: return "haskell"
-    if "= do" in sample and "let " in sample: return "haskell"
-    if "putStrLn" in sample or "getLine" in sample: return "haskell"
-    if re.search(r'^\w+\s*::\s*\w+', sample, re.MULTILINE): return "haskell"
-    
-    # Lisp/Scheme (Strong)
-    if "(defun " in sample or "(define " in sample: return "commonlisp"
-    if "(let (" in sample or "(let* (" in sample: return "commonlisp"
-    if "(format " in sample and "~" in sample: return "commonlisp"
-    if re.search(r'^\s*\(defun\s+\w+', sample, re.MULTILINE): return "commonlisp"
-    
-    # Assembly (NASM/x86)
-    if "section .data" in sample or "section .text" in sample: return "nasm"
-    if "global _start" in sample or "_start:" in sample: return "nasm"
-    if re.search(r'\bmov\s+(eax|rax|ebx|rbx|ecx|rcx|edx|rdx)', sample): return "nasm"
-    if "syscall" in sample and "mov " in sample: return "nasm"
-    
-    # Ruby (Strong)
-    if "puts " in sample or "puts(" in sample: return "ruby"
-    if re.search(r'^def\s+\w+', sample, re.MULTILINE) and "\nend" in sample: return "ruby"
-    if re.search(r'^class\s+[A-Z]\w*', sample, re.MULTILINE) and "\nend" in sample: return "ruby"
-    if "require '" in sample or 'require "' in sample: return "ruby"
-    if "attr_accessor" in sample or "attr_reader" in sample: return "ruby"
-    if ".each do |" in sample or ".map do |" in sample: return "ruby"
-    
-    # C/C++ Includes (Strong)
-    if "#include <iostream>" in sample: return "cpp"
-    if "#include <vector>" in sample: return "cpp"
-    if "using namespace std;" in sample: return "cpp"
-    if "#include <" in sample and ".h>" in sample: return "c"
-    
-    # Python Imports/Defs (Strong)
-    if re.search(r'^import [a-zA-Z0-9_]+', sample, re.MULTILINE): return "python"
-    if re.search(r'^from [a-zA-Z0-9_]+ import', sample, re.MULTILINE): return "python"
-    if re.search(r'def [a-zA-Z0-9_]+\(', sample): return "python"
-    if re.search(r'class [a-zA-Z0-9_]+(\(|:)', sample): return "python"
-    if "if __name__ == " in sample: return "python"
-
-    # HTML/XML Tags (Strong, if well-formed)
-    if "<" in text and ">" in text:
-        if re.search(r'<[a-zA-Z0-9_-]+.*?>', text):
-             if "</body>" in text or "</div>" in text or "<script" in text or "<br" in text or "<p>" in text: return "html"
-             # If strictly XML like, return XML. But C includes might trip this if logical operators are used.
-             pass
-
-    # 3. System (Gio) Content Sniffing
-    import gi
-    try:
-        gi.require_version('GtkSource', '4')
-    except ValueError:
-        gi.require_version('GtkSource', '3.0')
-    from gi.repository import Gio, GtkSource
-
-    data = text.encode("utf-8")
-    content_type, uncertain = Gio.content_type_guess(None, data)
-    
-    # If Gio is confident and it's not just generic text
-    if not uncertain and content_type != "text/plain":
-        # Exception: Gio often sees C++ or even Python/Java as partial C source.
-        # We allow falling through for C/C++ types to let our strict/loose heuristics confirm.
-        if content_type in ["text/x-csrc", "text/x-c++src", "text/x-chdr"]:
-            pass # Fall through to heuristics
-        else:
-            manager = GtkSource.LanguageManager.get_default()
-            language = manager.guess_language(None, content_type)
-            if language:
-                return language.get_id()
-
-    # 4. JSON
-    if (text.startswith("{") and text.endswith("}")) or \
-       (text.startswith("[") and text.endswith("]")):
-        try:
-            import string
-            no_space = "".join(text.split())
-            if no_space == "{}" or no_space == "[]": return None
-            json.loads(text)
-            return "json"
-        except:
-             if text.startswith("{") and re.search(r'"[^"]*"\s*:', text): return "json"
-             elif text.startswith("["): return "json"
-
-    # 5. Looser Keyword Heuristics (Fallback)
-    
-    # C/C++ bodies
-    if "int main(" in sample and "{" in sample:
-        if "std::" in sample or "cout <<" in sample: return "cpp"
-        return "c"
-    if "printf(" in sample and ";" in sample: return "c"
-    if "std::" in sample or "cout <<" in sample: return "cpp"
-
-    # Java System.out
-    if "System.out.println" in sample: return "java"
-
-    # Python Loose (Strict Regex required to avoid prose matches)
-    # Match 'for x in y:' on a SINGLE line
-    if re.search(r'^\s*for\s+[a-zA-Z0-9_, ]+\s+in\s+.+:\s*$', sample, re.MULTILINE): return "python"
-    # Match 'print("...")' but NOT 'System.out.print('
-    if re.search(r'(^|\s)print\s*\(["\']', sample): return "python"
-
-    # JavaScript
-    if "function " in sample and "{" in sample: return "js"
-    if "console.log(" in sample: return "js"
-    if "const " in sample and "=" in sample: return "js"
-    if "let " in sample and "=" in sample: return "js"
-    if "document." in sample or "window." in sample: return "js"
-            
-    # CSS
-    if "body {" in sample or ".class" in sample or "div {" in sample:
-        if "{" in sample and ":" in sample and ";" in sample: return "css"
-    if "@media" in sample or "@import" in sample: return "css"
-
-    # Markdown
-    if re.search(r'^#\s', sample, re.MULTILINE) or re.search(r'^\*\*.*\*\*$', sample, re.MULTILINE):
-         return "markdown"
-
-    # XML Fallback (Last resort)
-    if "<" in text and ">" in text:
-        if re.search(r'<[a-zA-Z0-9_-]+.*?>', text):
-             if "</body>" in text or "</div>" in text: return "html"
-             # Only return xml if it really looks like xml structure
-             if "<?xml" in text: return "xml"
-             # Don't default to XML for random brackets in text
-             
-    return None
-
-
-def format_xml(text):
-    """
-    Formats an XML string with 2-space indentation.
-    Returns: (success: bool, content: str, error: str)
-    """
-    try:
-        if not text.strip():
-            return False, "", "Empty selection"
-            
-        # Remove empty lines/whitespace between tags to ensure clean format
-        # This is a naive cleanup to assist minidom
-        cleaned = "".join(line.strip() for line in text.splitlines())
-        
-        parsed = xml.dom.minidom.parseString(cleaned)
-        # toxml() doesn't format, toprettyxml() does
-        # Standard minidom adds extra whitespace, so we strip lines then rejoin
-        ugly = parsed.toprettyxml(indent="  ")
-        
-        # Cleanup minidom's aggressive whitespace
-        lines = [line for line in ugly.splitlines() if line.strip()]
-        formatted = "\n".join(lines)
-        
-        return True, formatted, None
-    except Exception as e:
-         return False, "", f"Invalid XML: {e}"
-
-def generate_hex_dump(text):
-    """
-    Generates a canonical hex dump of the provided text (utf-8 bytes).
-    Format: Offset | Hex Bytes | ASCII
-    """
-    try:
-        data = text.encode("utf-8")
-        result = []
-        chunk_size = 16
-        
-        for i in range(0, len(data), chunk_size):
-            chunk = data[i:i+chunk_size]
-            
-            # Offset
-            offset = f"{i:08x}"
-            
-            # Hex
-            hex_bytes = " ".join(f"{b:02x}" for b in chunk)
-            padding = "   " * (chunk_size - len(chunk))
-            
-            # ASCII
-            ascii_repr = ""
-            for b in chunk:
-                if 32 <= b <= 126:
-                    ascii_repr += chr(b)
-                else:
-                    ascii_repr += "."
-            
-            result.append(f"{offset}  {hex_bytes}{padding}  |{ascii_repr}|")
-            
-    except Exception as e:
-        return f"Error generating hex dump: {e}"
-
-def calculate_hashes(text):
-    """
-    Calculates MD5, SHA1, SHA256, SHA512 hashes of the text.
-    Returns: dict {algo_name: hex_digest}
-    """
-    import hashlib
-    
-    if not text:
-        return {}
-        
-    data = text.encode("utf-8")
-    
-    results = {
-        "MD5": hashlib.md5(data).hexdigest(),
-        "SHA-1": hashlib.sha1(data).hexdigest(),
-        "SHA-256": hashlib.sha256(data).hexdigest(),
-        "SHA-512": hashlib.sha512(data).hexdigest()
-    }
-    return results
-
-def transform_text(text, mode):
-    """
-    Transforms text based on the mode.
-    Modes: base64_enc, base64_dec, url_enc, url_dec
-    Returns: (success, result, error)
-    """
-    import base64
-    import urllib.parse
-    
-    if not text:
-        return True, "", None
-        
-    try:
-        if mode == "base64_enc":
-            # Encode -> bytes -> base64 bytes -> string
-            encoded_bytes = base64.b64encode(text.encode("utf-8"))
-            return True, encoded_bytes.decode("utf-8"), None
-            
-        elif mode == "base64_dec":
-            # Decode -> base64 bytes -> bytes -> string
-            decoded_bytes = base64.b64decode(text)
-            return True, decoded_bytes.decode("utf-8"), None
-            
-        elif mode == "url_enc":
-            return True, urllib.parse.quote(text), None
-            
-        elif mode == "url_dec":
-            return True, urllib.parse.unquote(text), None
-            
-        return False, None, f"Unknown mode: {mode}"
-        
-    except Exception as e:
-        return False, None, str(e)
\ No newline at end of file
+import json
+import os
+import sys
+import collections
+import concurrent.futures
+import multiprocessing
+import binascii
+import re
+import csv
+import io
+import datetime
+import dataclasses
+import codecs
+import functools
+import itertools
+import threading
+import time
+from typing import List, Dict, Optional, Any, Tuple, Iterable, Iterator
+
+from zenpad import json_stream
+from zenpad import xml_stream
+from zenpad import hashing
+from zenpad import transforms
+from zenpad.log_table import LogTable
+from zenpad.search import looks_catastrophic
+
+# --- Smart Log Engine (Phase 1) ---
+
+@dataclasses.dataclass
+class LogEntry:
+    """ECS-compatible log event structure for SOC tools (Splunk/ELK/Wazuh)"""
+    timestamp: str = ""         # @timestamp (ISO 8601)
+    timestamp_raw: str = ""     # Original timestamp string
+    source_type: str = ""       # Profile name (syslog, access, kernel, etc.)
+    level: str = ""             # log.level
+    message: str = ""           # Main content
+    raw_log: str = ""           # Original line(s) preserved
+    host: str = ""              # host.name
+    program: str = ""           # process.name / app
+    pid: str = ""               # process.pid
+    # Additional fields for specific log types
+    extra: Dict[str, Any] = dataclasses.field(default_factory=dict)
+
+    def to_ecs_dict(self) -> Dict[str, Any]:
+        """Output flat ECS-compatible dict (only non-empty fields, raw_log last)"""
+        result = {}
+        # Core fields first
+        if self.timestamp:
+            result["@timestamp"] = self.timestamp
+        if self.timestamp_raw:
+            result["timestamp_raw"] = self.timestamp_raw
+        if self.source_type:
+            result["source_type"] = self.source_type
+        if self.level:
+            result["level"] = self.level
+        if self.host:
+            result["host"] = self.host
+        if self.program:
+            result["program"] = self.program
+        if self.pid:
+            result["pid"] = self.pid
+        if self.message:
+            result["message"] = self.message
+        # Extra fields (ip, status, bytes, etc.)
+        result.update(self.extra)
+        # raw_log always last
+        if self.raw_log:
+            result["raw_log"] = self.raw_log
+        return result
+
+# --- Timestamp normalization ---
+
+# Formats tried after a profile's own date_fmt
+FALLBACK_DATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S,%f",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%b/%Y:%H:%M:%S %z", # Common Log Format
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%dT%H:%M:%SZ"
+]
+
+# Distinct second-resolution timestamps remembered by the fast parsers
+TIMESTAMP_CACHE_SIZE = 4096
+
+# Access logs always use English month abbreviations, whatever the locale
+_MONTHS = {name: i + 1 for i, name in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])}
+
+_ASCII_DIGITS = frozenset("0123456789")
+
+
+def _digits(text: str) -> bool:
+    return bool(text) and _ASCII_DIGITS.issuperset(text)
+
+
+@functools.lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _iso_seconds(year: str, month: str, day: str, clock: str) -> Optional[str]:
+    """ISO 8601 date and time of day ("2023-10-27T10:00:00"), or None if out of range."""
+    if not (_digits(year) and _digits(month) and _digits(day) and len(clock) == 8
+            and clock[2] == ":" and clock[5] == ":"
+            and _digits(clock[:2]) and _digits(clock[3:5]) and _digits(clock[6:])):
+        return None
+    try:
+        return datetime.datetime(int(year), int(month), int(day),
+                                 int(clock[:2]), int(clock[3:5]), int(clock[6:])).isoformat()
+    except ValueError:
+        return None
+
+
+def _fraction(digits: str) -> Optional[str]:
+    """isoformat() suffix for a %f field (1-6 digits, omitted when zero)."""
+    if not _digits(digits) or len(digits) > 6:
+        return None
+    micro = int(digits.ljust(6, "0"))
+    return f".{micro:06d}" if micro else ""
+
+
+def _parse_ymd(raw: str, date_sep: str, time_sep: str) -> Optional[str]:
+    # "2023-10-27 10:00:00" and friends, split at fixed positions
+    if len(raw) < 19 or raw[4] != date_sep or raw[7] != date_sep or raw[10] != time_sep:
+        return None
+    return _iso_seconds(raw[:4], raw[5:7], raw[8:10], raw[11:19])
+
+
+def _fast_ymd_comma_fraction(raw):  # %Y-%m-%d %H:%M:%S,%f
+    if len(raw) < 21 or raw[19] != ",":
+        return None
+    head, frac = _parse_ymd(raw, "-", " "), _fraction(raw[20:])
+    return head + frac if head and frac is not None else None
+
+
+def _fast_ymd(raw):  # %Y-%m-%d %H:%M:%S
+    return _parse_ymd(raw, "-", " ") if len(raw) == 19 else None
+
+
+def _fast_iso_fraction_z(raw):  # %Y-%m-%dT%H:%M:%S.%fZ
+    if len(raw) < 22 or raw[19] != "." or raw[-1] != "Z":
+        return None
+    head, frac = _parse_ymd(raw, "-", "T"), _fraction(raw[20:-1])
+    return head + frac if head and frac is not None else None
+
+
+def _fast_iso_z(raw):  # %Y-%m-%dT%H:%M:%SZ
+    return _parse_ymd(raw, "-", "T") if len(raw) == 20 and raw[19] == "Z" else None
+
+
+def _fast_nginx(raw):  # %Y/%m/%d %H:%M:%S
+    return _parse_ymd(raw, "/", " ") if len(raw) == 19 else None
+
+
+def _fast_clf(raw):  # %d/%b/%Y:%H:%M:%S %z, e.g. "10/Oct/2000:13:55:36 -0700"
+    if len(raw) != 26 or raw[2] != "/" or raw[6] != "/" or raw[11] != ":" or raw[20] != " ":
+        return None
+    month = _MONTHS.get(raw[3:6])
+    sign, hours, minutes = raw[21], raw[22:24], raw[24:26]
+    if month is None or sign not in "+-" or not (_digits(hours) and _digits(minutes)):
+        return None
+    if int(hours) > 23 or int(minutes) > 59:
+        return None
+    head = _iso_seconds(raw[7:11], str(month), raw[:2], raw[12:20])
+    if head is None:
+        return None
+    if hours == "00" and minutes == "00":
+        sign = "+"
+    return f"{head}{sign}{hours}:{minutes}"
+
+
+# Format -> (fast parser for its canonical layout, cheap test every match must pass).
+# The test lets a line skip strptime for formats it cannot possibly match.
+_FAST_DATE_FORMATS = {
+    "%Y-%m-%d %H:%M:%S,%f": (_fast_ymd_comma_fraction, lambda raw: raw[:4].isdigit() and raw[4:5] == "-"),
+    "%Y-%m-%d %H:%M:%S": (_fast_ymd, lambda raw: raw[:4].isdigit() and raw[4:5] == "-"),
+    "%Y-%m-%dT%H:%M:%S.%fZ": (_fast_iso_fraction_z, lambda raw: raw[:4].isdigit() and raw[4:5] == "-"),
+    "%Y-%m-%dT%H:%M:%SZ": (_fast_iso_z, lambda raw: raw[:4].isdigit() and raw[4:5] == "-"),
+    "%Y/%m/%d %H:%M:%S": (_fast_nginx, lambda raw: raw[:4].isdigit() and raw[4:5] == "/"),
+    "%d/%b/%Y:%H:%M:%S %z": (_fast_clf, lambda raw: "/" in raw[1:3]),
+}
+
+
+class TimestampParser:
+    """
+    Normalizes raw timestamps to ISO 8601 like datetime.strptime(...).isoformat().
+
+    Formats are tried in order until one succeeds; the winner is then
+    tried first for the following lines (log files rarely mix layouts).
+    Known layouts are parsed at fixed positions with the date and time
+    of day memoized, and strptime only runs for other formats or
+    non-canonical input.
+    """
+
+    def __init__(self, date_fmt: Optional[str] = None):
+        formats = ([date_fmt] if date_fmt else []) + FALLBACK_DATE_FORMATS
+        self.formats = list(dict.fromkeys(formats))  # Keep order, drop repeats
+        self._plans = [(fmt,) + _FAST_DATE_FORMATS.get(fmt, (None, None)) for fmt in self.formats]
+
+    def parse(self, raw_date: str) -> Tuple[str, bool]:
+        """Returns (normalized_date, success)"""
+        plans = self._plans
+        for i, (fmt, fast, possible) in enumerate(plans):
+            if fast is not None:
+                result = fast(raw_date)
+                if result is None:
+                    if not possible(raw_date):
+                        continue
+                    result = self._strptime(raw_date, fmt)
+            else:
+                result = self._strptime(raw_date, fmt)
+            if result is not None:
+                if i:
+                    # Sticky: lock onto the format that just worked
+                    self._plans = [plans[i]] + plans[:i] + plans[i + 1:]
+                return result, True
+        return raw_date, False
+
+    @staticmethod
+    def _strptime(raw_date: str, fmt: str) -> Optional[str]:
+        try:
+            return datetime.datetime.strptime(raw_date, fmt).isoformat()
+        except ValueError:
+            return None
+
+
+@dataclasses.dataclass
+class LogStats:
+    """Counters filled while converting a log."""
+    events: int = 0
+    timestamps: int = 0           # Events carrying a raw timestamp
+    timestamp_failures: int = 0   # ... that could not be normalized
+    relative_timestamps: int = 0  # Events with only an uptime offset ("[   12.345]"), not counted above
+    source_types: Dict[str, int] = dataclasses.field(default_factory=collections.Counter)
+
+    @property
+    def timestamp_failure_rate(self) -> float:
+        return self.timestamp_failures / self.timestamps if self.timestamps else 0.0
+
+    def merge(self, other: "LogStats"):
+        self.events += other.events
+        self.timestamps += other.timestamps
+        self.timestamp_failures += other.timestamp_failures
+        self.relative_timestamps += other.relative_timestamps
+        self.source_types.update(other.source_types)
+
+    def subtract(self, other: "LogStats"):
+        self.events -= other.events
+        self.timestamps -= other.timestamps
+        self.timestamp_failures -= other.timestamp_failures
+        self.relative_timestamps -= other.relative_timestamps
+        self.source_types = collections.Counter(self.source_types)
+        self.source_types.subtract(other.source_types)
+        self.source_types = +self.source_types  # Drop emptied types
+
+    def source_type_summary(self) -> str:
+        """E.g. "nginx 120, java 45, kernel 3" (most frequent first)."""
+        return ", ".join(f"{name} {n}" for name, n in collections.Counter(self.source_types).most_common())
+
+
+@dataclasses.dataclass
+class LogProfile:
+    name: str
+    regex: re.Pattern
+    date_fmt: Optional[str] = None
+    level_map: Optional[Dict[str, str]] = None
+    source_type: str = "unknown"  # ECS source_type of its events
+
+    def normalize_level(self, raw_lvl: str) -> str:
+        if not self.level_map:
+            return raw_lvl.upper()
+        return self.level_map.get(raw_lvl.upper(), raw_lvl.upper())
+
+    def parse_date(self, raw_date: str) -> Tuple[str, bool]:
+        """Returns (normalized_date, success)"""
+        # Strategy:
+        # 1. Try profile's specific format
+        # 2. Try common formats (ISO, simple)
+        # 3. Fail
+        return _shared_timestamp_parser(self.date_fmt).parse(raw_date)
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_timestamp_parser(date_fmt: Optional[str]) -> TimestampParser:
+    return TimestampParser(date_fmt)
+
+# --- Profiles Registry ---
+
+LOG_PROFILES = [
+    # 1. Java / Spring Standard
+    # Example: [2010-04-24 07:51:54,393] INFO - [main] Message...
+    LogProfile(
+        name="Java Application Log",
+        source_type="java",
+        regex=re.compile(r'^\[(?P<ts>.*?)\]\s+(?P<lvl>\w+)\s+-\s+\[(?P<thread>.*?)\]\s+(?P<msg>.*)'),
+        date_fmt="%Y-%m-%d %H:%M:%S,%f",
+        level_map={"INF": "INFO", "ERR": "ERROR", "WRN": "WARN", "DBG": "DEBUG"}
+    ),
+
+    # 2. Web Access Log (Combined)
+    # Example: 127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET /index.html" 200 2326
+    LogProfile(
+        name="Web Access Log",
+        source_type="access",
+        regex=re.compile(r'^(?P<ip>\S+)\s\S+\s\S+\s\[(?P<ts>.*?)\]\s"(?P<req>.*?)"\s(?P<status>\d{3})\s(?P<bytes>\S+).*'),
+        date_fmt="%d/%b/%Y:%H:%M:%S %z"
+    ),
+
+    # 3. Simple Syslog / Message
+    # Example: 2023-10-27 10:00:00 INFO Some message
+    LogProfile(
+        name="Simple Timestamp Log",
+        source_type="simple",
+        regex=re.compile(r'^(?P<ts>\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}(?:,\d{3})?)\s+(?P<lvl>\w+)\s+(?P<msg>.*)'),
+        date_fmt="%Y-%m-%d %H:%M:%S"
+    ),
+
+    # 4. Standard Linux Syslog (RFC 3164)
+    # Example: Oct 11 22:14:15 myhost sshd[1234]: Failed password...
+    LogProfile(
+        name="Linux Syslog (Standard)",
+        source_type="syslog",
+        regex=re.compile(r'^(?P<ts>[A-Z][a-z]{2}\s+\d{1,2}\s\d{2}:\d{2}:\d{2})\s+(?P<host>\S+)\s+(?P<app>[\w\-\.]+)(?:\[(?P<pid>\d+)\])?:\s+(?P<msg>.*)'),
+        # RFC 3164 does not have year. We leave it raw for now.
+        date_fmt=None 
+    ),
+
+    # 5. Linux Kernel Ring Buffer (dmesg)
+    # Example: [    0.000000] Linux version...
+    LogProfile(
+        name="Linux Kernel Log",
+        source_type="kernel",
+        regex=re.compile(r'^\[\s*(?P<ts_rel>\d+\.\d+)\]\s+(?P<msg>.*)'),
+        # Relative timestamp, no absolute date format
+        date_fmt=None
+    ),
+
+    # 6. Nginx Error Log
+    # Example: 2023/10/27 10:00:00 [error] 1234#0: *1 connection timed out...
+    LogProfile(
+        name="Nginx Error Log",
+        source_type="nginx",
+        regex=re.compile(r'^(?P<ts>\d{4}/\d{2}/\d{2}\s\d{2}:\d{2}:\d{2})\s\[(?P<lvl>\w+)\]\s(?P<pid>\d+)#(?P<tid>\d+):\s(?P<msg>.*)'),
+        date_fmt="%Y/%m/%d %H:%M:%S"
+    ),
+
+    # 7. Apache Error Log
+    # Example: [Fri Oct 27 10:00:00.123456 2023] [core:error] [pid 1234] ...
+    LogProfile(
+        name="Apache Error Log",
+        source_type="apache",
+        regex=re.compile(r'^\[(?P<ts>.*?)\]\s\[(?P<module>.*?):(?P<lvl>\w+)\]\s\[pid\s(?P<pid>\d+)\]\s(?P<msg>.*)'),
+        # Complex Apache timestamp, letting it fall back to generic parser or raw
+        date_fmt=None
+    )
+]
+
+GENERIC_PROFILE = LogProfile(name="Generic Log (Fallback)", regex=re.compile(r'^(?P<msg>.*)'))
+
+# --- User profiles ---
+
+# One JSON file per in-house format (or a list of them per file), e.g.
+#   {"name": "Acme Gateway", "regex": "^(?P<ts>\\S+ \\S+) (?P<lvl>\\w+) (?P<msg>.*)",
+#    "date_fmt": "%Y-%m-%d %H:%M:%S", "level_map": {"E": "ERROR"}, "source_type": "acme"}
+USER_PROFILES_DIR = os.path.join(os.path.expanduser("~"), ".config", "zenpad", "log_profiles")
+
+_PROFILE_KEYS = {"name", "regex", "date_fmt", "level_map", "source_type"}
+
+_user_profiles = (None, [], [])  # (directory state, profiles, errors)
+_user_profiles_lock = threading.Lock()
+
+
+def profile_from_dict(data: Dict[str, Any], default_source_type: str = "custom") -> LogProfile:
+    """
+    Validate and compile a profile definition.
+
+    Raises:
+        ValueError describing the first problem found
+    """
+    if not isinstance(data, dict):
+        raise ValueError("a profile must be a JSON object")
+    unknown = set(data) - _PROFILE_KEYS
+    if unknown:
+        raise ValueError(f"unknown keys: {', '.join(sorted(unknown))}")
+
+    name = data.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("'name' must be a non-empty string")
+    source = data.get("regex")
+    if not isinstance(source, str) or not source:
+        raise ValueError(f"{name}: 'regex' must be a non-empty string")
+    try:
+        regex = re.compile(source)
+    except re.error as e:
+        raise ValueError(f"{name}: invalid regex: {e}")
+    if "msg" not in regex.groupindex:
+        raise ValueError(f"{name}: the regex needs a (?P<msg>...) group")
+    # Every line of a log goes through the regex: refuse patterns that can hang
+    if looks_catastrophic(source):
+        raise ValueError(f"{name}: the regex is prone to catastrophic backtracking "
+                         "(nested or alternated repetition, or a backreference)")
+
+    date_fmt = data.get("date_fmt")
+    if date_fmt is not None:
+        if not isinstance(date_fmt, str) or not date_fmt:
+            raise ValueError(f"{name}: 'date_fmt' must be a strptime format")
+        sample = datetime.datetime(2001, 2, 3, 4, 5, 6, 789000, tzinfo=datetime.timezone.utc)
+        try:
+            datetime.datetime.strptime(sample.strftime(date_fmt), date_fmt)
+        except ValueError as e:
+            raise ValueError(f"{name}: invalid 'date_fmt' {date_fmt!r}: {e}")
+
+    level_map = data.get("level_map")
+    if level_map is not None:
+        if not isinstance(level_map, dict) or not all(
+                isinstance(k, str) and isinstance(v, str) for k, v in level_map.items()):
+            raise ValueError(f"{name}: 'level_map' must map strings to strings")
+        level_map = {k.upper(): v.upper() for k, v in level_map.items()}
+
+    source_type = data.get("source_type", default_source_type)
+    if not isinstance(source_type, str) or not source_type:
+        raise ValueError(f"{name}: 'source_type' must be a non-empty string")
+
+    return LogProfile(name=name, regex=regex, date_fmt=date_fmt, level_map=level_map,
+                      source_type=source_type)
+
+
+def load_user_profiles(directory: str = USER_PROFILES_DIR) -> Tuple[List[LogProfile], List[str]]:
+    """
+    Profiles defined in directory/*.json, validated and compiled, with the
+    problems found. Results are cached until a file is added, removed or changed.
+    """
+    global _user_profiles
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    except OSError:
+        names = []
+    state = [directory]
+    for name in names:
+        try:
+            st = os.stat(os.path.join(directory, name))
+        except OSError:
+            continue
+        state.append((name, st.st_mtime_ns, st.st_size))
+    state = tuple(state)
+
+    with _user_profiles_lock:
+        if _user_profiles[0] == state:
+            return _user_profiles[1], _user_profiles[2]
+
+    profiles = []
+    errors = []
+    seen = set()
+    for name, _, _ in state[1:]:
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            errors.append(f"{name}: {e}")
+            continue
+        for item in data if isinstance(data, list) else [data]:
+            try:
+                profile = profile_from_dict(item, os.path.splitext(name)[0])
+            except ValueError as e:
+                errors.append(f"{name}: {e}")
+                continue
+            if profile.name in seen:
+                errors.append(f"{name}: duplicate profile name {profile.name!r}")
+                continue
+            seen.add(profile.name)
+            profiles.append(profile)
+    for error in errors:
+        print(f"[LogProfiles] {error}")
+
+    with _user_profiles_lock:
+        _user_profiles = (state, profiles, errors)
+    return profiles, errors
+
+
+def log_profiles() -> List[LogProfile]:
+    """Profiles tried by detection: the user's first, then LOG_PROFILES."""
+    return load_user_profiles()[0] + LOG_PROFILES
+
+# Regex groups that map to dedicated LogEntry fields (the rest go to extra)
+CORE_GROUPS = frozenset(["ts", "ts_rel", "lvl", "msg", "req", "host", "app", "module", "pid"])
+
+# Leading lines sampled to pick a profile
+DETECT_SAMPLE_LINES = 50
+
+# A sample is treated as mixed (per-line dispatch) when at least two
+# profiles each claim this share of its non-blank lines
+MIXED_MIN_SHARE = 0.1
+
+# Events serialized per json encoder call by iter_json
+JSON_BATCH_SIZE = 256
+
+# Output handed to write() at once by stream_log_json (characters)
+STREAM_BLOCK_SIZE = 256 * 1024
+
+
+def detect_profile(lines: List[str]) -> LogProfile:
+    """Pick the profile matching most non-blank sample lines (Generic below 40%)."""
+    sample_lines = [l for l in lines if l.strip()]
+    best_profile = GENERIC_PROFILE
+    best_score = 0.0
+
+    if sample_lines:
+        for profile in log_profiles():
+            matches = sum(1 for line in sample_lines if profile.regex.match(line.strip()))
+            score = matches / len(sample_lines)
+            if score > best_score:
+                best_score = score
+                best_profile = profile
+
+    # Fall back to Generic if no good match
+    if best_score < 0.4:
+        best_profile = GENERIC_PROFILE
+    return best_profile
+
+
+def detect_profiles(lines: List[str]) -> List[LogProfile]:
+    """
+    Pick the profiles to parse with: one profile (as detect_profile()) or,
+    for interleaved output of several programs, every profile that claims
+    part of the sample, in log_profiles() order.
+    """
+    profiles = log_profiles()
+    sample_lines = [l.strip() for l in lines if l.strip()]
+    claims = collections.Counter()
+    for line in sample_lines:
+        for index, profile in enumerate(profiles):
+            if profile.regex.match(line):
+                claims[index] += 1  # First matching profile claims the line
+                break
+
+    min_lines = max(1, MIXED_MIN_SHARE * len(sample_lines))
+    significant = [index for index, n in claims.items() if n >= min_lines]
+    if len(significant) >= 2 and sum(claims.values()) >= 0.4 * len(sample_lines):
+        return [profiles[index] for index in sorted(claims)]
+    return [detect_profile(lines)]
+
+
+class ProfileDispatcher:
+    """
+    Matches a line against one or several profiles with a single regex call.
+
+    The profile regexes are combined into one alternation, each wrapped in
+    its own group with renamed inner groups; the wrapper closes last, so
+    match.lastindex tells which profile matched.
+    """
+
+    def __init__(self, profiles: List[LogProfile]):
+        self.profiles = list(profiles)
+        if len(self.profiles) == 1:
+            self.regex = self.profiles[0].regex
+            self._fields = None
+            return
+
+        parts = []
+        for index, profile in enumerate(self.profiles):
+            source = re.sub(r"\(\?P([<=])(\w+)", lambda m: f"(?P{m.group(1)}_{index}_{m.group(2)}",
+                            profile.regex.pattern)
+            flags = "".join(letter for flag, letter in ((re.IGNORECASE, "i"), (re.MULTILINE, "m"),
+                                                       (re.DOTALL, "s"), (re.VERBOSE, "x"))
+                            if profile.regex.flags & flag)
+            if flags:
+                source = f"(?{flags}:{source})"
+            parts.append(f"(?P<_{index}>{source})")
+        self.regex = re.compile("|".join(parts))
+
+        # Wrapper group index -> (profile index, [(field name, group index)])
+        self._fields = {}
+        groupindex = self.regex.groupindex
+        for index, profile in enumerate(self.profiles):
+            fields = [(name, groupindex[f"_{index}_{name}"]) for name in profile.regex.groupindex]
+            self._fields[groupindex[f"_{index}"]] = (index, fields)
+
+    def match(self, line: str) -> Optional[Tuple[int, Dict[str, Optional[str]]]]:
+        """(profile index, named groups) of the profile matching line, or None."""
+        m = self.regex.match(line)
+        if m is None:
+            return None
+        if self._fields is None:
+            return 0, m.groupdict()
+        index, fields = self._fields[m.lastindex]
+        values = m.groups()
+        return index, {field: values[group - 1] for field, group in fields}
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Re-split arbitrary text chunks into lines.
+
+    A line cut by a chunk boundary is carried over to the next chunk, so
+    callers can feed fixed-size slices of a document or reads of a file.
+    """
+    pending = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _entry_from_groups(profile: LogProfile, groups: Dict[str, Optional[str]], raw_line: str,
+                       parse_date) -> Tuple[LogEntry, Optional[bool]]:
+    """Build the entry of a matched line; also says whether its timestamp parsed (None: no date to parse)."""
+
+    # Extract timestamp (an uptime offset has no date to parse)
+    raw_ts = groups.get("ts", "")
+    if raw_ts:
+        norm_ts, ts_ok = parse_date(raw_ts)
+    else:
+        norm_ts = raw_ts = groups.get("ts_rel", "") or ""
+        ts_ok = None
+
+    # Extract level
+    level = profile.normalize_level(groups.get("lvl", ""))
+
+    # Extract message
+    msg = groups.get("msg", "")
+    # Special handling for web access logs
+    if "req" in groups:
+        msg = f"{groups.get('req', '')} [{groups.get('status', '')}]"
+
+    # Extract host/program/pid (ECS fields)
+    host = groups.get("host", "")
+    program = groups.get("app", "") or groups.get("module", "")
+    pid = groups.get("pid", "")
+
+    # Collect extra fields (ip, thread, etc.)
+    extra = {k: v for k, v in groups.items() if v and k not in CORE_GROUPS}
+
+    entry = LogEntry(
+        timestamp=norm_ts,
+        timestamp_raw=raw_ts,
+        source_type=profile.source_type,
+        level=level,
+        message=msg,
+        raw_log=raw_line,
+        host=host,
+        program=program,
+        pid=pid or "",
+        extra=extra
+    )
+    return entry, ts_ok
+
+
+def _finish_entry(entry: LogEntry, tail: List[str]) -> LogEntry:
+    """Attach collected continuation lines."""
+    if tail:
+        text = "".join(tail)
+        entry.raw_log += text
+        entry.message += text
+    return entry
+
+
+def iter_log_entries(lines: Iterable[str], profile=None,
+                     stats: Optional[LogStats] = None) -> Iterator[Tuple[int, LogEntry]]:
+    """
+    Streaming Smart Log Engine: yield (first line number, LogEntry) one event at a time.
+
+    Only the first DETECT_SAMPLE_LINES lines are buffered (to detect the
+    profile) and continuation lines are held until their event is complete,
+    so memory use is bounded by the largest event rather than the input.
+
+    Args:
+        lines: Any iterable of lines (a list, an open file, iter_lines(...));
+            line terminators are ignored
+        profile: Parse with this LogProfile (or list of profiles, dispatched
+            per line) instead of detecting them
+        stats: Optional LogStats updated with the events read so far
+    """
+    lines = iter(lines)
+    if profile is None:
+        head = list(itertools.islice(lines, DETECT_SAMPLE_LINES))
+        profiles = detect_profiles(head)
+        lines = itertools.chain(head, lines)
+    else:
+        profiles = profile if isinstance(profile, list) else [profile]
+
+    generic = profiles == [GENERIC_PROFILE]
+    match_line = ProfileDispatcher(profiles).match
+    # Sticky per input and profile
+    parse_dates = [TimestampParser(p.date_fmt).parse for p in profiles]
+    current_entry = None  # type: Optional[LogEntry]
+    entry_line = 0
+    tail = []  # Continuation text of current_entry, joined once on flush
+    events = timestamps = failures = relative = 0
+    source_types = collections.Counter()
+
+    try:
+        for line_no, line in enumerate(lines):
+            raw_line = line.rstrip('\r\n')
+            clean_line = line.strip()
+
+            if not clean_line:
+                # Preserve empty lines in multiline context
+                if current_entry is not None:
+                    tail.append("\n")
+                continue
+
+            # Generic Profile: One event per line, no parsing
+            if generic:
+                events += 1
+                source_types["plain"] += 1
+                yield line_no, LogEntry(source_type="plain", message=raw_line, raw_log=raw_line)
+                continue
+
+            # Try to match structured profile(s)
+            match = match_line(clean_line)
+            if match:
+                # Flush previous entry
+                if current_entry is not None:
+                    events += 1
+                    source_types[current_entry.source_type] += 1
+                    yield entry_line, _finish_entry(current_entry, tail)
+                    tail = []
+                index, groups = match
+                entry_line = line_no
+                current_entry, ts_ok = _entry_from_groups(profiles[index], groups, raw_line,
+                                                          parse_dates[index])
+                if ts_ok is not None:
+                    timestamps += 1
+                    if not ts_ok:
+                        failures += 1
+                elif groups.get("ts_rel"):
+                    relative += 1
+            elif current_entry is not None:
+                # Multiline continuation (stack traces, etc.)
+                tail.append("\n")
+                tail.append(raw_line)
+            else:
+                # Orphan line at start
+                events += 1
+                source_types["plain"] += 1
+                yield line_no, LogEntry(source_type="plain", message=raw_line, raw_log=raw_line)
+
+        # Flush final entry
+        if current_entry is not None:
+            events += 1
+            source_types[current_entry.source_type] += 1
+            yield entry_line, _finish_entry(current_entry, tail)
+    finally:
+        if stats is not None:
+            stats.merge(LogStats(events, timestamps, failures, relative, source_types))
+
+
+def iter_log_events(lines: Iterable[str], profile=None,
+                    stats: Optional[LogStats] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming Smart Log Engine: yield ECS-compatible events one at a time.
+    Same arguments as iter_log_entries().
+    """
+    for _, entry in iter_log_entries(lines, profile, stats):
+        yield entry.to_ecs_dict()
+
+
+def parse_log(text: str) -> List[Dict[str, Any]]:
+    """
+    Smart Log Engine (Phase 3 - SOC Compatible).
+    Returns a flat array of ECS-compatible events.
+    Output format matches Splunk/ELK/Wazuh expectations.
+    
+    Note: JSON detection is handled by the caller (window.py) to allow user override.
+    Large inputs should use iter_log_events() instead.
+    """
+    if not text:
+        return []
+    return list(iter_log_events(text.splitlines()))
+
+
+def iter_json(events: Iterable[Dict[str, Any]], ndjson: bool = False,
+              continued: bool = False) -> Iterator[str]:
+    """
+    Serialize events incrementally.
+
+    The array form is identical to json.dumps(list(events), indent=2);
+    NDJSON puts one compact event on each line. With continued, the array
+    form carries on an array whose closing bracket was removed.
+    """
+    if ndjson:
+        encode = json.JSONEncoder().encode
+        for event in events:
+            yield encode(event) + "\n"
+        return
+
+    # Encoding events in small lists is much cheaper than one call per event
+    encode = json.JSONEncoder(indent=2).encode
+    events = iter(events)
+    first = not continued
+    while True:
+        batch = list(itertools.islice(events, JSON_BATCH_SIZE))
+        if not batch:
+            break
+        # Drop the "[\n" and "\n]" around each batch and splice them together
+        yield ("[\n" if first else ",\n") + encode(batch)[2:-2]
+        first = False
+    yield "[]" if first else "\n]"
+
+
+def stream_log_json(lines: Iterable[str], write, ndjson: bool = False,
+                    profile=None, task=None,
+                    stats: Optional[LogStats] = None) -> int:
+    """
+    Convert log lines to JSON, handing the output to write() in blocks.
+
+    Args:
+        lines: Log lines (see iter_log_events)
+        write: Called with successive blocks of about STREAM_BLOCK_SIZE characters
+        ndjson: Emit newline-delimited JSON instead of one array
+        profile: Parse with this profile (or list of profiles) instead of detecting
+        task: Optional BackgroundTask-like object, polled for cancellation
+        stats: Optional LogStats to add this run's counters to
+
+    Returns:
+        Number of events converted. Nothing is written when it is 0.
+    """
+    run = LogStats()
+    write_json(iter_log_events(lines, profile, run), write, ndjson, task)
+    if stats is not None:
+        stats.merge(run)
+    return run.events
+
+
+def write_json(events: Iterable[Dict[str, Any]], write, ndjson: bool = False, task=None,
+               continued: bool = False) -> int:
+    """
+    Serialize events with iter_json(), handing the output to write() in
+    blocks of about STREAM_BLOCK_SIZE characters.
+
+    Returns:
+        Number of events written. Nothing is written when it is 0.
+    """
+    count = 0
+
+    def counted():
+        nonlocal count
+        for event in events:
+            count += 1
+            yield event
+
+    block = []
+    size = 0
+    for piece in iter_json(counted(), ndjson, continued):
+        block.append(piece)
+        size += len(piece)
+        if size >= STREAM_BLOCK_SIZE:
+            if task:
+                task.check_cancelled()
+            write("".join(block))
+            block = []
+            size = 0
+    if block and count:
+        write("".join(block))
+    return count
+
+
+# --- Parallel conversion ---
+
+# Documents/files larger than this are converted by a process pool
+PARALLEL_MIN_SIZE = 8 * 1024 * 1024
+
+# Nominal size of the chunk each worker process parses (characters or bytes)
+PARALLEL_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Text read from a file or document at once by the serial path
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def _event_start_in_text(text: str, pos: int, match) -> int:
+    """Offset of the first line starting at or after pos that begins an event."""
+    if pos <= 0:
+        return 0
+    n = len(text)
+    start = text.find("\n", pos - 1)
+    while start != -1:
+        start += 1
+        end = text.find("\n", start)
+        line = text[start:end if end != -1 else n].strip()
+        if line and match(line):
+            return start
+        start = end
+    return n
+
+
+def _event_start_in_file(f, pos: int, encoding: str, match) -> int:
+    """Byte offset of the first line starting at or after pos that begins an event."""
+    if pos <= 0:
+        return 0
+    f.seek(pos - 1)
+    f.readline()  # Skip the rest of a cut line
+    while True:
+        at = f.tell()
+        raw = f.readline()
+        if not raw:
+            return at
+        line = raw.decode(encoding, "replace").strip()
+        if line and match(line):
+            return at
+
+
+def _split_points(size: int, chunk_size: int, event_start) -> List[int]:
+    """
+    Chunk boundaries realigned forward to event starts.
+
+    Continuation lines (stack traces, wrapped messages) therefore stay
+    in the chunk of the event they belong to.
+    """
+    points = [0]
+    for pos in range(chunk_size, size, chunk_size):
+        start = event_start(pos)
+        if start > points[-1]:
+            points.append(start)
+    if points[-1] < size:
+        points.append(size)
+    return points
+
+
+def _load_chunk(spec: tuple) -> str:
+    """Worker side: text of a chunk spec (text slice, or path, encoding and byte range)."""
+    text, path, encoding, start, end = spec
+    if text is not None:
+        return text
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return data.decode(encoding, "replace")
+
+
+def _convert_chunk(spec: tuple, profile: List[LogProfile], ndjson: bool) -> Tuple[LogStats, str]:
+    """Worker: convert one aligned chunk to (stats, JSON body without brackets)."""
+    parts = []
+    stats = LogStats()
+    stream_log_json(iter_lines([_load_chunk(spec)]), parts.append, ndjson, profile, stats=stats)
+    body = "".join(parts)
+    if stats.events and not ndjson:
+        body = body[2:-2]  # Strip the "[\n" and "\n]" of the chunk's own array
+    return stats, body
+
+
+def _table_chunk(spec: tuple, profile: List[LogProfile]) -> Tuple[LogTable, LogStats, int]:
+    """Worker: parse one aligned chunk into (table, stats, number of lines)."""
+    text = _load_chunk(spec)
+    stats = LogStats()
+    table = LogTable()
+    for line_no, entry in iter_log_entries(iter_lines([text]), profile, stats):
+        table.append(entry, line_no)
+    return table, stats, text.count("\n")
+
+
+def _pool_context():
+    # Never fork: the caller runs next to the GTK main loop and other
+    # threads, whose locks a forked child would inherit. The jobs are file
+    # offsets or document slices, cheap to pickle, and forkserver workers
+    # start from a server that has already imported this module
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _result(future, task):
+    """Wait for a future while honouring task cancellation."""
+    while True:
+        try:
+            return future.result(timeout=0.1)
+        except concurrent.futures.TimeoutError:
+            if task:
+                task.check_cancelled()
+
+
+def map_chunks(func, jobs: Iterable[tuple], workers: Optional[int] = None, task=None) -> Iterator[Any]:
+    """
+    Run func(*job) for every job in a process pool, yielding results in order.
+
+    At most two jobs per worker are queued at a time, so the chunks handed
+    to the pool never add up to a copy of the whole input.
+    """
+    workers = workers or os.cpu_count() or 1
+    kwargs = {"mp_context": _pool_context()} if sys.version_info >= (3, 7) else {}
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, **kwargs)
+    pending = collections.deque()
+    try:
+        for job in jobs:
+            pending.append(executor.submit(func, *job))
+            if len(pending) >= 2 * workers:
+                yield _result(pending.popleft(), task)
+        while pending:
+            yield _result(pending.popleft(), task)
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _read_head(text: Optional[str], path: Optional[str], encoding: str) -> List[str]:
+    """The lines used for profile detection."""
+    if text is not None:
+        chunks = (text[i:i + READ_CHUNK_SIZE] for i in range(0, len(text), READ_CHUNK_SIZE))
+        return list(itertools.islice(iter_lines(chunks), DETECT_SAMPLE_LINES))
+    with open(path, "r", encoding=encoding, errors="replace") as f:
+        return list(itertools.islice(f, DETECT_SAMPLE_LINES))
+
+
+def _read_chunks(text: Optional[str], path: Optional[str], encoding: str, task=None,
+                 size: Optional[int] = None, start: int = 0) -> Iterator[str]:
+    """
+    Text of a document or file in READ_CHUNK_SIZE pieces, reporting progress.
+
+    Files are read from byte offset start up to size (default: the size
+    when reading starts), so a log that grows meanwhile is cut off at a
+    known point.
+    """
+    if text is not None:
+        for i in range(0, len(text), READ_CHUNK_SIZE):
+            if task:
+                task.report_progress(i / len(text))
+            yield text[i:i + READ_CHUNK_SIZE]
+        return
+    decoder = codecs.getincrementaldecoder(encoding)("replace")
+    with open(path, "rb") as f:
+        end = os.fstat(f.fileno()).st_size if size is None else size
+        total = (end - start) or 1
+        f.seek(start)
+        pos = start
+        while pos < end:
+            data = f.read(min(READ_CHUNK_SIZE, end - pos))
+            if not data:
+                break
+            pos += len(data)
+            if task:
+                task.report_progress(min((pos - start) / total, 1.0))
+            yield decoder.decode(data)
+    yield decoder.decode(b"", True)
+
+
+def _parallel_plan(text: Optional[str], path: Optional[str], encoding: str, workers: int,
+                   size: Optional[int] = None):
+    """
+    Detect the profile(s) and cut the input into chunks aligned to event starts.
+
+    Returns (profiles, chunk specs, end offset of each chunk, size), or None
+    when the input should be parsed serially.
+    """
+    if text is not None:
+        size = len(text)
+    elif size is None:
+        size = os.path.getsize(path)
+    # Byte-level splitting needs "\n" to be a single byte (not UTF-16/32)
+    splittable = text is not None or "\n".encode(encoding, "replace") == b"\n"
+    if workers < 2 or size < PARALLEL_MIN_SIZE or not splittable:
+        return None
+
+    profiles = detect_profiles(_read_head(text, path, encoding))
+    match = ProfileDispatcher(profiles).regex.match
+    if text is not None:
+        points = _split_points(size, PARALLEL_CHUNK_SIZE, lambda pos: _event_start_in_text(text, pos, match))
+    else:
+        with open(path, "rb") as f:
+            points = _split_points(size, PARALLEL_CHUNK_SIZE,
+                                   lambda pos: _event_start_in_file(f, pos, encoding, match))
+    spans = list(zip(points, points[1:]))
+    # Slice documents lazily so only the chunks in flight are copied
+    specs = ((text[start:end] if text is not None else None, path, encoding, start, end)
+             for start, end in spans)
+    return profiles, specs, [end for _, end in spans], size
+
+
+def _map_plan(func, plan, args: tuple, workers: int, task=None) -> Iterator[Any]:
+    """Run func(spec, profiles, *args) over a _parallel_plan() in order, reporting progress."""
+    profiles, specs, ends, size = plan
+    results = map_chunks(func, ((spec, profiles) + args for spec in specs), workers, task)
+    try:
+        for index, result in enumerate(results):
+            if task:
+                task.check_cancelled()
+                task.report_progress(ends[index] / size)
+            yield result
+    finally:
+        results.close()  # Shuts the pool down when cancelled
+
+
+def convert_log_stream(write, text: Optional[str] = None, path: Optional[str] = None,
+                       encoding: str = "utf-8", ndjson: bool = False,
+                       workers: Optional[int] = None, task=None,
+                       stats: Optional[LogStats] = None, size: Optional[int] = None) -> int:
+    """
+    Convert a log document (text) or file (path) to JSON, handing the
+    output to write() in blocks.
+
+    Inputs over PARALLEL_MIN_SIZE are cut into chunks aligned to event
+    starts of the detected profile(s) and parsed by a process pool; the
+    output is identical to the serial stream_log_json(). Counters are
+    added to stats when given. Only the first size bytes of a file are
+    read when size is given (see log_checkpoint()).
+
+    Returns:
+        Number of events converted. Nothing is written when it is 0.
+    """
+    workers = workers or os.cpu_count() or 1
+    plan = _parallel_plan(text, path, encoding, workers, size)
+    if plan is None:
+        lines = iter_lines(_read_chunks(text, path, encoding, task, size))
+        return stream_log_json(lines, write, ndjson, task=task, stats=stats)
+
+    count = 0
+    results = _map_plan(_convert_chunk, plan, (ndjson,), workers, task)
+    try:
+        for chunk_stats, body in results:
+            if stats is not None:
+                stats.merge(chunk_stats)
+            if not chunk_stats.events:
+                continue
+            if not ndjson:
+                body = ("[\n" if not count else ",\n") + body
+            count += chunk_stats.events
+            for i in range(0, len(body), STREAM_BLOCK_SIZE):
+                write(body[i:i + STREAM_BLOCK_SIZE])
+    finally:
+        results.close()
+    if count and not ndjson:
+        write("\n]")
+    return count
+
+
+def build_log_table(text: Optional[str] = None, path: Optional[str] = None,
+                    encoding: str = "utf-8", workers: Optional[int] = None, task=None,
+                    stats: Optional[LogStats] = None, size: Optional[int] = None) -> LogTable:
+    """
+    Parse a log document (text) or file (path) into a columnar LogTable.
+
+    Uses the same serial/parallel split (and size limit) as
+    convert_log_stream(); row line numbers refer to the whole input.
+    """
+    workers = workers or os.cpu_count() or 1
+    table = LogTable()
+    plan = _parallel_plan(text, path, encoding, workers, size)
+    if plan is None:
+        lines = iter_lines(_read_chunks(text, path, encoding, task, size))
+        for line_no, entry in iter_log_entries(lines, stats=stats):
+            table.append(entry, line_no)
+            if task and not table.count & 0xFFF:
+                task.check_cancelled()
+        return table
+
+    line_offset = 0
+    results = _map_plan(_table_chunk, plan, (), workers, task)
+    try:
+        for chunk_table, chunk_stats, line_count in results:
+            table.extend(chunk_table, line_offset)
+            line_offset += line_count
+            if stats is not None:
+                stats.merge(chunk_stats)
+    finally:
+        results.close()
+    return table
+
+
+
+# --- Incremental re-parsing ---
+
+# Leading bytes compared to tell an appended-to file from a rewritten one
+CHECKPOINT_HEAD_SIZE = 4096
+
+# How far back from the end a checkpoint looks for the start of the last event
+CHECKPOINT_SCAN_LIMIT = 16 * 1024 * 1024
+
+# Bytes read at a time while scanning backwards
+_TAIL_BLOCK_SIZE = 64 * 1024
+
+
+@dataclasses.dataclass
+class LogCheckpoint:
+    """
+    Parser state at the end of a log file, so a grown file is only parsed from there.
+
+    The last event may still be growing (a stack trace being written), so it
+    stays pending: offset is the byte offset of its first line, and resuming
+    parses from there, re-reading it together with the appended text.
+    """
+    path: str
+    encoding: str
+    size: int                   # Bytes parsed
+    head: bytes                 # First bytes of the file, to notice rewrites/rotation
+    profiles: List[LogProfile]
+    offset: int                 # Byte offset of the pending event
+    pending: LogEntry           # The pending event as parsed so far
+    stats: LogStats             # Counters of the events before it
+    line: Optional[int] = None  # Line of the pending event, when known
+
+    def current_size(self) -> Optional[int]:
+        """Size of the file if it has only been appended to since the checkpoint, else None."""
+        try:
+            with open(self.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                head = f.read(len(self.head))
+        except OSError:
+            return None
+        if size < self.size or head != self.head:
+            return None
+        return size
+
+    def output_tail(self, ndjson: bool = False) -> str:
+        """
+        The end of the JSON output this checkpoint was taken for that a
+        resumed conversion replaces: the pending event and the closing bracket.
+        """
+        event = self.pending.to_ecs_dict()
+        if ndjson:
+            return json.JSONEncoder().encode(event) + "\n"
+        body = json.JSONEncoder(indent=2).encode([event])[2:-2]
+        return (",\n" if self.stats.events else "[\n") + body + "\n]"
+
+
+def _last_event_start(f, size: int, encoding: str, match) -> Optional[int]:
+    """Byte offset of the last line before size that begins an event (None: not found)."""
+    end = size
+    carry = b""  # Start of the line cut by the previous block
+    while end > 0 and size - end < CHECKPOINT_SCAN_LIMIT:
+        start = max(0, end - _TAIL_BLOCK_SIZE)
+        f.seek(start)
+        data = f.read(end - start) + carry
+        lines = data.split(b"\n")
+        carry = lines.pop(0) if start > 0 else b""
+        pos = start + len(data)
+        for raw in reversed(lines):
+            pos -= len(raw)
+            line = raw.decode(encoding, "replace").strip()
+            if line and match(line):
+                return pos
+            pos -= 1
+        end = start
+    return None
+
+
+def log_checkpoint(path: str, encoding: str, size: int, stats: LogStats,
+                   profiles: Optional[List[LogProfile]] = None,
+                   line: Optional[int] = None) -> Optional[LogCheckpoint]:
+    """
+    Checkpoint a parse of the first size bytes of path.
+
+    Args:
+        stats: Counters of that parse
+        profiles: The profiles it used (detected again when None)
+        line: Line number of its last event, if known
+
+    Returns:
+        None when the file cannot be resumed (no event start found near the
+        end, or an encoding where "\n" is not a single byte)
+    """
+    if "\n".encode(encoding, "replace") != b"\n":
+        return None
+    if profiles is None:
+        profiles = detect_profiles(_read_head(None, path, encoding))
+    match = ProfileDispatcher(profiles).regex.match
+    with open(path, "rb") as f:
+        offset = _last_event_start(f, size, encoding, match)
+        if offset is None:
+            return None
+        f.seek(0)
+        head = f.read(min(CHECKPOINT_HEAD_SIZE, size))
+        f.seek(offset)
+        data = f.read(size - offset)
+
+    tail = LogStats()
+    entries = list(iter_log_entries(iter_lines([data.decode(encoding, "replace")]), profiles, tail))
+    if len(entries) != 1:
+        return None
+    before = LogStats()
+    before.merge(stats)
+    before.subtract(tail)
+    return LogCheckpoint(path, encoding, size, head, profiles, offset, entries[0][1], before, line)
+
+
+def _resume_size(checkpoint: LogCheckpoint) -> int:
+    size = checkpoint.current_size()
+    if size is None:
+        raise ValueError(f"{os.path.basename(checkpoint.path)} was replaced or truncated")
+    return size
+
+
+def resume_log_stream(write, checkpoint: LogCheckpoint, ndjson: bool = False, task=None,
+                      stats: Optional[LogStats] = None) -> Tuple[int, Optional[LogCheckpoint]]:
+    """
+    Convert only what was appended to a log file since checkpoint.
+
+    The output continues one that ended with checkpoint.output_tail(ndjson),
+    which the caller removes first: the pending event is written again, then
+    the new ones. stats receives the counters of the whole file.
+
+    Returns:
+        (events written, checkpoint for the next call)
+    Raises:
+        ValueError if the file was rewritten instead of appended to
+    """
+    size = _resume_size(checkpoint)
+    run = LogStats()
+    lines = iter_lines(_read_chunks(None, checkpoint.path, checkpoint.encoding, task, size, checkpoint.offset))
+    count = write_json(iter_log_events(lines, checkpoint.profiles, run), write, ndjson, task,
+                       continued=checkpoint.stats.events > 0)
+    total = LogStats()
+    total.merge(checkpoint.stats)
+    total.merge(run)
+    if stats is not None:
+        stats.merge(total)
+    return count, log_checkpoint(checkpoint.path, checkpoint.encoding, size, total, checkpoint.profiles)
+
+
+def resume_log_table(checkpoint: LogCheckpoint, task=None,
+                     stats: Optional[LogStats] = None) -> Tuple[LogTable, Optional[LogCheckpoint]]:
+    """
+    Parse what was appended to a log file since checkpoint into a table.
+
+    The returned rows replace the last row (the pending event) of the table
+    the checkpoint was taken for, and carry line numbers of the whole file:
+
+        table.truncate(table.count - 1)
+        table.extend(rows)
+
+    stats receives the counters of the whole file.
+
+    Raises:
+        ValueError if the file was rewritten instead of appended to
+    """
+    size = _resume_size(checkpoint)
+    run = LogStats()
+    rows = LogTable()
+    first_line = checkpoint.line or 0
+    lines = iter_lines(_read_chunks(None, checkpoint.path, checkpoint.encoding, task, size, checkpoint.offset))
+    for line_no, entry in iter_log_entries(lines, checkpoint.profiles, run):
+        rows.append(entry, first_line + line_no)
+        if task and not rows.count & 0xFFF:
+            task.check_cancelled()
+    total = LogStats()
+    total.merge(checkpoint.stats)
+    total.merge(run)
+    if stats is not None:
+        stats.merge(total)
+    line = rows.lines[-1] if rows.count else None
+    return rows, log_checkpoint(checkpoint.path, checkpoint.encoding, size, total, checkpoint.profiles, line)
+
+
+# --- Profile benchmark ---
+
+# Lines of the current document the profile benchmark runs on
+PROFILE_SAMPLE_LINES = 20000
+
+
+@dataclasses.dataclass
+class ProfileBenchmark:
+    """How one profile fares on a sample."""
+    profile: LogProfile
+    lines: int = 0                # Non-blank sample lines
+    matched: int = 0              # ... starting an event of this profile
+    events: int = 0
+    timestamp_failures: int = 0
+    seconds: float = 0.0          # Best parse time of the whole sample
+
+    @property
+    def match_rate(self) -> float:
+        return self.matched / self.lines if self.lines else 0.0
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+
+def benchmark_profile(profile: LogProfile, lines: List[str], rounds: int = 3, task=None) -> ProfileBenchmark:
+    """Parse lines with profile only (no detection), keeping the fastest of rounds runs."""
+    sample = [line.strip() for line in lines if line.strip()]
+    match = profile.regex.match
+    result = ProfileBenchmark(profile, len(sample), sum(1 for line in sample if match(line)))
+    for _ in range(rounds):
+        if task:
+            task.check_cancelled()
+        stats = LogStats()
+        started = time.perf_counter()
+        for _ in iter_log_entries(lines, profile, stats):
+            pass
+        elapsed = time.perf_counter() - started
+        if not result.seconds or elapsed < result.seconds:
+            result.seconds = elapsed
+    result.events = stats.events
+    result.timestamp_failures = stats.timestamp_failures
+    return result
+
+
+def format_profile_report(results: List[ProfileBenchmark], errors: List[str] = ()) -> str:
+    """Plain-text table of benchmark results, best match first, then load errors."""
+    rows = sorted(results, key=lambda r: (-r.match_rate, -r.lines_per_second))
+    width = max([len(r.profile.name) for r in rows] + [7])
+    out = [f"{'Profile':<{width}}  {'Source':<10} {'Match':>7} {'Lines/s':>12} {'Events':>9} {'TS fail':>8}"]
+    for r in rows:
+        out.append(f"{r.profile.name:<{width}}  {r.profile.source_type:<10} {r.match_rate:>7.1%} "
+                   f"{r.lines_per_second:>12,.0f} {r.events:>9} {r.timestamp_failures:>8}")
+    if rows:
+        out.append("")
+        out.append(f"{rows[0].lines} non-blank sample lines; best of several runs.")
+    if errors:
+        out.append("")
+        out.append(f"Profiles not loaded (from {USER_PROFILES_DIR}):")
+        out.extend(f"  {error}" for error in errors)
+    return "\n".join(out) + "\n"
+
+# json_stream.reformat() options of each format_json() mode
+JSON_FORMATS = {
+    "pretty": {"indent": 4},
+    "minify": {"indent": None, "separators": (",", ":")},
+    "canonical": {"indent": None, "separators": (",", ":"), "sort_keys": True},
+}
+
+def format_json(text, mode="pretty"):
+    """
+    Formats a JSON string: "pretty" (4-space indentation), "minify" or
+    "canonical" (minified, keys sorted).
+    Returns: (success: bool, content: str, error: str)
+    """
+    try:
+        if not text.strip():
+            return False, "", "Empty selection"
+        
+        # Token-level: same output as json.dumps(json.loads(text), ...)
+        formatted = json_stream.format_text(text, **JSON_FORMATS[mode])
+        return True, formatted, None
+    except json.JSONDecodeError as e:
+        return False, "", f"Invalid JSON: {e}"
+
+def convert_to_json(text, ndjson=False):
+    """
+    Wrapper for Smart Log Engine to match Window interface.
+    Returns: (success, json_string, error_msg)
+    """
+    parts = []
+    try:
+        count = stream_log_json(text.splitlines(), parts.append, ndjson)
+    except Exception as e:
+        return False, "", str(e)
+
+    # Handle empty result
+    if not count:
+        return False, "", "No log entries found"
+    return True, "".join(parts), None
+
+
+# --- Previous Utils (Preserved) ---
+
+def detect_language_by_content(text):
+    """
+    Analyzes text content to guess the programming language.
+    Returns a GtkSourceView language ID or None.
+    """
+    text = text.strip()
+    if not text:
+        return None
+        
+    # 1. Shebang (Highest Priority)
+    first_line = text.splitlines()[0]
+    if first_line.startswith("#!"):
+        if "python" in first_line: return "python"
+        if "bash" in first_line or "sh" in first_line: return "sh"
+        if "node" in first_line: return "js"
+        if "perl" in first_line: return "perl"
+        if "ruby" in first_line: return "ruby"
+        if "php" in first_line: return "php"
+
+    # 2. Strong Structure Indicators (Go, Java, C++, Python Defs, XML/HTML)
+    sample = text[:1500]
+    
+    # Go (Strong) - Check BEFORE Java since both use 'package'
+    if "package main" in sample and "func " in sample: return "go"
+    if 'import "' in sample and "func " in sample: return "go"
+    
+    # Java (Strong)
+    if "public class " in sample and "{" in sample: return "java"
+    if "public static void main" in sample: return "java"
+    if "package " in sample and ";" in sample and "func " not in sample: return "java"
+    
+    # Rust (Strong) - Check before JS since both use 'fn'/'let'
+    if "fn main()" in sample and "{" in sample: return "rust"
+    if "let mut " in sample: return "rust"
+    if "println!(" in sample or "eprintln!(" in sample: return "rust"
+    if re.search(r'fn\s+\w+\s*\([^)]*\)\s*(->\s*\w+)?\s*\{', sample): return "rust"
+    
+    # Haskell (Strong)
+    if ":: IO ()" in sample: return "haskell"
+    if "= do" in sample and "let " in sample: return "haskell"
+    if "putStrLn" in sample or "getLine" in sample: return "haskell"
+    if re.search(r'^\w+\s*::\s*\w+', sample, re.MULTILINE): return "haskell"
+    
+    # Lisp/Scheme (Strong)
+    if "(defun " in sample or "(define " in sample: return "commonlisp"
+    if "(let (" in sample or "(let* (" in sample: return "commonlisp"
+    if "(format " in sample and "~" in sample: return "commonlisp"
+    if re.search(r'^\s*\(defun\s+\w+', sample, re.MULTILINE): return "commonlisp"
+    
+    # Assembly (NASM/x86)
+    if "section .data" in sample or "section .text" in sample: return "nasm"
+    if "global _start" in sample or "_start:" in sample: return "nasm"
+    if re.search(r'\bmov\s+(eax|rax|ebx|rbx|ecx|rcx|edx|rdx)', sample): return "nasm"
+    if "syscall" in sample and "mov " in sample: return "nasm"
+    
+    # Ruby (Strong)
+    if "puts " in sample or "puts(" in sample: return "ruby"
+    if re.search(r'^def\s+\w+', sample, re.MULTILINE) and "\nend" in sample: return "ruby"
+    if re.search(r'^class\s+[A-Z]\w*', sample, re.MULTILINE) and "\nend" in sample: return "ruby"
+    if "require '" in sample or 'require "' in sample: return "ruby"
+    if "attr_accessor" in sample or "attr_reader" in sample: return "ruby"
+    if ".each do |" in sample or ".map do |" in sample: return "ruby"
+    
+    # C/C++ Includes (Strong)
+    if "#include <iostream>" in sample: return "cpp"
+    if "#include <vector>" in sample: return "cpp"
+    if "using namespace std;" in sample: return "cpp"
+    if "#include <" in sample and ".h>" in sample: return "c"
+    
+    # Python Imports/Defs (Strong)
+    if re.search(r'^import [a-zA-Z0-9_]+', sample, re.MULTILINE): return "python"
+    if re.search(r'^from [a-zA-Z0-9_]+ import', sample, re.MULTILINE): return "python"
+    if re.search(r'def [a-zA-Z0-9_]+\(', sample): return "python"
+    if re.search(r'class [a-zA-Z0-9_]+(\(|:)', sample): return "python"
+    if "if __name__ == " in sample: return "python"
+
+    # HTML/XML Tags (Strong, if well-formed)
+    if "<" in text and ">" in text:
+        if re.search(r'<[a-zA-Z0-9_-]+.*?>', text):
+             if "</body>" in text or "</div>" in text or "<script" in text or "<br" in text or "<p>" in text: return "html"
+             # If strictly XML like, return XML. But C includes might trip this if logical operators are used.
+             pass
+
+    # 3. System (Gio) Content Sniffing
+    import gi
+    try:
+        gi.require_version('GtkSource', '4')
+    except ValueError:
+        gi.require_version('GtkSource', '3.0')
+    from gi.repository import Gio, GtkSource
+
+    data = text.encode("utf-8")
+    content_type, uncertain = Gio.content_type_guess(None, data)
+    
+    # If Gio is confident and it's not just generic text
+    if not uncertain and content_type != "text/plain":
+        # Exception: Gio often sees C++ or even Python/Java as partial C source.
+        # We allow falling through for C/C++ types to let our strict/loose heuristics confirm.
+        if content_type in ["text/x-csrc", "text/x-c++src", "text/x-chdr"]:
+            pass # Fall through to heuristics
+        else:
+            manager = GtkSource.LanguageManager.get_default()
+            language = manager.guess_language(None, content_type)
+            if language:
+                return language.get_id()
+
+    # 4. JSON
+    if (text.startswith("{") and text.endswith("}")) or \
+       (text.startswith("[") and text.endswith("]")):
+        try:
+            import string
+            no_space = "".join(text.split())
+            if no_space == "{}" or no_space == "[]": return None
+            json.loads(text)
+            return "json"
+        except:
+             if text.startswith("{") and re.search(r'"[^"]*"\s*:', text): return "json"
+             elif text.startswith("["): return "json"
+
+    # 5. Looser Keyword Heuristics (Fallback)
+    
+    # C/C++ bodies
+    if "int main(" in sample and "{" in sample:
+        if "std::" in sample or "cout <<" in sample: return "cpp"
+        return "c"
+    if "printf(" in sample and ";" in sample: return "c"
+    if "std::" in sample or "cout <<" in sample: return "cpp"
+
+    # Java System.out
+    if "System.out.println" in sample: return "java"
+
+    # Python Loose (Strict Regex required to avoid prose matches)
+    # Match 'for x in y:' on a SINGLE line
+    if re.search(r'^\s*for\s+[a-zA-Z0-9_, ]+\s+in\s+.+:\s*$', sample, re.MULTILINE): return "python"
+    # Match 'print("...")' but NOT 'System.out.print('
+    if re.search(r'(^|\s)print\s*\(["\']', sample): return "python"
+
+    # JavaScript
+    if "function " in sample and "{" in sample: return "js"
+    if "console.log(" in sample: return "js"
+    if "const " in sample and "=" in sample: return "js"
+    if "let " in sample and "=" in sample: return "js"
+    if "document." in sample or "window." in sample: return "js"
+            
+    # CSS
+    if "body {" in sample or ".class" in sample or "div {" in sample:
+        if "{" in sample and ":" in sample and ";" in sample: return "css"
+    if "@media" in sample or "@import" in sample: return "css"
+
+    # Markdown
+    if re.search(r'^#\s', sample, re.MULTILINE) or re.search(r'^\*\*.*\*\*$', sample, re.MULTILINE):
+         return "markdown"
+
+    # XML Fallback (Last resort)
+    if "<" in text and ">" in text:
+        if re.search(r'<[a-zA-Z0-9_-]+.*?>', text):
+             if "</body>" in text or "</div>" in text: return "html"
+             # Only return xml if it really looks like xml structure
+             if "<?xml" in text: return "xml"
+             # Don't default to XML for random brackets in text
+             
+    return None
+
+
+def format_xml(text):
+    """
+    Formats an XML string with 2-space indentation (minidom's layout).
+    Returns: (success: bool, content: str, error: str)
+    """
+    try:
+        if not text.strip():
+            return False, "", "Empty selection"
+
+        # Streamed through expat: no DOM, text nodes kept as written
+        formatted = xml_stream.format_text(text, indent="  ")
+        return True, formatted, None
+    except Exception as e:
+         return False, "", f"Invalid XML: {e}"
+
+def generate_hex_dump(text):
+    """
+    Generates a canonical hex dump of the provided text (utf-8 bytes).
+    Format: Offset | Hex Bytes | ASCII
+    """
+    try:
+        data = text.encode("utf-8")
+        result = []
+        chunk_size = 16
+        
+        for i in range(0, len(data), chunk_size):
+            chunk = data[i:i+chunk_size]
+            
+            # Offset
+            offset = f"{i:08x}"
+            
+            # Hex
+            hex_bytes = " ".join(f"{b:02x}" for b in chunk)
+            padding = "   " * (chunk_size - len(chunk))
+            
+            # ASCII
+            ascii_repr = ""
+            for b in chunk:
+                if 32 <= b <= 126:
+                    ascii_repr += chr(b)
+                else:
+                    ascii_repr += "."
+            
+            result.append(f"{offset}  {hex_bytes}{padding}  |{ascii_repr}|")
+            
+    except Exception as e:
+        return f"Error generating hex dump: {e}"
+
+def calculate_hashes(text):
+    """
+    Calculates MD5, SHA1, SHA256, SHA512 hashes of the text (as UTF-8).
+    Returns: dict {algo_name: hex_digest}
+    """
+    if not text:
+        return {}
+    return hashing.hash_text(text)
+
+def transform_text(text, mode):
+    """
+    Transforms text based on the mode (a transforms.TRANSFORMS key).
+    Modes: base64_enc, base64_dec, url_enc, url_dec, hex_enc, hex_dec,
+    qp_enc, qp_dec, rot13, rot47
+    Returns: (success, result, error)
+    """
+    if not text:
+        return True, "", None
+
+    if mode not in transforms.TRANSFORMS:
+        return False, None, f"Unknown mode: {mode}"
+    try:
+        return True, transforms.transform_text(text, mode), None
+    except Exception as e:
+        return False, None, str(e)
+
+
+if __name__ == "__main__":
+    # Benchmark every log profile: python -m zenpad.analysis sample.log [lines]
+    path = sys.argv[1]
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else PROFILE_SAMPLE_LINES
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        sample = list(itertools.islice(f, limit))
+    user_profiles, load_errors = load_user_profiles()
+    print(format_profile_report([benchmark_profile(p, sample) for p in user_profiles + LOG_PROFILES],
+                                load_errors), end="")
@@ -1,75 +1,428 @@
-import gi
-gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk
-import difflib
-import os
-
-class DiffDialog(Gtk.Dialog):
-    def __init__(self, parent, current_page_num, tabs_list):
-        super().__init__(title="Compare Documents", transient_for=parent, flags=0)
-        self.add_buttons(
-            Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
-            "Compare", Gtk.ResponseType.OK
-        )
-        
-        self.set_default_size(400, 150)
-        self.set_border_width(10)
-        
-        box = self.get_content_area()
-        box.set_spacing(10)
-        
-        # Label
-        lbl = Gtk.Label(label="Select document to compare with current tab:")
-        lbl.set_halign(Gtk.Align.START)
-        box.add(lbl)
-        
-        # Combo Box
-        self.combo = Gtk.ComboBoxText()
-        self.tabs_list = tabs_list
-        self.current_idx = current_page_num
-        
-        active_idx = 0
-        valid_count = 0
-        
-        for idx, title in enumerate(tabs_list):
-            if idx == current_page_num:
-                continue # Skip self
-            
-            self.combo.append(str(idx), title)
-            valid_count += 1
-            
-        if valid_count > 0:
-            self.combo.set_active(0)
-            self.has_options = True
-        else:
-            self.combo.append("-1", "No other tabs open")
-            self.combo.set_active(0)
-            self.combo.set_sensitive(False)
-            self.has_options = False
-            
-        box.add(self.combo)
-        self.show_all()
-
-    def get_selected_page_index(self):
-        if not self.has_options:
-            return -1
-        active_id = self.combo.get_active_id()
-        if active_id:
-            return int(active_id)
-        return -1
-
-def generate_diff(text_a, text_b, name_a, name_b):
-    """
-    Generates a unified diff string.
-    """
-    lines_a = text_a.splitlines(keepends=True)
-    lines_b = text_b.splitlines(keepends=True)
-    
-    diff = difflib.unified_diff(
-        lines_a, lines_b,
-        fromfile=name_a,
-        tofile=name_b,
-        lineterm=""
-    )
-    
-    return "".join(diff)
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk, GLib, Pango
+import os
+
+from zenpad import line_diff
+from zenpad.tasks import BackgroundTask
+
+# Row colors: background of changed lines, of their changed words, and of
+# the empty side of an insertion or deletion
+REMOVED_BACKGROUND = "#ffe4e4"
+REMOVED_HIGHLIGHT = "#ffb0b0"
+ADDED_BACKGROUND = "#e2f7e2"
+ADDED_HIGHLIGHT = "#a8e6a8"
+FILLER_BACKGROUND = "#eeeeee"
+CHANGED_FOREGROUND = "#000000"  # Readable on the colors above in dark themes too
+
+# Rows moved per mouse wheel step
+SCROLL_STEP = 3
+
+# Store columns of each pane: line number, text markup, background, foreground, line (-1 on fillers)
+COL_NUMBER, COL_MARKUP, COL_BACKGROUND, COL_FOREGROUND, COL_LINE = range(5)
+
+class DiffDialog(Gtk.Dialog):
+    def __init__(self, parent, current_page_num, tabs_list):
+        super().__init__(title="Compare Documents", transient_for=parent, flags=0)
+        self.add_buttons(
+            Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
+            "Compare", Gtk.ResponseType.OK
+        )
+        
+        self.set_default_size(400, 150)
+        self.set_border_width(10)
+        
+        box = self.get_content_area()
+        box.set_spacing(10)
+        
+        # Label
+        lbl = Gtk.Label(label="Select document to compare with current tab:")
+        lbl.set_halign(Gtk.Align.START)
+        box.add(lbl)
+        
+        # Combo Box
+        self.combo = Gtk.ComboBoxText()
+        self.tabs_list = tabs_list
+        self.current_idx = current_page_num
+        
+        active_idx = 0
+        valid_count = 0
+        
+        for idx, title in enumerate(tabs_list):
+            if idx == current_page_num:
+                continue # Skip self
+            
+            self.combo.append(str(idx), title)
+            valid_count += 1
+            
+        if valid_count > 0:
+            self.combo.set_active(0)
+            self.has_options = True
+        else:
+            self.combo.append("-1", "No other tabs open")
+            self.combo.set_active(0)
+            self.combo.set_sensitive(False)
+            self.has_options = False
+            
+        box.add(self.combo)
+        self.show_all()
+
+    def get_selected_page_index(self):
+        if not self.has_options:
+            return -1
+        active_id = self.combo.get_active_id()
+        if active_id:
+            return int(active_id)
+        return -1
+
+def generate_diff(text_a, text_b, name_a, name_b, task=None):
+    """
+    Generates a unified diff string.
+    task: Optional BackgroundTask for cancellation
+    """
+    lines_a = text_a.splitlines(keepends=True)
+    lines_b = text_b.splitlines(keepends=True)
+    
+    # The lines keep their line breaks; lineterm ends the ---/+++/@@ header lines
+    diff = line_diff.unified_diff(
+        lines_a, lines_b,
+        fromfile=name_a,
+        tofile=name_b,
+        lineterm="\n",
+        task=task
+    )
+    
+    return "".join(diff)
+
+
+def _line_markup(line, spans, highlight):
+    """Markup of a line (without its line break) with spans on a highlight background"""
+    text = line.rstrip("\r\n")
+    parts = []
+    position = 0
+    for start, end in spans:
+        start, end = min(start, len(text)), min(end, len(text))
+        if end <= start:
+            continue
+        parts.append(GLib.markup_escape_text(text[position:start]))
+        parts.append(f'<span background="{highlight}">{GLib.markup_escape_text(text[start:end])}</span>')
+        position = end
+    parts.append(GLib.markup_escape_text(text[position:]))
+    return "".join(parts)
+
+
+class DiffView(Gtk.Box):
+    """
+    Two documents side by side, aligned on a line_diff.SideBySide.
+
+    Like the log table, each pane's ListStore holds only the rows on
+    screen and one scrollbar moves both panes over the rows, so they
+    always scroll together. The diff, then the changed words of the
+    replaced lines on screen, are computed on BackgroundTasks.
+    """
+
+    def __init__(self, text_a, text_b, name_a, name_b, on_activate=None, on_open=None):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.set_border_width(6)
+        self.name_a = name_a
+        self.name_b = name_b
+        self.on_activate = on_activate  # Called with (0 for a / 1 for b, line) of an activated row
+        self.on_open = on_open  # Called with the unified diff text
+        self.texts = (text_a, text_b)  # Until the diff has split them into lines
+        self.lines_a = self.lines_b = None
+        self.model = None  # line_diff.SideBySide
+        self.offset = 0
+        self.page_size = 1
+        self.intraline = {}  # (line of a, line of b) -> changed ranges of both
+        self.task = None
+        self.intraline_task = None
+
+        # Toolbar
+        bar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        self.previous_button = Gtk.Button(label="Previous Change")
+        self.previous_button.set_tooltip_text("Alt+Up")
+        self.previous_button.connect("clicked", lambda button: self.go_to_change(-1))
+        bar.pack_start(self.previous_button, False, False, 0)
+        self.next_button = Gtk.Button(label="Next Change")
+        self.next_button.set_tooltip_text("Alt+Down")
+        self.next_button.connect("clicked", lambda button: self.go_to_change(1))
+        bar.pack_start(self.next_button, False, False, 0)
+        self.open_button = None
+        if on_open:
+            self.open_button = Gtk.Button(label="Open as Unified Diff")
+            self.open_button.set_tooltip_text("Open the differences as a patch in a new tab")
+            self.open_button.connect("clicked", self.on_open_clicked)
+            bar.pack_start(self.open_button, False, False, 0)
+        self.cancel_button = Gtk.Button(label="Cancel")
+        self.cancel_button.set_no_show_all(True)  # Only while comparing
+        self.cancel_button.connect("clicked", lambda button: self.cancel_diff())
+        bar.pack_end(self.cancel_button, False, False, 0)
+        self.status_label = Gtk.Label()
+        bar.pack_end(self.status_label, False, False, 0)
+        self.pack_start(bar, False, False, 0)
+
+        # Panes; the TreeViews never scroll vertically themselves
+        panes = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6, homogeneous=True)
+        self.stores = []
+        self.views = []
+        self.scrolled = []
+        for side, name in enumerate((name_a, name_b)):
+            store = Gtk.ListStore(str, str, str, str, int)
+            view = Gtk.TreeView(model=store)
+            view.set_headers_visible(False)
+            view.set_enable_search(False)
+            number = Gtk.CellRendererText(xalign=1.0, family="monospace", foreground="#888888")
+            view.append_column(Gtk.TreeViewColumn("Line", number, text=COL_NUMBER))
+            renderer = Gtk.CellRendererText(family="monospace")
+            view.append_column(Gtk.TreeViewColumn(name, renderer, markup=COL_MARKUP,
+                                                  cell_background=COL_BACKGROUND,
+                                                  foreground=COL_FOREGROUND))
+            view.connect("scroll-event", self.on_scroll)
+            view.connect("key-press-event", self.on_key_press)
+            view.connect("row-activated", self.on_row_activated, side)
+
+            scrolled = Gtk.ScrolledWindow()
+            scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.EXTERNAL)
+            scrolled.add(view)
+            if self.scrolled:
+                scrolled.set_hadjustment(self.scrolled[0].get_hadjustment())
+
+            header = Gtk.Label(xalign=0)
+            header.set_markup(f"<b>{GLib.markup_escape_text(name)}</b>")
+            header.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+            pane = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+            pane.pack_start(header, False, False, 0)
+            pane.pack_start(scrolled, True, True, 0)
+            panes.pack_start(pane, True, True, 0)
+            self.stores.append(store)
+            self.views.append(view)
+            self.scrolled.append(scrolled)
+        self.scrolled[0].connect("size-allocate", self.on_size_allocate)
+
+        self.adjustment = Gtk.Adjustment(value=0, lower=0, upper=0,
+                                         step_increment=1, page_increment=1, page_size=1)
+        self.adjustment.connect("value-changed", self.on_adjustment_changed)
+        scrollbar = Gtk.Scrollbar(orientation=Gtk.Orientation.VERTICAL, adjustment=self.adjustment)
+
+        hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        hbox.pack_start(panes, True, True, 0)
+        hbox.pack_start(scrollbar, False, False, 0)
+        self.pack_start(hbox, True, True, 0)
+        self.update_buttons()
+
+    # --- Diff ---
+
+    def start(self):
+        """Compute the diff on a worker thread."""
+        text_a, text_b = self.texts
+
+        def run(task):
+            lines_a = text_a.splitlines(keepends=True)
+            lines_b = text_b.splitlines(keepends=True)
+            opcodes = line_diff.diff_lines(lines_a, lines_b, task=task)
+            return lines_a, lines_b, line_diff.SideBySide(opcodes)
+
+        self.status_label.set_text("Comparing...")
+        self.task = BackgroundTask(run, on_done=self.on_diff_done, on_error=self.on_diff_failed).start()
+        self.update_buttons()
+
+    def cancel_diff(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+            self.status_label.set_text("Comparison cancelled")
+            self.update_buttons()
+
+    def cancel(self):
+        """Stop all work (the view is going away)."""
+        for task in (self.task, self.intraline_task):
+            if task:
+                task.cancel()
+        self.task = self.intraline_task = None
+
+    def on_diff_done(self, result):
+        self.task = None
+        self.texts = None
+        self.lines_a, self.lines_b, self.model = result
+        changes = len(self.model.changes)
+        if changes:
+            self.status_label.set_text(f"{changes:,} changes")
+        else:
+            self.status_label.set_text(f"{self.name_a} and {self.name_b} are identical")
+        self.update_adjustment()
+        self.update_buttons()
+        if changes:
+            self.scroll_to(self.model.changes[0] - self.page_size // 3)
+
+    def on_diff_failed(self, error):
+        self.task = None
+        self.status_label.set_text(f"Comparison failed: {error}")
+        self.update_buttons()
+
+    def update_buttons(self):
+        has_changes = self.model is not None and len(self.model.changes) > 0
+        self.previous_button.set_sensitive(has_changes)
+        self.next_button.set_sensitive(has_changes)
+        if self.open_button:
+            self.open_button.set_sensitive(has_changes)
+        self.cancel_button.set_visible(self.task is not None)
+
+    def on_open_clicked(self, button):
+        self.on_open("".join(line_diff.format_unified(self.lines_a, self.lines_b, self.model.opcodes,
+                                                      self.name_a, self.name_b)))
+
+    # --- Paging ---
+
+    def row_height(self):
+        view = self.views[0]
+        if len(self.stores[0]):
+            rect = view.get_background_area(Gtk.TreePath(0), view.get_column(1))
+            if rect.height > 0:
+                return rect.height
+        _, natural = view.get_column(1).get_cells()[0].get_preferred_height(view)
+        return natural + 2
+
+    def on_size_allocate(self, widget, allocation):
+        hscrollbar = widget.get_hscrollbar()
+        reserved = hscrollbar.get_allocated_height() if hscrollbar.get_visible() else 0
+        page_size = max(1, (allocation.height - reserved) // self.row_height())
+        if page_size != self.page_size:
+            self.page_size = page_size
+            GLib.idle_add(self.update_adjustment)  # Don't touch widgets mid-allocation
+
+    def update_adjustment(self):
+        n = len(self.model) if self.model else 0
+        self.adjustment.configure(min(self.offset, max(0, n - self.page_size)), 0, n,
+                                  1, self.page_size, self.page_size)
+        self.fill_page()
+        return False
+
+    def on_adjustment_changed(self, adjustment):
+        offset = int(adjustment.get_value())
+        if offset != self.offset:
+            self.offset = offset
+            self.fill_page()
+
+    def scroll_to(self, offset):
+        n = len(self.model) if self.model else 0
+        self.adjustment.set_value(max(0, min(offset, n - self.page_size)))
+
+    def fill_page(self):
+        """Load the rows on screen into both panes and ask for the missing intraline ranges."""
+        for store in self.stores:
+            store.clear()
+        model = self.model
+        if model is None:
+            return
+        self.offset = int(self.adjustment.get_value())
+        lines_a, lines_b = self.lines_a, self.lines_b
+        store_a, store_b = self.stores
+        missing = []
+        for row in range(self.offset, min(self.offset + self.page_size, len(model))):
+            tag, i, j = model.row(row)
+            spans_a = spans_b = ()
+            if tag == "replace" and i >= 0 and j >= 0:
+                spans = self.intraline.get((i, j))
+                if spans is None:
+                    missing.append((i, j))
+                else:
+                    spans_a, spans_b = spans
+            if tag == "equal":
+                store_a.append([str(i + 1), GLib.markup_escape_text(lines_a[i].rstrip("\r\n")), None, None, i])
+                store_b.append([str(j + 1), GLib.markup_escape_text(lines_b[j].rstrip("\r\n")), None, None, j])
+                continue
+            if i >= 0:
+                store_a.append([str(i + 1), _line_markup(lines_a[i], spans_a, REMOVED_HIGHLIGHT),
+                                REMOVED_BACKGROUND, CHANGED_FOREGROUND, i])
+            else:
+                store_a.append(["", "", FILLER_BACKGROUND, None, -1])
+            if j >= 0:
+                store_b.append([str(j + 1), _line_markup(lines_b[j], spans_b, ADDED_HIGHLIGHT),
+                                ADDED_BACKGROUND, CHANGED_FOREGROUND, j])
+            else:
+                store_b.append(["", "", FILLER_BACKGROUND, None, -1])
+        if missing:
+            self.compute_intraline(missing)
+
+    def compute_intraline(self, pairs):
+        """Changed words of the replaced lines on screen, on a worker (replacing an outdated request)."""
+        if self.intraline_task:
+            self.intraline_task.cancel()
+        lines_a, lines_b = self.lines_a, self.lines_b
+
+        def run(task):
+            result = {}
+            for i, j in pairs:
+                task.check_cancelled()
+                result[(i, j)] = line_diff.intraline(lines_a[i].rstrip("\r\n"), lines_b[j].rstrip("\r\n"), task)
+            return result
+
+        def on_done(result):
+            self.intraline_task = None
+            self.intraline.update(result)
+            self.fill_page()
+
+        self.intraline_task = BackgroundTask(run, on_done=on_done).start()
+
+    # --- Navigation ---
+
+    def go_to_change(self, direction):
+        """Scroll the next (direction 1) or previous (-1) change to the top third of the panes."""
+        model = self.model
+        if model is None:
+            return
+        current = self.offset + self.page_size // 3
+        row = model.next_change(current) if direction > 0 else model.previous_change(current)
+        if row != -1:
+            self.scroll_to(row - self.page_size // 3)
+
+    def on_scroll(self, widget, event):
+        ok, _, dy = event.get_scroll_deltas()
+        if not ok:
+            dy = {Gdk.ScrollDirection.UP: -1, Gdk.ScrollDirection.DOWN: 1}.get(event.direction, 0)
+        if not dy:
+            return False  # Horizontal scrolling
+        self.scroll_to(self.offset + int(round(dy * SCROLL_STEP)) or (1 if dy > 0 else -1))
+        return True
+
+    def on_key_press(self, widget, event):
+        store = widget.get_model()
+        path, _ = widget.get_cursor()
+        index = path.get_indices()[0] if path else 0
+        last = len(store) - 1
+        key = event.keyval
+        if event.state & Gdk.ModifierType.MOD1_MASK and key in (Gdk.KEY_Up, Gdk.KEY_Down):
+            self.go_to_change(1 if key == Gdk.KEY_Down else -1)
+        elif key == Gdk.KEY_Down and index >= last:
+            self.scroll_to(self.offset + 1)
+        elif key == Gdk.KEY_Up and index <= 0:
+            self.scroll_to(self.offset - 1)
+        elif key == Gdk.KEY_Page_Down:
+            self.scroll_to(self.offset + self.page_size)
+        elif key == Gdk.KEY_Page_Up:
+            self.scroll_to(self.offset - self.page_size)
+        elif key == Gdk.KEY_Home and event.state & Gdk.ModifierType.CONTROL_MASK:
+            self.scroll_to(0)
+        elif key == Gdk.KEY_End and event.state & Gdk.ModifierType.CONTROL_MASK:
+            self.scroll_to(len(self.model) if self.model else 0)
+        else:
+            return False
+        return True
+
+    def on_row_activated(self, view, path, column, side):
+        line = view.get_model()[path][COL_LINE]
+        if self.on_activate and line >= 0:
+            self.on_activate(side, line)
+
+
+class DiffWindow(Gtk.Window):
+    """Utility window hosting a DiffView; closing it cancels the comparison."""
+
+    def __init__(self, parent, text_a, text_b, name_a, name_b, on_activate=None, on_open=None):
+        super().__init__(title=f"Diff: {name_a} vs {name_b}")
+        self.set_default_size(1100, 700)
+        self.set_transient_for(parent)
+        self.diff_view = DiffView(text_a, text_b, name_a, name_b, on_activate, on_open)
+        self.add(self.diff_view)
+        self.connect("destroy", lambda widget: self.diff_view.cancel())
+        self.diff_view.start()
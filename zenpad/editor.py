@@ -1,617 +1,738 @@
-import gi
-import os
-import hashlib
-gi.require_version('Gtk', '3.0')
-try:
-    gi.require_version('GtkSource', '4')
-except ValueError:
-    gi.require_version('GtkSource', '3.0')
-from gi.repository import Gtk, GtkSource, Pango, Gdk
-from zenpad import analysis
-
-# Register custom themes directory
-_themes_dir = os.path.join(os.path.dirname(__file__), "themes")
-if os.path.isdir(_themes_dir):
-    _scheme_manager = GtkSource.StyleSchemeManager.get_default()
-    _scheme_manager.prepend_search_path(_themes_dir)
-
-class EditorTab(Gtk.ScrolledWindow):
-    def __init__(self, search_settings=None):
-        super().__init__()
-        self.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
-        
-        self.buffer = GtkSource.Buffer()
-        self.last_buffer = None
-        self.view = GtkSource.View.new_with_buffer(self.buffer)
-        
-        self.file_path = None
-        self.file_encoding = "UTF-8"  # Track file encoding
-        self.is_binary = False  # True if file is binary
-        self.is_readonly = False  # True if opened read-only (for binary files)
-        self.line_ending = "\n"  # Track line ending (LF, CRLF, CR)
-        
-        # Connect to changed signal for auto-detection
-        self.buffer.connect("changed", self.on_buffer_changed)
-        
-        # Search Context
-        self.search_context = None
-        if search_settings:
-            self.search_context = GtkSource.SearchContext.new(self.buffer, search_settings)
-            self.search_context.set_highlight(True)
-        
-        # Default Settings
-        self.view.set_show_line_numbers(True)
-        self.view.set_auto_indent(True)
-        self.view.set_indent_on_tab(True) # Indent on Tab key
-        if hasattr(self.view, "set_smart_backspace"):
-            self.view.set_smart_backspace(True) # Unindent on Backspace
-        self.view.set_indent_width(-1) # Use tab width for indent width
-        
-        self.view.set_highlight_current_line(True)
-        self.view.set_wrap_mode(Gtk.WrapMode.WORD)
-        self.view.set_left_margin(6)
-        self.view.set_right_margin(6)
-        
-        # Load Default Theme
-        self.set_scheme("tango")
-
-        # Font (Default Monospace)
-        self.font_desc = Pango.FontDescription("Monospace 12")
-        self.view.modify_font(self.font_desc)
-        
-        # Handle scrolling (for zoom-in-out)
-        self.view.connect('scroll-event', self.on_scroll)
-        
-        # Handle smart indentation on Enter
-        self.view.connect("key-press-event", self.on_key_press)
-        
-        # Custom context menu - intercept right-click
-        self.view.connect("button-press-event", self.on_button_press)
-
-        self.add(self.view)
-        self.show_all()
-
-    def on_buffer_changed(self, buffer):
-        """Triggers reliable auto-detection on content change"""
-        # We only auto-detect if we don't have a rigid file path override
-        # Or should we always? User said "Decouple from save state".
-        # Let's run it.
-        self.auto_detect_language()
-
-    def auto_detect_language(self):
-        # Limit to detecting from the first 1000 chars for speed
-        start = self.buffer.get_start_iter()
-        end = self.buffer.get_start_iter()
-        end.forward_chars(1000)
-        text = self.buffer.get_text(start, end, True)
-        
-        detected_id = analysis.detect_language_by_content(text)
-        
-        if detected_id:
-            manager = GtkSource.LanguageManager.get_default()
-            language = manager.get_language(detected_id)
-            current_lang = self.buffer.get_language()
-            
-            # Only switch if different, to avoid thrashing
-            if language and current_lang != language:
-                self.buffer.set_language(language)
-
-    def zoom_in(self):
-        size = self.font_desc.get_size()
-        # Pango size is in pango units (scaled by PANGO_SCALE usually, but string init might be different)
-        # If initialized from string "12", get_size() returns 12 * PANGO_SCALE.
-        
-        # However, checking behavior:
-        # If I set Absolute size, it might be different.
-        # Let's assume standard Pango unit handling.
-        
-        new_size = size + (2 * Pango.SCALE)
-        self.font_desc.set_size(new_size)
-        self.view.modify_font(self.font_desc)
-
-    def zoom_out(self):
-        size = self.font_desc.get_size()
-        new_size = size - (2 * Pango.SCALE)
-        if new_size >= (6 * Pango.SCALE): # Minimum size 6
-            self.font_desc.set_size(new_size)
-            self.view.modify_font(self.font_desc)
-
-    def zoom_reset(self):
-        self.font_desc.set_size(12 * Pango.SCALE)
-        self.view.modify_font(self.font_desc)
-
-    def get_text(self):
-        start_iter = self.buffer.get_start_iter()
-        end_iter = self.buffer.get_end_iter()
-        return self.buffer.get_text(start_iter, end_iter, True)
-
-    def set_text(self, text):
-        self.buffer.set_text(text)
-
-    def set_scheme(self, scheme_id):
-        manager = GtkSource.StyleSchemeManager.get_default()
-        scheme = manager.get_scheme(scheme_id)
-        if scheme:
-            self.buffer.set_style_scheme(scheme)
-
-    def get_cursor_position(self):
-        insert = self.buffer.get_insert()
-        iter = self.buffer.get_iter_at_mark(insert)
-        line = iter.get_line() + 1
-        col = iter.get_line_offset() + 1
-        return line, col
-
-    def detect_language(self, filename):
-        manager = GtkSource.LanguageManager.get_default()
-        language = manager.guess_language(filename, None)
-        if language:
-            self.buffer.set_language(language)
-
-    def on_scroll(self, gpointer, event):
-        if not (event.state & Gdk.ModifierType.CONTROL_MASK):
-            return False
-
-        good, dx, dy = event.get_scroll_deltas()
-
-        if (dy < 0.0):
-            self.zoom_in()
-        elif (dy > 0.0):
-            self.zoom_out()
-
-        return True
-
-    def on_key_press(self, widget, event):
-        """
-        Handles smart indentation on Enter key.
-        Global logic:
-        - Check previous line indentation.
-        - Check for openers: {, [, (, :
-        - Increase indent if opener found.
-        """
-        # Respect Read-Only
-        if not self.view.get_editable():
-            return False
-
-        keyval = event.keyval
-        if keyval in [Gdk.KEY_Return, Gdk.KEY_KP_Enter]:
-            if (event.state & Gdk.ModifierType.SHIFT_MASK) or (event.state & Gdk.ModifierType.CONTROL_MASK):
-                if event.state & Gdk.ModifierType.SHIFT_MASK and keyval == Gdk.KEY_Return:
-                    pass # Allow Shift+Enter
-                elif keyval not in [Gdk.KEY_quotedbl, Gdk.KEY_apostrophe]:
-                     return False # Allow other modified keys
-
-        # Auto-Close Quotes
-        if keyval in [Gdk.KEY_quotedbl, Gdk.KEY_apostrophe]:
-             buff = self.buffer
-             quote_char = '"' if keyval == Gdk.KEY_quotedbl else "'"
-             
-             insert = buff.get_insert()
-             iter_cur = buff.get_iter_at_mark(insert)
-             
-             # Check if there's a selection - wrap selection with quotes
-             if buff.get_has_selection():
-                 start, end = buff.get_selection_bounds()
-                 selected_text = buff.get_text(start, end, False)
-                 buff.begin_user_action()
-                 buff.delete(start, end)
-                 buff.insert_at_cursor(quote_char + selected_text + quote_char)
-                 buff.end_user_action()
-                 return True
-             
-             # Type-Over Logic: If next char is the same quote, just move cursor
-             char_at_cursor = ""
-             if not iter_cur.is_end():
-                 iter_next = iter_cur.copy()
-                 iter_next.forward_char()
-                 char_at_cursor = buff.get_text(iter_cur, iter_next, False)
-             
-             if char_at_cursor == quote_char:
-                 # Move cursor forward instead of typing
-                 iter_cur.forward_char()
-                 buff.place_cursor(iter_cur)
-                 return True
-             
-             # Check context: Only auto-pair when appropriate
-             # Get character before cursor
-             char_before = ""
-             if not iter_cur.is_start():
-                 iter_prev = iter_cur.copy()
-                 iter_prev.backward_char()
-                 char_before = buff.get_text(iter_prev, iter_cur, False)
-             
-             # Characters that indicate we should auto-pair
-             # (at word boundary, after operators, brackets, or whitespace)
-             pair_after_chars = set(" \t\n({[,:;=<>!&|+-*/%^~")
-             # Characters that indicate we should NOT auto-pair after
-             # (alphanumeric - we're likely in the middle of a word)
-             no_pair_after = char_before.isalnum() or char_before == '_'
-             
-             # Check if we're at end of line or followed by appropriate chars
-             should_pair = False
-             pair_before_chars = set(" \t\n)}]:;,")
-             
-             if char_at_cursor == "" or char_at_cursor in pair_before_chars:
-                 # At end of line or followed by whitespace/closing brackets
-                 if char_before == "" or char_before in pair_after_chars or iter_cur.starts_line():
-                     should_pair = True
-                 elif not no_pair_after:
-                     should_pair = True
-             
-             if should_pair:
-                 # Insert the pair
-                 buff.begin_user_action()
-                 buff.insert_at_cursor(quote_char + quote_char)
-                 buff.end_user_action()
-                 
-                 # Move cursor back by 1
-                 insert = buff.get_insert()
-                 iter_cur = buff.get_iter_at_mark(insert)
-                 iter_cur.backward_char()
-                 buff.place_cursor(iter_cur)
-                 return True
-             
-             # Otherwise, just insert single quote (default behavior)
-             return False
-
-        if keyval in [Gdk.KEY_Return, Gdk.KEY_KP_Enter]:
-            if (event.state & Gdk.ModifierType.SHIFT_MASK) or (event.state & Gdk.ModifierType.CONTROL_MASK):
-                return False
-                
-            buff = self.buffer
-            lang = buff.get_language()
-            lang_id = lang.get_id() if lang else None
-            
-            # User Requirement: No language = no smart indentation?
-            # actually, users want smart features even in Untitled buffers if they type code.
-            # So we allow None to fall through to structural checks.
-            # if not lang_id: return False <- REMOVED
-            
-            insert = buff.get_insert()
-            iter_cur = buff.get_iter_at_mark(insert)
-            
-            # Get current line text up to cursor
-            line_num = iter_cur.get_line()
-            iter_start = buff.get_iter_at_line(line_num)
-            line_text = buff.get_text(iter_start, iter_cur, False)
-            
-            # Calculate current indentation
-            indentation = ""
-            for char in line_text:
-                if char in [' ', '\t']:
-                    indentation += char
-                else:
-                    break
-            
-            # Check for structural openers at the end of the text (ignoring trailing whitespace)
-            stripped = line_text.strip()
-            should_indent = False
-            
-            # Check for Enter between braces: {|} -> Expand
-            # Need to peek at the character *after* the cursor
-            char_after = ""
-            if not iter_cur.is_end():
-                iter_next = iter_cur.copy()
-                iter_next.forward_char()
-                char_after = buff.get_text(iter_cur, iter_next, False)
-            
-            is_expansion = False
-            
-            # Language-Aware Logic
-            if stripped:
-                # Group 1: BRACE/BLOCK Languages (C-like, Python, JSON, JS, AND Untitled/None)
-                # We assume generic brace behavior for Plain Text (None)
-                brace_langs = [
-                    "python", "c", "cpp", "chdr", "java", "js", "javascript", "json", "css",
-                    "rust", "go", "text", "haskell", "commonlisp", "scheme", "lisp",
-                    "nasm", "asm", "gas", "masm"
-                ]
-                
-                is_brace_lang = (lang_id is None) or (lang_id in brace_langs) or ("json" in lang_id) or ("python" in lang_id) or (lang_id == "text")
-                
-                if is_brace_lang:
-                    last_char = stripped[-1]
-                    if last_char in ['{', '[', '(', ':']:
-                        should_indent = True
-                        
-                        # Check for expansion: {|} or [|]
-                        if last_char == '{' and char_after == '}': is_expansion = True
-                        if last_char == '[' and char_after == ']': is_expansion = True
-                        if last_char == '(' and char_after == ')': is_expansion = True
-                
-                # Group 2: SHELL (Bash) - Strict Check
-                if lang_id in ["sh", "bash", "zsh", "application-x-shellscript"]:
-                    tokens = stripped.split()
-                    if tokens:
-                        last = tokens[-1]
-                        if last in ["then", "do", "else", "elif"]:
-                            should_indent = True
-                            
-                # Group 3: TAG Languages (HTML, XML)
-                tag_langs = ["xml", "html", "markdown", "php"]
-                if lang_id in tag_langs:
-                    if stripped.endswith(">") and not stripped.endswith("/>") and not stripped.endswith("?>") and not stripped.endswith("-->"):
-                        # Check against closing tag
-                        r_index = stripped.rfind("<")
-                        if r_index != -1:
-                            tag_content = stripped[r_index:]
-                            if not tag_content.startswith("</"):
-                                should_indent = True
-                                # XML expansion <t>|</t> ?
-                                # Complex to check char_after for </tag> without parsing.
-                                # Leaving XML expansion simple for now.
-                
-                # Group 4: Haskell (do, where, let, of)
-                if lang_id == "haskell":
-                    tokens = stripped.split()
-                    if tokens:
-                        last = tokens[-1]
-                        if last in ["do", "where", "let", "of", "->"]:
-                            should_indent = True
-
-            # Construct insertion
-            to_insert = "\n" + indentation
-            
-            indent_str = ""
-            tab_width = self.view.get_tab_width()
-            if self.view.get_insert_spaces_instead_of_tabs():
-                 indent_str = " " * tab_width
-            else:
-                 indent_str = "\t"
-
-            if should_indent:
-                 to_insert += indent_str
-            
-            if is_expansion:
-                # We are expanding {|} to:
-                # {
-                #     |
-                # }
-                # indentation holds the BASE indent (of the { line)
-                # to_insert holds \n + BASE + INDENT
-                
-                # We need to append: \n + BASE + (closing brace)
-                # But wait, we are inserting AT cursor.
-                # So we insert: \n + BASE + INDENT + \n + BASE
-                # And assume the } is already there (char_after).
-                # Wait, if we insert text, the } moves.
-                
-                second_line = "\n" + indentation
-                to_insert += second_line
-                
-                # Insert
-                buff.begin_user_action()
-                buff.insert(iter_cur, to_insert)
-                buff.end_user_action()
-                
-                # Now we need to move cursor UP one line and to the end of that line
-                # (which is the indented position)
-                
-                # Current pos is after the inserted text (before the })
-                insert_mark = buff.get_insert()
-                iter_final = buff.get_iter_at_mark(insert_mark)
-                iter_final.backward_chars(len(second_line)) # Go back before the closing indentation
-                
-                buff.place_cursor(iter_final)
-                
-            else:
-                # Standard Indent
-                buff.begin_user_action()
-                buff.insert(iter_cur, to_insert)
-                buff.end_user_action()
-                self.view.scroll_to_mark(insert, 0.0, True, 0.0, 0.5)
-
-            return True
-
-        # Electric Brace Dedentation & Type-Over ( } ] ) )
-        if keyval in [Gdk.KEY_braceright, Gdk.KEY_bracketright, Gdk.KEY_parenright]:
-            buff = self.buffer
-            insert = buff.get_insert()
-            iter_cur = buff.get_iter_at_mark(insert)
-            
-            # Type-Over Logic: If next char is the one we are typing, just move cursor
-            # Get char at cursor
-            char_at_cursor = buff.get_text(iter_cur, buff.get_iter_at_offset(iter_cur.get_offset() + 1), False)
-            typed_char = chr(Gdk.keyval_to_unicode(keyval))
-            
-            if char_at_cursor == typed_char:
-                # Move cursor forward instead of typing
-                iter_cur.forward_char()
-                buff.place_cursor(iter_cur)
-                return True
-
-            # Dedentation Logic
-            # Enable for Brace Langs AND Untitled (None)
-            lang = buff.get_language()
-            lang_id = lang.get_id() if lang else None
-            
-            is_brace_lang = (lang_id is None) or (lang_id in ["python", "c", "cpp", "chdr", "java", "js", "javascript", "json", "css", "rust", "go", "text"]) or ("json" in str(lang_id)) or ("python" in str(lang_id)) 
-                     
-            if is_brace_lang:
-                line_num = iter_cur.get_line()
-                iter_start = buff.get_iter_at_line(line_num)
-                line_text = buff.get_text(iter_start, iter_cur, False)
-                
-                # Only dedent if line is currently pure whitespace (we are closing a block)
-                if len(line_text.strip()) == 0 and len(line_text) > 0:
-                     tab_width = self.view.get_tab_width()
-                     if len(line_text) >= tab_width:
-                         start_del = iter_cur.copy()
-                         start_del.backward_chars(tab_width)
-                         buff.begin_user_action()
-                         buff.delete(start_del, iter_cur)
-                         buff.end_user_action()
-            return False
-
-        # Auto-Pairing for Openers ( { [ )
-        if keyval in [Gdk.KEY_braceleft, Gdk.KEY_bracketleft, Gdk.KEY_parenleft]:
-            buff = self.buffer
-            insert = buff.get_insert()
-            iter_cur = buff.get_iter_at_mark(insert)
-            
-            mapping = {
-                Gdk.KEY_braceleft: ("{", "}"),
-                Gdk.KEY_bracketleft: ("[", "]"),
-                Gdk.KEY_parenleft: ("(", ")")
-            }
-            
-            open_char, close_char = mapping.get(keyval)
-            
-            # Check if there's a selection - wrap selection with brackets
-            if buff.get_has_selection():
-                start, end = buff.get_selection_bounds()
-                selected_text = buff.get_text(start, end, False)
-                buff.begin_user_action()
-                buff.delete(start, end)
-                buff.insert_at_cursor(open_char + selected_text + close_char)
-                buff.end_user_action()
-                # Place cursor after closing bracket
-                return True
-            
-            # Check context: Get character after cursor
-            char_at_cursor = ""
-            if not iter_cur.is_end():
-                iter_next = iter_cur.copy()
-                iter_next.forward_char()
-                char_at_cursor = buff.get_text(iter_cur, iter_next, False)
-            
-            # Get character before cursor
-            char_before = ""
-            if not iter_cur.is_start():
-                iter_prev = iter_cur.copy()
-                iter_prev.backward_char()
-                char_before = buff.get_text(iter_prev, iter_cur, False)
-            
-            # Only auto-pair when in appropriate context (like VS Code)
-            # Don't auto-pair when followed by alphanumeric (in middle of word)
-            should_pair = True
-            
-            # Don't pair if cursor is immediately followed by alphanumeric or underscore
-            if char_at_cursor.isalnum() or char_at_cursor == '_':
-                should_pair = False
-            
-            if should_pair:
-                buff.begin_user_action()
-                buff.insert_at_cursor(open_char + close_char)
-                buff.end_user_action()
-                
-                # Move cursor back one step (between the brackets)
-                insert = buff.get_insert()
-                iter_back = buff.get_iter_at_mark(insert)
-                iter_back.backward_char()
-                buff.place_cursor(iter_back)
-                return True
-            
-            # If not pairing, just let default handler insert the open bracket
-            return False
-            
-        return False
-    
-    def on_button_press(self, view, event):
-        """Handle right-click to show custom context menu"""
-        # Only handle right-click (button 3)
-        if event.button != 3:
-            return False
-        
-        # Get window and clipboard
-        window = view.get_toplevel()
-        clipboard = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
-        
-        # Create menu
-        menu = Gtk.Menu()
-        
-        # Get action group
-        action_group = window.get_action_group("win")
-        
-        # Helper to invoke window actions (in "win" action group)
-        def invoke_action(action_name):
-            def handler(widget):
-                if action_group:
-                    action_group.activate_action(action_name, None)
-            return handler
-        
-        # Helper to create menu items with accelerator labels
-        def make_item(label, callback, accel=None):
-            item = Gtk.MenuItem()
-            box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=20)
-            lbl = Gtk.Label(label=label)
-            lbl.set_xalign(0)
-            box.pack_start(lbl, True, True, 0)
-            if accel:
-                accel_lbl = Gtk.Label(label=accel)
-                accel_lbl.get_style_context().add_class("dim-label")
-                box.pack_end(accel_lbl, False, False, 0)
-            item.add(box)
-            item.connect("activate", callback)
-            return item
-        
-        # Undo / Redo
-        menu.append(make_item("Undo", invoke_action("undo"), "Ctrl+Z"))
-        menu.append(make_item("Redo", invoke_action("redo"), "Ctrl+Y"))
-        menu.append(Gtk.SeparatorMenuItem())
-        
-        # Cut / Copy / Paste - Use GTK buffer methods directly
-        def do_cut(w):
-            self.buffer.cut_clipboard(clipboard, self.view.get_editable())
-        def do_copy(w):
-            self.buffer.copy_clipboard(clipboard)
-        def do_paste(w):
-            self.buffer.paste_clipboard(clipboard, None, self.view.get_editable())
-        
-        menu.append(make_item("Cut", do_cut, "Ctrl+X"))
-        menu.append(make_item("Copy", do_copy, "Ctrl+C"))
-        menu.append(make_item("Paste", do_paste, "Ctrl+V"))
-        menu.append(Gtk.SeparatorMenuItem())
-        
-        # Delete Selection
-        def delete_selection(w):
-            self.buffer.delete_selection(True, True)
-        menu.append(make_item("Delete Selection", delete_selection, "Delete"))
-        
-        # Delete Line
-        menu.append(make_item("Delete Line", invoke_action("delete_line"), "Ctrl+Shift+K"))
-        menu.append(Gtk.SeparatorMenuItem())
-        
-        # Select All
-        def select_all(w):
-            self.buffer.select_range(self.buffer.get_start_iter(), self.buffer.get_end_iter())
-        menu.append(make_item("Select All", select_all, "Ctrl+A"))
-        menu.append(Gtk.SeparatorMenuItem())
-        
-        # Convert submenu - use correct action names (toc_upper, toc_lower)
-        convert_menu = Gtk.Menu()
-        convert_item = Gtk.MenuItem(label="Convert")
-        convert_item.set_submenu(convert_menu)
-        convert_menu.append(make_item("UPPERCASE", invoke_action("toc_upper"), None))
-        convert_menu.append(make_item("lowercase", invoke_action("toc_lower"), None))
-        menu.append(convert_item)
-        
-        # Move submenu - use correct action names (move_up, move_down)
-        move_menu = Gtk.Menu()
-        move_item = Gtk.MenuItem(label="Move")
-        move_item.set_submenu(move_menu)
-        move_menu.append(make_item("Move Line Up", invoke_action("move_up"), "Alt+Up"))
-        move_menu.append(make_item("Move Line Down", invoke_action("move_down"), "Alt+Down"))
-        menu.append(move_item)
-        
-        # Duplicate - correct action name
-        menu.append(make_item("Duplicate Line / Selection", invoke_action("duplicate"), "Ctrl+Shift+D"))
-        menu.append(Gtk.SeparatorMenuItem())
-        
-        # Indent
-        menu.append(make_item("Increase Indent", invoke_action("indent"), "Tab"))
-        menu.append(make_item("Decrease Indent", invoke_action("unindent"), "Shift+Tab"))
-        menu.append(Gtk.SeparatorMenuItem())
-        
-        # Insert Emoji - Use GTK's built-in emoji chooser
-        def show_emoji_chooser(w):
-            # GTK has built-in emoji chooser support via insert_emoji() method
-            self.view.emit('insert-emoji')
-        
-        menu.append(make_item("Insert Emoji...", show_emoji_chooser, "Ctrl+."))
-
-
-        
-        menu.show_all()
-        menu.popup_at_pointer(event)
-        
+import gi
+import os
+import hashlib
+gi.require_version('Gtk', '3.0')
+try:
+    gi.require_version('GtkSource', '4')
+except ValueError:
+    gi.require_version('GtkSource', '3.0')
+from gi.repository import Gtk, GtkSource, Pango, Gdk, GLib
+from zenpad import analysis
+from zenpad import json_stream
+from zenpad.tasks import BackgroundTask
+
+# Register custom themes directory
+_themes_dir = os.path.join(os.path.dirname(__file__), "themes")
+if os.path.isdir(_themes_dir):
+    _scheme_manager = GtkSource.StyleSchemeManager.get_default()
+    _scheme_manager.prepend_search_path(_themes_dir)
+
+# Pause in typing before a JSON document is validated (ms)
+JSON_CHECK_DELAY = 500
+
+# Source mark category of the first JSON error
+JSON_ERROR_CATEGORY = "json-error"
+
+# Characters copied from the buffer per main loop iteration for a JSON check
+JSON_CHECK_SLICE = 1024 * 1024
+
+class EditorTab(Gtk.ScrolledWindow):
+    def __init__(self, search_settings=None):
+        super().__init__()
+        self.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+        
+        self.buffer = GtkSource.Buffer()
+        self.last_buffer = None
+        self.view = GtkSource.View.new_with_buffer(self.buffer)
+        
+        self.file_path = None
+        self.file_encoding = "UTF-8"  # Track file encoding
+        self.is_binary = False  # True if file is binary
+        self.is_readonly = False  # True if opened read-only (for binary files)
+        self.line_ending = "\n"  # Track line ending (LF, CRLF, CR)
+        self.change_serial = 0  # Bumped on every buffer change (snapshot validation)
+        self.bulk_editing = False  # True while a bulk edit applies many hunks
+        
+        # Connect to changed signal for auto-detection
+        self.buffer.connect("changed", self.on_buffer_changed)
+
+        # Background validation of JSON documents (see schedule_json_check)
+        self.json_error = None  # json.JSONDecodeError found by the last check
+        self.json_lines = False  # NDJSON: one JSON document per line
+        self._json_error_mark = None
+        self._json_check_timer = 0
+        self._json_check_task = None
+        self.buffer.connect("notify::language", lambda *args: self.schedule_json_check())
+        self.connect("destroy", self.on_destroy)
+        
+        # Search Context
+        self.search_context = None
+        if search_settings:
+            self.search_context = GtkSource.SearchContext.new(self.buffer, search_settings)
+            self.search_context.set_highlight(True)
+        
+        # Default Settings
+        self.view.set_show_line_numbers(True)
+        self.view.set_auto_indent(True)
+        self.view.set_indent_on_tab(True) # Indent on Tab key
+        if hasattr(self.view, "set_smart_backspace"):
+            self.view.set_smart_backspace(True) # Unindent on Backspace
+        self.view.set_indent_width(-1) # Use tab width for indent width
+        
+        self.view.set_highlight_current_line(True)
+
+        error_attrs = GtkSource.MarkAttributes()
+        error_attrs.set_icon_name("dialog-error")
+        error_attrs.connect("query-tooltip-text",
+                            lambda attrs, mark: f"Invalid JSON: {self.json_error}" if self.json_error else None)
+        self.view.set_mark_attributes(JSON_ERROR_CATEGORY, error_attrs, 10)
+        self.view.connect("line-mark-activated", self.on_line_mark_activated)
+        self.view.set_wrap_mode(Gtk.WrapMode.WORD)
+        self.view.set_left_margin(6)
+        self.view.set_right_margin(6)
+        
+        # Load Default Theme
+        self.set_scheme("tango")
+
+        # Font (Default Monospace)
+        self.font_desc = Pango.FontDescription("Monospace 12")
+        self.view.modify_font(self.font_desc)
+        
+        # Handle scrolling (for zoom-in-out)
+        self.view.connect('scroll-event', self.on_scroll)
+        
+        # Handle smart indentation on Enter
+        self.view.connect("key-press-event", self.on_key_press)
+        
+        # Custom context menu - intercept right-click
+        self.view.connect("button-press-event", self.on_button_press)
+
+        self.add(self.view)
+        self.show_all()
+
+    def on_buffer_changed(self, buffer):
+        """Triggers reliable auto-detection on content change"""
+        self.change_serial += 1
+        self.schedule_json_check()
+        if self.bulk_editing:
+            return  # Caller re-runs detection once the bulk edit is done
+        # We only auto-detect if we don't have a rigid file path override
+        # Or should we always? User said "Decouple from save state".
+        # Let's run it.
+        self.auto_detect_language()
+
+    def auto_detect_language(self):
+        # Limit to detecting from the first 1000 chars for speed
+        start = self.buffer.get_start_iter()
+        end = self.buffer.get_start_iter()
+        end.forward_chars(1000)
+        text = self.buffer.get_text(start, end, True)
+        
+        detected_id = analysis.detect_language_by_content(text)
+        
+        if detected_id:
+            manager = GtkSource.LanguageManager.get_default()
+            language = manager.get_language(detected_id)
+            current_lang = self.buffer.get_language()
+            
+            # Only switch if different, to avoid thrashing
+            if language and current_lang != language:
+                self.buffer.set_language(language)
+
+    def schedule_json_check(self):
+        """Validate a JSON document in the background once typing pauses"""
+        if self._json_check_timer:
+            GLib.source_remove(self._json_check_timer)
+            self._json_check_timer = 0
+        if self._json_check_task:
+            self._json_check_task.cancel()
+            self._json_check_task = None
+        language = self.buffer.get_language()
+        is_json = language is not None and language.get_id() == "json"
+        self.view.set_show_line_marks(is_json)
+        if not is_json:
+            self.show_json_error(None)
+            return
+        self._json_check_timer = GLib.timeout_add(JSON_CHECK_DELAY, self._start_json_check)
+
+    def json_validator(self):
+        """json_stream.validate, or validate_lines for an NDJSON tab"""
+        return json_stream.validate_lines if self.json_lines else json_stream.validate
+
+    def _start_json_check(self):
+        if self.bulk_editing:
+            return True  # Check again once the bulk edit is done
+        # Copy the text a slice per main loop iteration, so typing in a big
+        # document is not held up; any edit removes this source and starts over
+        slices = []
+        serial = self.change_serial
+        validate = self.json_validator()
+
+        def on_done(error):
+            self._json_check_task = None
+            if serial == self.change_serial:
+                self.show_json_error(error)
+
+        def check(task):
+            text = "".join(slices)
+            if not text.strip():
+                return None  # Nothing typed yet
+            return validate(text, task)
+
+        def copy_slice():
+            buff = self.buffer
+            start = buff.get_iter_at_offset(sum(map(len, slices)))
+            end = start.copy()
+            end.forward_chars(JSON_CHECK_SLICE)
+            slices.append(buff.get_slice(start, end, True))
+            if not end.is_end():
+                return True
+            self._json_check_timer = 0
+            self._json_check_task = BackgroundTask(check, on_done=on_done).start()
+            return False
+
+        self._json_check_timer = GLib.idle_add(copy_slice)
+        return False
+
+    def show_json_error(self, error):
+        """Mark the position of a json.JSONDecodeError in the gutter (None clears it)"""
+        self.json_error = error
+        buff = self.buffer
+        if self._json_error_mark is not None:
+            buff.delete_mark(self._json_error_mark)
+            self._json_error_mark = None
+        if error is not None:
+            self._json_error_mark = buff.create_source_mark(None, JSON_ERROR_CATEGORY,
+                                                            buff.get_iter_at_offset(error.pos))
+
+    def jump_to_json_error(self):
+        """Put the cursor where the last JSON check found an error"""
+        if self._json_error_mark is None:
+            return
+        it = self.buffer.get_iter_at_mark(self._json_error_mark)
+        self.buffer.place_cursor(it)
+        self.view.scroll_to_iter(it, 0.0, True, 0.0, 0.5)
+        self.view.grab_focus()
+
+    def on_line_mark_activated(self, view, it, event):
+        if self._json_error_mark is not None and \
+                self.buffer.get_iter_at_mark(self._json_error_mark).get_line() == it.get_line():
+            self.jump_to_json_error()
+
+    def on_destroy(self, widget):
+        if self._json_check_timer:
+            GLib.source_remove(self._json_check_timer)
+            self._json_check_timer = 0
+        if self._json_check_task:
+            self._json_check_task.cancel()
+
+    def zoom_in(self):
+        size = self.font_desc.get_size()
+        # Pango size is in pango units (scaled by PANGO_SCALE usually, but string init might be different)
+        # If initialized from string "12", get_size() returns 12 * PANGO_SCALE.
+        
+        # However, checking behavior:
+        # If I set Absolute size, it might be different.
+        # Let's assume standard Pango unit handling.
+        
+        new_size = size + (2 * Pango.SCALE)
+        self.font_desc.set_size(new_size)
+        self.view.modify_font(self.font_desc)
+
+    def zoom_out(self):
+        size = self.font_desc.get_size()
+        new_size = size - (2 * Pango.SCALE)
+        if new_size >= (6 * Pango.SCALE): # Minimum size 6
+            self.font_desc.set_size(new_size)
+            self.view.modify_font(self.font_desc)
+
+    def zoom_reset(self):
+        self.font_desc.set_size(12 * Pango.SCALE)
+        self.view.modify_font(self.font_desc)
+
+    def get_text(self):
+        start_iter = self.buffer.get_start_iter()
+        end_iter = self.buffer.get_end_iter()
+        return self.buffer.get_text(start_iter, end_iter, True)
+
+    def set_text(self, text):
+        self.buffer.set_text(text)
+
+    def set_scheme(self, scheme_id):
+        manager = GtkSource.StyleSchemeManager.get_default()
+        scheme = manager.get_scheme(scheme_id)
+        if scheme:
+            self.buffer.set_style_scheme(scheme)
+
+    def get_cursor_position(self):
+        insert = self.buffer.get_insert()
+        iter = self.buffer.get_iter_at_mark(insert)
+        line = iter.get_line() + 1
+        col = iter.get_line_offset() + 1
+        return line, col
+
+    def detect_language(self, filename):
+        manager = GtkSource.LanguageManager.get_default()
+        language = manager.guess_language(filename, None)
+        self.json_lines = filename.lower().endswith((".ndjson", ".jsonl"))
+        if language:
+            self.buffer.set_language(language)
+
+    def on_scroll(self, gpointer, event):
+        if not (event.state & Gdk.ModifierType.CONTROL_MASK):
+            return False
+
+        good, dx, dy = event.get_scroll_deltas()
+
+        if (dy < 0.0):
+            self.zoom_in()
+        elif (dy > 0.0):
+            self.zoom_out()
+
+        return True
+
+    def on_key_press(self, widget, event):
+        """
+        Handles smart indentation on Enter key.
+        Global logic:
+        - Check previous line indentation.
+        - Check for openers: {, [, (, :
+        - Increase indent if opener found.
+        """
+        # Respect Read-Only
+        if not self.view.get_editable():
+            return False
+
+        keyval = event.keyval
+        if keyval in [Gdk.KEY_Return, Gdk.KEY_KP_Enter]:
+            if (event.state & Gdk.ModifierType.SHIFT_MASK) or (event.state & Gdk.ModifierType.CONTROL_MASK):
+                if event.state & Gdk.ModifierType.SHIFT_MASK and keyval == Gdk.KEY_Return:
+                    pass # Allow Shift+Enter
+                elif keyval not in [Gdk.KEY_quotedbl, Gdk.KEY_apostrophe]:
+                     return False # Allow other modified keys
+
+        # Auto-Close Quotes
+        if keyval in [Gdk.KEY_quotedbl, Gdk.KEY_apostrophe]:
+             buff = self.buffer
+             quote_char = '"' if keyval == Gdk.KEY_quotedbl else "'"
+             
+             insert = buff.get_insert()
+             iter_cur = buff.get_iter_at_mark(insert)
+             
+             # Check if there's a selection - wrap selection with quotes
+             if buff.get_has_selection():
+                 start, end = buff.get_selection_bounds()
+                 selected_text = buff.get_text(start, end, False)
+                 buff.begin_user_action()
+                 buff.delete(start, end)
+                 buff.insert_at_cursor(quote_char + selected_text + quote_char)
+                 buff.end_user_action()
+                 return True
+             
+             # Type-Over Logic: If next char is the same quote, just move cursor
+             char_at_cursor = ""
+             if not iter_cur.is_end():
+                 iter_next = iter_cur.copy()
+                 iter_next.forward_char()
+                 char_at_cursor = buff.get_text(iter_cur, iter_next, False)
+             
+             if char_at_cursor == quote_char:
+                 # Move cursor forward instead of typing
+                 iter_cur.forward_char()
+                 buff.place_cursor(iter_cur)
+                 return True
+             
+             # Check context: Only auto-pair when appropriate
+             # Get character before cursor
+             char_before = ""
+             if not iter_cur.is_start():
+                 iter_prev = iter_cur.copy()
+                 iter_prev.backward_char()
+                 char_before = buff.get_text(iter_prev, iter_cur, False)
+             
+             # Characters that indicate we should auto-pair
+             # (at word boundary, after operators, brackets, or whitespace)
+             pair_after_chars = set(" \t\n({[,:;=<>!&|+-*/%^~")
+             # Characters that indicate we should NOT auto-pair after
+             # (alphanumeric - we're likely in the middle of a word)
+             no_pair_after = char_before.isalnum() or char_before == '_'
+             
+             # Check if we're at end of line or followed by appropriate chars
+             should_pair = False
+             pair_before_chars = set(" \t\n)}]:;,")
+             
+             if char_at_cursor == "" or char_at_cursor in pair_before_chars:
+                 # At end of line or followed by whitespace/closing brackets
+                 if char_before == "" or char_before in pair_after_chars or iter_cur.starts_line():
+                     should_pair = True
+                 elif not no_pair_after:
+                     should_pair = True
+             
+             if should_pair:
+                 # Insert the pair
+                 buff.begin_user_action()
+                 buff.insert_at_cursor(quote_char + quote_char)
+                 buff.end_user_action()
+                 
+                 # Move cursor back by 1
+                 insert = buff.get_insert()
+                 iter_cur = buff.get_iter_at_mark(insert)
+                 iter_cur.backward_char()
+                 buff.place_cursor(iter_cur)
+                 return True
+             
+             # Otherwise, just insert single quote (default behavior)
+             return False
+
+        if keyval in [Gdk.KEY_Return, Gdk.KEY_KP_Enter]:
+            if (event.state & Gdk.ModifierType.SHIFT_MASK) or (event.state & Gdk.ModifierType.CONTROL_MASK):
+                return False
+                
+            buff = self.buffer
+            lang = buff.get_language()
+            lang_id = lang.get_id() if lang else None
+            
+            # User Requirement: No language = no smart indentation?
+            # actually, users want smart features even in Untitled buffers if they type code.
+            # So we allow None to fall through to structural checks.
+            # if not lang_id: return False <- REMOVED
+            
+            insert = buff.get_insert()
+            iter_cur = buff.get_iter_at_mark(insert)
+            
+            # Get current line text up to cursor
+            line_num = iter_cur.get_line()
+            iter_start = buff.get_iter_at_line(line_num)
+            line_text = buff.get_text(iter_start, iter_cur, False)
+            
+            # Calculate current indentation
+            indentation = ""
+            for char in line_text:
+                if char in [' ', '\t']:
+                    indentation += char
+                else:
+                    break
+            
+            # Check for structural openers at the end of the text (ignoring trailing whitespace)
+            stripped = line_text.strip()
+            should_indent = False
+            
+            # Check for Enter between braces: {|} -> Expand
+            # Need to peek at the character *after* the cursor
+            char_after = ""
+            if not iter_cur.is_end():
+                iter_next = iter_cur.copy()
+                iter_next.forward_char()
+                char_after = buff.get_text(iter_cur, iter_next, False)
+            
+            is_expansion = False
+            
+            # Language-Aware Logic
+            if stripped:
+                # Group 1: BRACE/BLOCK Languages (C-like, Python, JSON, JS, AND Untitled/None)
+                # We assume generic brace behavior for Plain Text (None)
+                brace_langs = [
+                    "python", "c", "cpp", "chdr", "java", "js", "javascript", "json", "css",
+                    "rust", "go", "text", "haskell", "commonlisp", "scheme", "lisp",
+                    "nasm", "asm", "gas", "masm"
+                ]
+                
+                is_brace_lang = (lang_id is None) or (lang_id in brace_langs) or ("json" in lang_id) or ("python" in lang_id) or (lang_id == "text")
+                
+                if is_brace_lang:
+                    last_char = stripped[-1]
+                    if last_char in ['{', '[', '(', ':']:
+                        should_indent = True
+                        
+                        # Check for expansion: {|} or [|]
+                        if last_char == '{' and char_after == '}': is_expansion = True
+                        if last_char == '[' and char_after == ']': is_expansion = True
+                        if last_char == '(' and char_after == ')': is_expansion = True
+                
+                # Group 2: SHELL (Bash) - Strict Check
+                if lang_id in ["sh", "bash", "zsh", "application-x-shellscript"]:
+                    tokens = stripped.split()
+                    if tokens:
+                        last = tokens[-1]
+                        if last in ["then", "do", "else", "elif"]:
+                            should_indent = True
+                            
+                # Group 3: TAG Languages (HTML, XML)
+                tag_langs = ["xml", "html", "markdown", "php"]
+                if lang_id in tag_langs:
+                    if stripped.endswith(">") and not stripped.endswith("/>") and not stripped.endswith("?>") and not stripped.endswith("-->"):
+                        # Check against closing tag
+                        r_index = stripped.rfind("<")
+                        if r_index != -1:
+                            tag_content = stripped[r_index:]
+                            if not tag_content.startswith("</"):
+                                should_indent = True
+                                # XML expansion <t>|</t> ?
+                                # Complex to check char_after for </tag> without parsing.
+                                # Leaving XML expansion simple for now.
+                
+                # Group 4: Haskell (do, where, let, of)
+                if lang_id == "haskell":
+                    tokens = stripped.split()
+                    if tokens:
+                        last = tokens[-1]
+                        if last in ["do", "where", "let", "of", "->"]:
+                            should_indent = True
+
+            # Construct insertion
+            to_insert = "\n" + indentation
+            
+            indent_str = ""
+            tab_width = self.view.get_tab_width()
+            if self.view.get_insert_spaces_instead_of_tabs():
+                 indent_str = " " * tab_width
+            else:
+                 indent_str = "\t"
+
+            if should_indent:
+                 to_insert += indent_str
+            
+            if is_expansion:
+                # We are expanding {|} to:
+                # {
+                #     |
+                # }
+                # indentation holds the BASE indent (of the { line)
+                # to_insert holds \n + BASE + INDENT
+                
+                # We need to append: \n + BASE + (closing brace)
+                # But wait, we are inserting AT cursor.
+                # So we insert: \n + BASE + INDENT + \n + BASE
+                # And assume the } is already there (char_after).
+                # Wait, if we insert text, the } moves.
+                
+                second_line = "\n" + indentation
+                to_insert += second_line
+                
+                # Insert
+                buff.begin_user_action()
+                buff.insert(iter_cur, to_insert)
+                buff.end_user_action()
+                
+                # Now we need to move cursor UP one line and to the end of that line
+                # (which is the indented position)
+                
+                # Current pos is after the inserted text (before the })
+                insert_mark = buff.get_insert()
+                iter_final = buff.get_iter_at_mark(insert_mark)
+                iter_final.backward_chars(len(second_line)) # Go back before the closing indentation
+                
+                buff.place_cursor(iter_final)
+                
+            else:
+                # Standard Indent
+                buff.begin_user_action()
+                buff.insert(iter_cur, to_insert)
+                buff.end_user_action()
+                self.view.scroll_to_mark(insert, 0.0, True, 0.0, 0.5)
+
+            return True
+
+        # Electric Brace Dedentation & Type-Over ( } ] ) )
+        if keyval in [Gdk.KEY_braceright, Gdk.KEY_bracketright, Gdk.KEY_parenright]:
+            buff = self.buffer
+            insert = buff.get_insert()
+            iter_cur = buff.get_iter_at_mark(insert)
+            
+            # Type-Over Logic: If next char is the one we are typing, just move cursor
+            # Get char at cursor
+            char_at_cursor = buff.get_text(iter_cur, buff.get_iter_at_offset(iter_cur.get_offset() + 1), False)
+            typed_char = chr(Gdk.keyval_to_unicode(keyval))
+            
+            if char_at_cursor == typed_char:
+                # Move cursor forward instead of typing
+                iter_cur.forward_char()
+                buff.place_cursor(iter_cur)
+                return True
+
+            # Dedentation Logic
+            # Enable for Brace Langs AND Untitled (None)
+            lang = buff.get_language()
+            lang_id = lang.get_id() if lang else None
+            
+            is_brace_lang = (lang_id is None) or (lang_id in ["python", "c", "cpp", "chdr", "java", "js", "javascript", "json", "css", "rust", "go", "text"]) or ("json" in str(lang_id)) or ("python" in str(lang_id)) 
+                     
+            if is_brace_lang:
+                line_num = iter_cur.get_line()
+                iter_start = buff.get_iter_at_line(line_num)
+                line_text = buff.get_text(iter_start, iter_cur, False)
+                
+                # Only dedent if line is currently pure whitespace (we are closing a block)
+                if len(line_text.strip()) == 0 and len(line_text) > 0:
+                     tab_width = self.view.get_tab_width()
+                     if len(line_text) >= tab_width:
+                         start_del = iter_cur.copy()
+                         start_del.backward_chars(tab_width)
+                         buff.begin_user_action()
+                         buff.delete(start_del, iter_cur)
+                         buff.end_user_action()
+            return False
+
+        # Auto-Pairing for Openers ( { [ )
+        if keyval in [Gdk.KEY_braceleft, Gdk.KEY_bracketleft, Gdk.KEY_parenleft]:
+            buff = self.buffer
+            insert = buff.get_insert()
+            iter_cur = buff.get_iter_at_mark(insert)
+            
+            mapping = {
+                Gdk.KEY_braceleft: ("{", "}"),
+                Gdk.KEY_bracketleft: ("[", "]"),
+                Gdk.KEY_parenleft: ("(", ")")
+            }
+            
+            open_char, close_char = mapping.get(keyval)
+            
+            # Check if there's a selection - wrap selection with brackets
+            if buff.get_has_selection():
+                start, end = buff.get_selection_bounds()
+                selected_text = buff.get_text(start, end, False)
+                buff.begin_user_action()
+                buff.delete(start, end)
+                buff.insert_at_cursor(open_char + selected_text + close_char)
+                buff.end_user_action()
+                # Place cursor after closing bracket
+                return True
+            
+            # Check context: Get character after cursor
+            char_at_cursor = ""
+            if not iter_cur.is_end():
+                iter_next = iter_cur.copy()
+                iter_next.forward_char()
+                char_at_cursor = buff.get_text(iter_cur, iter_next, False)
+            
+            # Get character before cursor
+            char_before = ""
+            if not iter_cur.is_start():
+                iter_prev = iter_cur.copy()
+                iter_prev.backward_char()
+                char_before = buff.get_text(iter_prev, iter_cur, False)
+            
+            # Only auto-pair when in appropriate context (like VS Code)
+            # Don't auto-pair when followed by alphanumeric (in middle of word)
+            should_pair = True
+            
+            # Don't pair if cursor is immediately followed by alphanumeric or underscore
+            if char_at_cursor.isalnum() or char_at_cursor == '_':
+                should_pair = False
+            
+            if should_pair:
+                buff.begin_user_action()
+                buff.insert_at_cursor(open_char + close_char)
+                buff.end_user_action()
+                
+                # Move cursor back one step (between the brackets)
+                insert = buff.get_insert()
+                iter_back = buff.get_iter_at_mark(insert)
+                iter_back.backward_char()
+                buff.place_cursor(iter_back)
+                return True
+            
+            # If not pairing, just let default handler insert the open bracket
+            return False
+            
+        return False
+    
+    def on_button_press(self, view, event):
+        """Handle right-click to show custom context menu"""
+        # Only handle right-click (button 3)
+        if event.button != 3:
+            return False
+        
+        # Get window and clipboard
+        window = view.get_toplevel()
+        clipboard = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
+        
+        # Create menu
+        menu = Gtk.Menu()
+        
+        # Get action group
+        action_group = window.get_action_group("win")
+        
+        # Helper to invoke window actions (in "win" action group)
+        def invoke_action(action_name):
+            def handler(widget):
+                if action_group:
+                    action_group.activate_action(action_name, None)
+            return handler
+        
+        # Helper to create menu items with accelerator labels
+        def make_item(label, callback, accel=None):
+            item = Gtk.MenuItem()
+            box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=20)
+            lbl = Gtk.Label(label=label)
+            lbl.set_xalign(0)
+            box.pack_start(lbl, True, True, 0)
+            if accel:
+                accel_lbl = Gtk.Label(label=accel)
+                accel_lbl.get_style_context().add_class("dim-label")
+                box.pack_end(accel_lbl, False, False, 0)
+            item.add(box)
+            item.connect("activate", callback)
+            return item
+        
+        # Undo / Redo
+        menu.append(make_item("Undo", invoke_action("undo"), "Ctrl+Z"))
+        menu.append(make_item("Redo", invoke_action("redo"), "Ctrl+Y"))
+        menu.append(Gtk.SeparatorMenuItem())
+        
+        # Cut / Copy / Paste - Use GTK buffer methods directly
+        def do_cut(w):
+            self.buffer.cut_clipboard(clipboard, self.view.get_editable())
+        def do_copy(w):
+            self.buffer.copy_clipboard(clipboard)
+        def do_paste(w):
+            self.buffer.paste_clipboard(clipboard, None, self.view.get_editable())
+        
+        menu.append(make_item("Cut", do_cut, "Ctrl+X"))
+        menu.append(make_item("Copy", do_copy, "Ctrl+C"))
+        menu.append(make_item("Paste", do_paste, "Ctrl+V"))
+        menu.append(Gtk.SeparatorMenuItem())
+        
+        # Delete Selection
+        def delete_selection(w):
+            self.buffer.delete_selection(True, True)
+        menu.append(make_item("Delete Selection", delete_selection, "Delete"))
+        
+        # Delete Line
+        menu.append(make_item("Delete Line", invoke_action("delete_line"), "Ctrl+Shift+K"))
+        menu.append(Gtk.SeparatorMenuItem())
+        
+        # Select All
+        def select_all(w):
+            self.buffer.select_range(self.buffer.get_start_iter(), self.buffer.get_end_iter())
+        menu.append(make_item("Select All", select_all, "Ctrl+A"))
+        menu.append(Gtk.SeparatorMenuItem())
+        
+        # Convert submenu - use correct action names (toc_upper, toc_lower)
+        convert_menu = Gtk.Menu()
+        convert_item = Gtk.MenuItem(label="Convert")
+        convert_item.set_submenu(convert_menu)
+        convert_menu.append(make_item("UPPERCASE", invoke_action("toc_upper"), None))
+        convert_menu.append(make_item("lowercase", invoke_action("toc_lower"), None))
+        menu.append(convert_item)
+        
+        # Move submenu - use correct action names (move_up, move_down)
+        move_menu = Gtk.Menu()
+        move_item = Gtk.MenuItem(label="Move")
+        move_item.set_submenu(move_menu)
+        move_menu.append(make_item("Move Line Up", invoke_action("move_up"), "Alt+Up"))
+        move_menu.append(make_item("Move Line Down", invoke_action("move_down"), "Alt+Down"))
+        menu.append(move_item)
+        
+        # Duplicate - correct action name
+        menu.append(make_item("Duplicate Line / Selection", invoke_action("duplicate"), "Ctrl+Shift+D"))
+        menu.append(Gtk.SeparatorMenuItem())
+        
+        # Indent
+        menu.append(make_item("Increase Indent", invoke_action("indent"), "Tab"))
+        menu.append(make_item("Decrease Indent", invoke_action("unindent"), "Shift+Tab"))
+        menu.append(Gtk.SeparatorMenuItem())
+        
+        # Insert Emoji - Use GTK's built-in emoji chooser
+        def show_emoji_chooser(w):
+            # GTK has built-in emoji chooser support via insert_emoji() method
+            self.view.emit('insert-emoji')
+        
+        menu.append(make_item("Insert Emoji...", show_emoji_chooser, "Ctrl+."))
+
+
+        
+        menu.show_all()
+        menu.popup_at_pointer(event)
+        
         return True  # Prevent default context menu
\ No newline at end of file
@@ -0,0 +1,421 @@
+"""
+File indexing for Zenpad.
+Walks a project tree with os.scandir and streams the results in batches.
+
+ProjectIndex keeps a per-root index persisted under ~/.cache/zenpad,
+validated by directory mtimes and kept live with Gio.FileMonitor, along
+with the fuzzy matcher over its files, so reopening Quick Open only pays
+for what changed.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from gi.repository import Gio, GLib
+
+from zenpad import fuzzy
+from zenpad import ignore
+
+# Directories never worth indexing
+EXCLUDE_DIRS = {'.git', '__pycache__', 'node_modules', 'venv', '.gemini'}
+
+# Walk limits
+DEFAULT_MAX_DEPTH = 16
+DEFAULT_MAX_FILES = 200000
+
+# First batch is small so the caller can show results immediately
+FIRST_BATCH_SIZE = 200
+BATCH_SIZE = 2000
+
+# Persistent index location and format
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "zenpad", "file_index")
+CACHE_VERSION = 1
+
+# Beyond this many directories the index is revalidated by mtime instead
+# of watched (inotify watches are a limited per-user resource)
+MAX_WATCHED_DIRS = 4096
+
+# A directory modified this recently may change again within the same
+# mtime tick, so its listing is not trusted on the next validation
+RACY_MTIME_SECONDS = 2.0
+
+# Monitor events that add, remove or rename directory entries
+_STRUCTURE_EVENTS = {
+    Gio.FileMonitorEvent.CREATED,
+    Gio.FileMonitorEvent.DELETED,
+    Gio.FileMonitorEvent.MOVED_IN,
+    Gio.FileMonitorEvent.MOVED_OUT,
+    Gio.FileMonitorEvent.RENAMED,
+    Gio.FileMonitorEvent.MOVED,
+}
+
+
+def list_dir(path: str, exclude_dirs: Set[str] = EXCLUDE_DIRS) -> Optional[Tuple[List[str], List[str]]]:
+    """
+    Return the sorted (file names, subdirectory names) of path,
+    or None if it cannot be read. Symlinked directories are skipped.
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in exclude_dirs:
+                            subdirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        return None  # Permission denied, vanished, etc.
+    files.sort()
+    subdirs.sort()
+    return files, subdirs
+
+
+class ProjectIndex:
+    """
+    File index of one project root, shared by every Quick Open dialog.
+
+    The index maps each directory (relative, with a trailing separator;
+    "" for the root) to [mtime_ns, file names, subdirectory names].
+    Listings are stored unfiltered; .gitignore rules prune the walk and
+    filter files as they are reported.
+    On first use it is loaded from disk and revalidated by stat'ing each
+    directory: only directories whose mtime changed are listed again.
+    Afterwards Gio.FileMonitor marks changed directories dirty, and the
+    next sync() rescans just those.
+
+    The files reported so far live in matcher (a fuzzy.FuzzyMatcher shared
+    by every dialog); sync() feeds it only the files added and removed.
+    """
+
+    def __init__(self, root: str, max_depth: int = DEFAULT_MAX_DEPTH,
+                 max_files: int = DEFAULT_MAX_FILES):
+        self.root = os.path.abspath(root)
+        self.max_depth = max_depth
+        self.max_files = max_files
+        self.cache_file = os.path.join(
+            CACHE_DIR, hashlib.sha1(self.root.encode("utf-8", "surrogateescape")).hexdigest() + ".json")
+
+        self.dirs = {}  # type: Dict[str, list]
+        self.loaded = False      # Disk cache read (or found missing)
+        self.validated = False   # Walked and checked against the disk
+        self.dirty = set()       # Directories reported changed by monitors
+        self.monitors = {}       # rel_dir -> Gio.FileMonitor
+
+        self.matcher = fuzzy.FuzzyMatcher()
+        self.reported = {}  # type: Dict[str, List[str]]  # rel_dir -> file names in matcher
+
+        self._lock = threading.Lock()           # Guards dirs and dirty
+        self._refresh_lock = threading.Lock()   # One refresh at a time
+
+    @property
+    def live(self) -> bool:
+        """True while monitors cover every indexed directory."""
+        return bool(self.monitors) and len(self.monitors) == len(self.dirs)
+
+    # --- Persistence ---
+
+    def load(self):
+        """Read the persisted index, if any (worker side)."""
+        self.loaded = True
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION or data.get("root") != self.root:
+            return
+        with self._lock:
+            self.dirs = data.get("dirs", {})
+
+    def save(self):
+        """Persist the index atomically (worker side)."""
+        with self._lock:
+            data = {"version": CACHE_VERSION, "root": self.root, "dirs": self.dirs}
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                tmp_file = self.cache_file + ".tmp"
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_file, self.cache_file)
+            except (OSError, TypeError) as e:
+                print(f"[FileIndex] Error saving index: {e}")
+
+    # --- Scanning ---
+
+    def _path(self, rel_dir: str) -> str:
+        return os.path.join(self.root, rel_dir) if rel_dir else self.root
+
+    def _scan_dir(self, rel_dir: str, cached: Optional[list]) -> Optional[list]:
+        """Return the entry for rel_dir, reusing cached if its mtime is unchanged."""
+        path = self._path(rel_dir)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if cached is not None and cached[0] == st.st_mtime_ns:
+            return cached
+        listing = list_dir(path)
+        if listing is None:
+            return None
+        mtime = st.st_mtime_ns
+        if time.time() - st.st_mtime < RACY_MTIME_SECONDS:
+            mtime = -1  # Could still change within this tick: recheck next time
+        return [mtime, listing[0], listing[1]]
+
+    def _rules_for(self, rel_dir: str, dirs: Dict[str, list]) -> ignore.IgnoreStack:
+        """Ignore rules in effect inside rel_dir, its own ignore files included."""
+        rules = ignore.IgnoreStack()
+        prefix = ""
+        for part in [""] + rel_dir.split(os.sep)[:-1]:
+            if part:
+                prefix += part + os.sep
+            entry = dirs.get(prefix)
+            if entry is not None:
+                rules = rules.child(self._path(prefix), prefix, entry[1])
+        return rules
+
+    def _walk(self, starts: List[Tuple[str, ignore.IgnoreStack]], old: Dict[str, list],
+              task=None) -> Iterator[Tuple[str, list, bool, ignore.IgnoreStack]]:
+        """
+        Breadth-first walk from (rel_dir, parent rules) starts, reusing
+        unchanged listings from old and pruning ignored directories.
+        Yields (rel_dir, entry, listed_again, rules).
+        """
+        pending = deque(starts)
+        while pending:
+            if task:
+                task.check_cancelled()
+            rel_dir, rules = pending.popleft()
+            cached = old.get(rel_dir)
+            entry = self._scan_dir(rel_dir, cached)
+            if entry is None:
+                continue
+            rules = rules.child(self._path(rel_dir), rel_dir, entry[1])
+            yield rel_dir, entry, entry is not cached, rules
+            if rel_dir.count(os.sep) < self.max_depth:
+                _, subdirs = rules.filter(rel_dir, [], entry[2])
+                pending.extend((rel_dir + name + os.sep, rules) for name in subdirs)
+
+    def _with_rules(self, dirs: Dict[str, list]) -> Iterator[Tuple[str, list, ignore.IgnoreStack]]:
+        """Pair each indexed directory with its ignore rules (parents come first)."""
+        stacks = {}
+        for rel_dir, entry in dirs.items():
+            if rel_dir:
+                parent = rel_dir[:rel_dir.rstrip(os.sep).rfind(os.sep) + 1]
+                rules = stacks.get(parent)
+                if rules is None:
+                    rules = self._rules_for(parent, dirs)
+            else:
+                rules = ignore.IgnoreStack()
+            rules = stacks[rel_dir] = rules.child(self._path(rel_dir), rel_dir, entry[1])
+            yield rel_dir, entry, rules
+
+    def _validate(self, task=None) -> Iterator[Tuple[str, list, ignore.IgnoreStack]]:
+        """Walk the whole tree against the cached index, committing at the end."""
+        with self._lock:
+            old = self.dirs
+            self.dirty.clear()
+        dirs = {}
+        changed = 0
+        for rel_dir, entry, listed, rules in self._walk([("", ignore.IgnoreStack())], old, task):
+            dirs[rel_dir] = entry
+            changed += listed
+            yield rel_dir, entry, rules
+        with self._lock:
+            self.dirs = dirs
+        self.validated = True
+        if changed or len(dirs) != len(old):
+            self.save()
+
+    def _apply_dirty(self, task=None) -> Set[str]:
+        """Rescan only the directories reported by monitors; return those added, changed or removed."""
+        with self._lock:
+            dirty, self.dirty = self.dirty, set()
+            dirs = dict(self.dirs)
+        touched = set(dirty)
+        if not dirty:
+            return touched
+        try:
+            # Parents first, so a removed subtree is dropped before its children
+            for rel_dir in sorted(dirty, key=lambda d: d.count(os.sep)):
+                old_entry = dirs.get(rel_dir)
+                if old_entry is None:
+                    continue  # Already removed along with a parent
+                entry = self._scan_dir(rel_dir, None)
+                old_subdirs = set(old_entry[2])
+                new_subdirs = set(entry[2]) if entry else set()
+                for name in old_subdirs - new_subdirs:
+                    prefix = rel_dir + name + os.sep
+                    for key in [k for k in dirs if k.startswith(prefix)]:
+                        del dirs[key]
+                        touched.add(key)
+                if entry is None:
+                    for key in [k for k in dirs if k.startswith(rel_dir)]:
+                        del dirs[key]
+                        touched.add(key)
+                    continue
+                dirs[rel_dir] = entry
+                # New subdirectories are walked in full, unless ignored
+                added = [name for name in entry[2] if name not in old_subdirs]
+                if added and rel_dir.count(os.sep) < self.max_depth:
+                    rules = self._rules_for(rel_dir, dirs)
+                    _, added = rules.filter(rel_dir, [], added)
+                    starts = [(rel_dir + name + os.sep, rules) for name in added]
+                    for sub_dir, sub_entry, _, _ in self._walk(starts, {}, task):
+                        dirs[sub_dir] = sub_entry
+                        touched.add(sub_dir)
+        except BaseException:
+            with self._lock:
+                self.dirty |= dirty  # Retry on the next refresh
+            raise
+        with self._lock:
+            self.dirs = dirs
+        self.save()
+        return touched
+
+    def sync(self, task=None) -> Iterator[int]:
+        """
+        Bring the index up to date and apply what changed to matcher
+        (worker side), yielding the number of files added per batch,
+        shallow first.
+
+        A live index only rescans and compares directories flagged by its
+        monitors; otherwise the tree is revalidated by mtime and every
+        directory's files are compared with those reported before.
+        """
+        with self._refresh_lock:
+            if not self.loaded:
+                self.load()
+            if self.validated and self.live:
+                touched = self._apply_dirty(task)
+                with self._lock:
+                    dirs = self.dirs
+                entries = ((rel_dir, dirs[rel_dir], self._rules_for(rel_dir, dirs))
+                           for rel_dir in sorted(touched, key=lambda d: d.count(os.sep)) if rel_dir in dirs)
+                gone = [rel_dir for rel_dir in touched if rel_dir not in dirs]
+            else:
+                entries = self._validate(task)
+                gone = None
+
+            # Applied to matcher and reported together, one batch at a time,
+            # so a cancelled sync leaves them consistent
+            added, removed, names_by_dir = [], [], {}
+            batch_size = FIRST_BATCH_SIZE
+            seen = set()
+            count = len(self.matcher)
+
+            def flush():
+                self.matcher.remove_paths(removed)
+                self.matcher.add_paths(added)
+                self.reported.update(names_by_dir)
+                for rel_dir in [d for d, names in names_by_dir.items() if not names]:
+                    del self.reported[rel_dir]
+
+            for rel_dir, entry, rules in entries:
+                seen.add(rel_dir)
+                names, _ = rules.filter(rel_dir, entry[1], [])
+                old = self.reported.get(rel_dir, [])
+                if names == old:
+                    continue
+                old_names = set(old)
+                new_names = set(names)
+                removed.extend(rel_dir + name for name in old if name not in new_names)
+                new = [name for name in names if name not in old_names]
+                room = self.max_files - count - len(added) + len(removed)
+                if len(new) > room:
+                    # Over the limit: keep validating, stop reporting
+                    new = new[:max(room, 0)]
+                    kept = old_names.union(new)
+                    names = [name for name in names if name in kept]
+                added.extend(rel_dir + name for name in new)
+                names_by_dir[rel_dir] = names
+                if len(added) >= batch_size:
+                    flush()
+                    yield len(added)
+                    count = len(self.matcher)
+                    added, removed, names_by_dir = [], [], {}
+                    batch_size = BATCH_SIZE
+
+            if gone is None:
+                gone = [rel_dir for rel_dir in self.reported if rel_dir not in seen]
+            for rel_dir in gone:
+                removed.extend(rel_dir + name for name in self.reported.get(rel_dir, ()))
+                names_by_dir[rel_dir] = []
+            flush()
+            if added:
+                yield len(added)
+            if self.matcher.removed > max(len(self.matcher), 1000):
+                # Mostly leftovers of removed files: rebuild without them
+                self.matcher = self.matcher.compacted()
+
+    def full_path(self, rel_path: str) -> str:
+        return os.path.join(self.root, rel_path)
+
+    # --- Live updates (main thread) ---
+
+    def watch(self):
+        """Sync directory monitors with the index; call after sync()."""
+        with self._lock:
+            wanted = set(self.dirs)
+        if len(wanted) > MAX_WATCHED_DIRS:
+            # Too big to watch: fall back to mtime validation on each refresh
+            self.unwatch()
+            self.validated = False
+            return
+
+        for rel_dir in list(self.monitors):
+            if rel_dir not in wanted:
+                self.monitors.pop(rel_dir).cancel()
+        for rel_dir in wanted - set(self.monitors):
+            try:
+                gfile = Gio.File.new_for_path(self._path(rel_dir))
+                monitor = gfile.monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+            except GLib.Error as e:
+                print(f"[FileIndex] Cannot watch {rel_dir or self.root}: {e}")
+                self.unwatch()
+                self.validated = False
+                return
+            monitor.connect("changed", self._on_dir_changed, rel_dir)
+            self.monitors[rel_dir] = monitor
+            # Catch changes made between the walk and the monitor starting
+            try:
+                changed = os.stat(self._path(rel_dir)).st_mtime_ns != self.dirs[rel_dir][0]
+            except (OSError, KeyError):
+                changed = True
+            if changed:
+                with self._lock:
+                    self.dirty.add(rel_dir)
+
+    def unwatch(self):
+        for monitor in self.monitors.values():
+            monitor.cancel()
+        self.monitors.clear()
+
+    def _on_dir_changed(self, monitor, gfile, other_file, event_type, rel_dir):
+        if gfile.get_basename() in ignore.IGNORE_FILES:
+            # Rules changed: revalidate the whole tree on the next sync()
+            self.validated = False
+        if event_type in _STRUCTURE_EVENTS:
+            with self._lock:
+                self.dirty.add(rel_dir)
+
+
+_project_indexes = {}  # type: Dict[str, ProjectIndex]
+
+
+def get_project_index(root: str) -> ProjectIndex:
+    """Return the index for root shared by all dialogs and windows."""
+    root = os.path.abspath(root)
+    index = _project_indexes.get(root)
+    if index is None:
+        index = _project_indexes[root] = ProjectIndex(root)
+    return index
@@ -0,0 +1,136 @@
+"""
+Frecency store for Zenpad.
+Records file opens and saves in an append-only log under ~/.local/share/zenpad
+and turns them into exponentially decayed scores used to rank Quick Open.
+"""
+import os
+import time
+import threading
+from typing import Dict, Optional
+
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "zenpad")
+LOG_FILE = os.path.join(DATA_DIR, "frecency.log")
+
+# A visit is worth half as much after this many seconds
+HALF_LIFE = 7 * 24 * 3600
+
+# Weight of each kind of visit
+OPEN_WEIGHT = 1.0
+EDIT_WEIGHT = 0.5
+
+# The log is rewritten with one line per path once it holds more than
+# COMPACT_RATIO lines per path (and at least COMPACT_MIN_LINES lines)
+COMPACT_RATIO = 4
+COMPACT_MIN_LINES = 2000
+
+# Paths kept on compaction (lowest scores are dropped)
+MAX_PATHS = 5000
+
+
+def _decay(score: float, elapsed: float) -> float:
+    return score * 0.5 ** (elapsed / HALF_LIFE)
+
+
+class FrecencyStore:
+    """
+    Per-path frecency scores backed by an append-only log.
+
+    Each log line is "<unix time>\\t<weight>\\t<path>". record() only
+    appends a line, so it costs one small write; the log is read the
+    first time scores() is called.
+    """
+
+    def __init__(self, log_file: str = LOG_FILE):
+        self.log_file = log_file
+        self._lock = threading.Lock()
+        self._scores: Optional[Dict[str, list]] = None  # path -> [score, time]
+
+    @staticmethod
+    def _add(scores: Dict[str, list], path: str, weight: float, when: float):
+        entry = scores.get(path)
+        if entry is None:
+            scores[path] = [weight, when]
+        elif when >= entry[1]:
+            entry[0] = _decay(entry[0], when - entry[1]) + weight
+            entry[1] = when
+        else:
+            entry[0] += _decay(weight, entry[1] - when)  # Out-of-order line
+
+    def record(self, path: str, weight: float = OPEN_WEIGHT):
+        """Record a visit to path (main thread, cheap)."""
+        if not path or "\n" in path:
+            return
+        now = time.time()
+        with self._lock:
+            if self._scores is not None:
+                self._add(self._scores, path, weight, now)
+            try:
+                self._append(f"{now:.0f}\t{weight:g}\t{path}\n")
+            except OSError as e:
+                print(f"[Frecency] Error recording visit: {e}")
+
+    def _append(self, line: str):
+        try:
+            f = open(self.log_file, "a", encoding="utf-8", errors="surrogateescape")
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+            f = open(self.log_file, "a", encoding="utf-8", errors="surrogateescape")
+        with f:
+            f.write(line)
+
+    def _load(self):
+        scores = {}
+        lines = 0
+        try:
+            with open(self.log_file, "r", encoding="utf-8", errors="surrogateescape") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t", 2)
+                    if len(parts) != 3:
+                        continue
+                    try:
+                        when, weight = float(parts[0]), float(parts[1])
+                    except ValueError:
+                        continue
+                    self._add(scores, parts[2], weight, when)
+                    lines += 1
+        except OSError:
+            pass
+        self._scores = scores
+        if lines > max(COMPACT_MIN_LINES, COMPACT_RATIO * len(scores)):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the log with one line per path."""
+        now = time.time()
+        ranked = sorted(self._scores.items(), key=lambda item: _decay(item[1][0], now - item[1][1]),
+                        reverse=True)[:MAX_PATHS]
+        self._scores = {path: entry for path, entry in ranked}
+        tmp_file = self.log_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8", errors="surrogateescape") as f:
+                for path, (score, when) in ranked:
+                    f.write(f"{when:.0f}\t{score:g}\t{path}\n")
+            os.replace(tmp_file, self.log_file)
+        except OSError as e:
+            print(f"[Frecency] Error compacting log: {e}")
+
+    def scores(self) -> Dict[str, float]:
+        """Current decayed score of every recorded path (loads the log on first use)."""
+        with self._lock:
+            if self._scores is None:
+                self._load()
+            now = time.time()
+            return {path: _decay(score, now - when) for path, (score, when) in self._scores.items()}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> FrecencyStore:
+    """Return the store shared by all windows."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FrecencyStore()
+        return _store
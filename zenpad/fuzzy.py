@@ -0,0 +1,524 @@
+"""
+Fuzzy path matching for Zenpad's Quick Open.
+
+fzf-style scoring (path separator, word boundary, camelCase, basename and
+contiguity bonuses) with top-k selection through heapq.nlargest.
+
+Scoring every path in Python would cost far more than a keystroke allows,
+so candidates are narrowed first with per-character presence indexes:
+one big int per character holding a byte per path (1 = path contains the
+character). ANDing those ints is a single C-level operation, and each
+keystroke narrows the previous candidate set with one more AND.
+
+Candidates are then scored in tiers of decreasing score bound, shortest
+paths first within a tier: a path's bound follows from which query
+characters it holds at a bonus position (indexed with the same kind of
+masks). Scoring stops as soon as the current top results beat every tier
+left, so the result is the same as scoring every path. That can still
+mean scoring thousands of paths that share the top bounds, so callers
+run search() on a worker and cancel it when the query changes.
+
+Indexes only grow, and searches read a consistent prefix of them without
+taking the lock, so a search never waits for a worker adding paths.
+Removed paths are masked out of every candidate set until compacted()
+builds a fresh matcher.
+
+Run `python -m zenpad.fuzzy` for a micro-benchmark.
+"""
+import os
+import re
+import math
+import heapq
+import operator
+import threading
+from itertools import chain, islice, repeat
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Scoring weights
+SCORE_MATCH = 16
+BONUS_SEPARATOR = 10      # Right after a path separator (or at the start)
+BONUS_BOUNDARY = 8        # Right after _ - . or space
+BONUS_CAMEL = 7           # lower -> Upper or letter -> digit transition
+BONUS_CONSECUTIVE = 5     # Each char directly following the previous match
+BONUS_FIRST_CHAR_MULT = 2 # The first query char's boundary bonus counts double
+BONUS_BASENAME = 20       # Whole match lies inside the basename
+PENALTY_GAP_START = 3
+PENALTY_GAP_EXTENSION = 1
+BONUS_FRECENCY = 12       # Per doubling of a path's frecency score
+
+# Up to this many candidates are scored without looking at score bounds
+POOL_SIZE = 500
+
+# Paths scored between cancellation checks
+_CHECK_EVERY = 256
+
+# Path length bins scored shortest first, so ties at a score bound end early
+LENGTH_LEVELS = (8, 12, 16, 20, 24, 32, 40, 48, 64, 96, 128, 255)
+
+_SEPARATORS = "/\\"
+_BOUNDARIES = "_-. "
+_ONE = b"\x01"
+_MAX_BONUS = max(BONUS_SEPARATOR, BONUS_BOUNDARY, BONUS_CAMEL)
+
+# Score bounds count in units of the most a bonus position adds over a
+# consecutive match; weights are summed per path in single bytes
+_UNIT = _MAX_BONUS - BONUS_CONSECUTIVE
+_FIRST_WEIGHT = -(-_MAX_BONUS * BONUS_FIRST_CHAR_MULT // _UNIT)
+_BASENAME_WEIGHT = -(-BONUS_BASENAME // _UNIT)
+_MAX_WEIGHT = 127
+
+
+class FuzzyMatch(NamedTuple):
+    score: int
+    path: str
+    positions: Tuple[int, ...]  # Matched character offsets in path
+
+
+def _char_bonus(path: str, i: int) -> int:
+    if i == 0:
+        return BONUS_SEPARATOR
+    prev = path[i - 1]
+    if prev in _SEPARATORS:
+        return BONUS_SEPARATOR
+    if prev in _BOUNDARIES:
+        return BONUS_BOUNDARY
+    cur = path[i]
+    if prev.islower() and cur.isupper():
+        return BONUS_CAMEL
+    if cur.isdigit() and not prev.isdigit():
+        return BONUS_CAMEL
+    return 0
+
+
+def _basename_start(path: str) -> int:
+    return max(path.rfind("/"), path.rfind(os.sep)) + 1
+
+
+def _find_positions(query: str, lower: str, start: int) -> Optional[List[int]]:
+    """Tightest subsequence window (fzf v1): forward scan, then backward scan."""
+    pos = start - 1
+    for c in query:
+        pos = lower.find(c, pos + 1)
+        if pos == -1:
+            return None
+    positions = [0] * len(query)
+    for qi in range(len(query) - 1, -1, -1):
+        pos = lower.rfind(query[qi], start, pos + 1)
+        positions[qi] = pos
+        pos -= 1
+    return positions
+
+
+# Positions _char_bonus() rewards, in ASCII text
+_HOT_RE = re.compile(r"^.|(?<=[/\\_\-. ]).|(?<=[a-z])[A-Z]|(?<=\D)\d", re.DOTALL)
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+
+def _hot_chars(path: str, lower: str, start: int) -> str:
+    """Lowercased characters of path[start:] that earn a boundary/camel bonus."""
+    if _NON_ASCII_RE.search(path):
+        return "".join(lower[i] for i in range(start, min(len(path), len(lower))) if _char_bonus(path, i))
+    return "".join(_HOT_RE.findall(path, start)).lower()
+
+
+def score_path(query: str, path: str, lower: Optional[str] = None,
+               base: Optional[int] = None) -> Optional[FuzzyMatch]:
+    """
+    Score path against an already lowercased query.
+    Returns None when query is not a subsequence of path.
+    """
+    if lower is None:
+        lower = path.lower()
+    if base is None:
+        base = _basename_start(path)
+
+    in_basename = True
+    positions = _find_positions(query, lower, base)
+    if positions is None:
+        in_basename = False
+        positions = _find_positions(query, lower, 0)
+        if positions is None:
+            return None
+
+    score = SCORE_MATCH * len(query)
+    prev = -2
+    for qi, pos in enumerate(positions):
+        bonus = _char_bonus(path, pos)
+        if qi == 0:
+            bonus *= BONUS_FIRST_CHAR_MULT
+        elif pos == prev + 1:
+            bonus = max(bonus, BONUS_CONSECUTIVE)
+        else:
+            gap = pos - prev - 1
+            score -= PENALTY_GAP_START + PENALTY_GAP_EXTENSION * (gap - 1)
+        score += bonus
+        prev = pos
+
+    if in_basename:
+        score += BONUS_BASENAME
+    return FuzzyMatch(score, path, tuple(positions))
+
+
+def match_ranges(positions: Iterable[int]) -> List[Tuple[int, int]]:
+    """Merge matched offsets into (start, end) ranges for highlighting."""
+    ranges = []
+    for pos in positions:
+        if ranges and ranges[-1][1] == pos:
+            ranges[-1] = (ranges[-1][0], pos + 1)
+        else:
+            ranges.append((pos, pos + 1))
+    return ranges
+
+
+def _mask_indexes(mask: int, size: int) -> Iterator[int]:
+    """Yield the index of every path flagged in a presence mask."""
+    if not mask:
+        return
+    data = mask.to_bytes(size, "little")
+    i = data.find(_ONE)
+    while i != -1:
+        yield i
+        i = data.find(_ONE, i + 1)
+
+
+class _CharIndex(NamedTuple):
+    """Presence masks of one character over the first size paths, replaced as paths are added."""
+    size: int
+    anywhere: int
+    basename: int
+    hot_anywhere: int   # At a bonus position anywhere
+    hot_basename: int   # At a bonus position in the basename
+
+
+_NO_INDEX = _CharIndex(0, 0, 0, 0, 0)
+
+
+def _presence(strings: List[str], c: str, shift: int) -> int:
+    # bytes(map(...)) runs the membership test for every string in C
+    return int.from_bytes(bytes(map(operator.contains, strings, repeat(c))), "little") << shift
+
+
+def _at_least(weights: int, level: int, ones: int) -> int:
+    """Mask of the bytes of weights (each below 128) that are >= level."""
+    if level <= 0:
+        return ones
+    # Adding 128 - level carries into a byte's high bit exactly when it is >= level
+    return ((weights + (128 - level) * ones) & (ones << 7)) >> 7
+
+
+def _sorted_boosts(boosted: Dict[int, int]) -> Tuple[Dict[int, int], List[int], int]:
+    """(boosted, its indexes highest bonus first, their mask)."""
+    order = sorted(boosted, key=boosted.get, reverse=True)
+    return boosted, order, sum(1 << (8 * i) for i in boosted)
+
+
+class _Removed(NamedTuple):
+    """Paths masked out of searches, replaced whole on each removal."""
+    generation: int
+    indexes: frozenset
+    mask: int
+
+
+class _QueryState(NamedTuple):
+    """Candidate sets of the previous query, narrowed by the next keystroke."""
+    query: str
+    size: int
+    removed: int                    # _Removed.generation they exclude
+    anywhere: int                   # Paths containing every query char
+    anywhere_count: int
+    basename: int                   # Basenames containing every query char
+
+
+class FuzzyMatcher:
+    """
+    Incremental fuzzy matcher over a growing list of paths.
+
+    add_paths() and prewarm() may run on one thread while searches run
+    on others. Masks may cover more paths than a search looks at; every
+    candidate set is cut to its size first.
+    """
+
+    def __init__(self, paths: Iterable[str] = (), pool_size: int = POOL_SIZE):
+        self.pool_size = pool_size
+        self._lock = threading.Lock()  # Serializes writers; searches do not take it
+        self._size = 0  # Paths searched: set once all their columns are filled
+        self._paths = []
+        self._lower = []
+        self._bases = []
+        self._base_lower = []
+        self._hot = []  # _hot_chars() of each path
+        self._hot_base = []  # _hot_chars() of each basename
+        self._lengths = bytearray()  # Path lengths, capped at 255
+        self._index_of = {}  # type: Dict[str, int]  # Live path -> index
+        self._removed = _Removed(0, frozenset(), 0)
+        self._chars = {}  # type: Dict[str, _CharIndex]
+        self._length_masks = {}  # type: Dict[int, Tuple[int, int]]  # level -> (mask, size)
+        self._last = None  # type: Optional[_QueryState]
+        self._boosts = {}  # type: Dict[str, int]  # path -> frecency bonus
+        # (index -> frecency bonus, boosted indexes highest first, their mask), replaced whole
+        self._boosted = ({}, [], 0)  # type: Tuple[Dict[int, int], List[int], int]
+        self.add_paths(paths)
+
+    def __len__(self):
+        """Paths that can be found (added and not removed)."""
+        return self._size - len(self._removed.indexes)
+
+    @property
+    def removed(self) -> int:
+        """Removed paths still taking room in the indexes."""
+        return len(self._removed.indexes)
+
+    def add_paths(self, paths: Iterable[str]):
+        paths = list(paths)
+        if not paths:
+            return
+        lower = [p.lower() for p in paths]
+        bases = [_basename_start(p) for p in paths]
+        base_lower = [l[b:] for l, b in zip(lower, bases)]
+        hot = [_hot_chars(p, l, 0) for p, l in zip(paths, lower)]
+        hot_base = [_hot_chars(p, l, b) for p, l, b in zip(paths, lower, bases)]
+        lengths = bytearray(min(len(p), 255) for p in paths)
+        with self._lock:
+            start = len(self._paths)
+            self._paths.extend(paths)
+            self._lower.extend(lower)
+            self._bases.extend(bases)
+            self._base_lower.extend(base_lower)
+            self._hot.extend(hot)
+            self._hot_base.extend(hot_base)
+            self._lengths.extend(lengths)
+            self._index_of.update(zip(paths, range(start, start + len(paths))))
+            if self._boosts:
+                boosted = dict(self._boosted[0])
+                for i, path in enumerate(paths, start):
+                    if path in self._boosts:
+                        boosted[i] = self._boosts[path]
+                self._boosted = _sorted_boosts(boosted)
+            self._size = len(self._paths)
+
+    def set_boosts(self, scores: Dict[str, float]):
+        """Blend frecency scores (path -> score) into the ranking."""
+        boosts = {}
+        for path, score in scores.items():
+            bonus = int(BONUS_FRECENCY * math.log2(1 + score))
+            if bonus > 0:
+                boosts[path] = bonus
+        with self._lock:
+            self._boosts = boosts
+            index_of = self._index_of
+            self._boosted = _sorted_boosts({index_of[p]: bonus for p, bonus in boosts.items() if p in index_of})
+
+    def remove_paths(self, paths: Iterable[str]):
+        """Leave paths out of results; their index entries stay until compacted()."""
+        with self._lock:
+            indexes = [i for i in map(self._index_of.pop, paths, repeat(None)) if i is not None]
+            if not indexes:
+                return
+            flags = bytearray(max(indexes) + 1)
+            for i in indexes:
+                flags[i] = 1
+            old = self._removed
+            self._removed = _Removed(old.generation + 1, old.indexes.union(indexes),
+                                     old.mask | int.from_bytes(flags, "little"))
+
+    def compacted(self) -> "FuzzyMatcher":
+        """A new matcher over the paths not removed, with the same frecency boosts."""
+        removed = self._removed.indexes
+        matcher = FuzzyMatcher(pool_size=self.pool_size)
+        matcher._boosts = self._boosts
+        matcher.add_paths(path for i, path in enumerate(self._paths[:self._size]) if i not in removed)
+        return matcher
+
+    def prewarm(self, chars: str = "abcdefghijklmnopqrstuvwxyz0123456789._-" + os.sep):
+        """Build the per-character and path length indexes ahead of the first keystroke."""
+        size = self._size
+        for c in chars:
+            self._char_index(c, size)
+        for level in LENGTH_LEVELS:
+            self._length_mask(level, size)
+
+    def _char_index(self, c: str, size: int) -> _CharIndex:
+        """Masks of c covering at least the first size paths."""
+        index = self._chars.get(c, _NO_INDEX)
+        done = index.size
+        if done >= size:
+            return index
+        # Extended outside the lock: the columns up to size no longer change
+        shift = 8 * done
+        index = _CharIndex(size,
+                           index.anywhere | _presence(self._lower[done:size], c, shift),
+                           index.basename | _presence(self._base_lower[done:size], c, shift),
+                           index.hot_anywhere | _presence(self._hot[done:size], c, shift),
+                           index.hot_basename | _presence(self._hot_base[done:size], c, shift))
+        with self._lock:
+            if self._chars.get(c, _NO_INDEX).size < size:
+                self._chars[c] = index
+        return index
+
+    def _length_mask(self, level: int, size: int) -> int:
+        """Paths at most `level` characters long, among at least the first size."""
+        mask, done = self._length_masks.get(level, (0, 0))
+        if done >= size:
+            return mask
+        lengths = bytes(map(operator.le, self._lengths[done:size], repeat(level)))
+        mask |= int.from_bytes(lengths, "little") << (8 * done)
+        with self._lock:
+            if self._length_masks.get(level, (0, 0))[1] < size:
+                self._length_masks[level] = (mask, size)
+        return mask
+
+    def _narrow(self, query: str, size: int, removed: _Removed) -> _QueryState:
+        last = self._last
+        if (last is not None and last.size == size and last.removed == removed.generation
+                and query.startswith(last.query)):
+            # Each keystroke only filters the previous candidate set
+            anywhere, basename = last.anywhere, last.basename
+            rest = query[len(last.query):]
+        else:
+            anywhere = basename = int.from_bytes(_ONE * size, "little") & ~removed.mask
+            rest = query
+        for c in rest:
+            index = self._char_index(c, size)
+            anywhere &= index.anywhere
+            basename &= index.basename
+        count = anywhere.to_bytes(size, "little").count(_ONE) if anywhere else 0
+        state = _QueryState(query, size, removed.generation, anywhere, count, basename)
+        self._last = state
+        return state
+
+    def _tiers(self, query: str, anywhere: int, basename: int, size: int) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield (score bound, minimum path length, candidate mask) tiers,
+        highest bound first and shortest paths first within a bound.
+
+        Every query char scores at most SCORE_MATCH plus the consecutive
+        bonus, or more where the path holds that char at a bonus position:
+        weighing those chars per path (the first one heavier, as its bonus
+        counts double) bounds each path's score.
+        """
+        path_weights = base_weights = 0
+        for qi, c in enumerate(query):
+            index = self._char_index(c, size)
+            weight = _FIRST_WEIGHT if qi == 0 else 1
+            path_weights += weight * index.hot_anywhere
+            base_weights += weight * index.hot_basename
+        ones = int.from_bytes(_ONE * size, "little")
+        n = len(query)
+        floor = SCORE_MATCH * n + BONUS_CONSECUTIVE * (n - 1)
+        done = 0
+        for level in range(_FIRST_WEIGHT + n - 1 + _BASENAME_WEIGHT, -1, -1):
+            tier = ((basename & _at_least(base_weights, level - _BASENAME_WEIGHT, ones))
+                    | (anywhere & _at_least(path_weights, level, ones))) & ~done
+            if not tier:
+                continue
+            done |= tier
+            bound = floor + _UNIT * level
+            shortest = 0
+            for longest in LENGTH_LEVELS:
+                part = tier & self._length_mask(longest, size)
+                if part:
+                    yield bound, shortest, part
+                    tier &= ~part
+                    if not tier:
+                        break
+                shortest = longest + 1
+
+    def search(self, query: str, limit: int = 30, task=None) -> List[FuzzyMatch]:
+        """
+        Return the best `limit` matches for query, best first.
+        task: Optional BackgroundTask, polled for cancellation while scoring
+        """
+        query = "".join(query.lower().split())
+        size = self._size
+        removed = self._removed
+        boosted, boost_order, boost_mask = self._boosted
+        if not query:
+            # Most frecent files first, then walk order
+            order = chain((i for i in boost_order if i < size),
+                          (i for i in range(size) if i not in boosted))
+            order = (i for i in order if i not in removed.indexes)
+            return [FuzzyMatch(boosted.get(i, 0), self._paths[i], ()) for i in islice(order, limit)]
+        state = self._narrow(query, size, removed)
+        if not state.anywhere:
+            return []
+
+        # Min-heap of the best `limit` ((score, -length, -index), match)
+        # so far: ties go to shorter paths, then to the earlier path
+        top = []
+
+        def score(indexes):
+            for n, i in enumerate(indexes):
+                if task and not n % _CHECK_EVERY:
+                    task.check_cancelled()
+                match = score_path(query, self._paths[i], self._lower[i], self._bases[i])
+                if match:
+                    if i in boosted:
+                        match = match._replace(score=match.score + boosted[i])
+                    item = ((match.score, -len(match.path), -i), match)
+                    if len(top) < limit:
+                        heapq.heappush(top, item)
+                    elif item > top[0]:
+                        heapq.heapreplace(top, item)
+
+        if state.anywhere_count <= self.pool_size or _FIRST_WEIGHT + len(query) > _MAX_WEIGHT:
+            # Few enough candidates to score them all
+            score(_mask_indexes(state.anywhere, size))
+        else:
+            # Frecent files first (their bonus is not in the bounds),
+            # then tiers of decreasing bound until none can make the top
+            frecent = state.anywhere & boost_mask
+            score(_mask_indexes(frecent, size))
+            tiers = self._tiers(query, state.anywhere & ~frecent, state.basename & ~frecent, size)
+            for bound, shortest, mask in tiers:
+                if len(top) == limit and top[0][0] > (bound, -shortest, 0):
+                    break
+                score(_mask_indexes(mask, size))
+
+        return [match for _, match in sorted(top, reverse=True)]
+
+
+def _benchmark():
+    """Micro-benchmark: python -m zenpad.fuzzy [N]"""
+    import sys
+    import time
+    import random
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    random.seed(7)
+    words = ("src lib test core util quick open dialog window editor analysis session "
+             "file index main config render widget model view parser token buffer cache "
+             "store event log http json xml diff hash utils components assets docs").split()
+    exts = [".py", ".js", ".ts", ".c", ".h", ".md", ".json", ".xml", ".css", ".rs"]
+
+    def name():
+        parts = [random.choice(words) for _ in range(random.randint(1, 3))]
+        style = random.random()
+        if style < 0.3:
+            return "".join(p.capitalize() for p in parts)
+        return ("_" if style < 0.6 else "-").join(parts)
+
+    paths = set()
+    while len(paths) < n:
+        paths.add("/".join(name() for _ in range(random.randint(1, 6))) + random.choice(exts))
+    paths = sorted(paths)
+
+    t = time.perf_counter()
+    matcher = FuzzyMatcher(paths)
+    print(f"index {n} paths: {(time.perf_counter() - t) * 1000:.1f} ms")
+    t = time.perf_counter()
+    matcher.prewarm()
+    print(f"prewarm a-z0-9: {(time.perf_counter() - t) * 1000:.1f} ms")
+
+    for word in ("quickopendialog", "winedit", "src/json"):
+        print(f"typing {word!r}:")
+        for i in range(1, len(word) + 1):
+            query = word[:i]
+            t = time.perf_counter()
+            results = matcher.search(query)
+            ms = (time.perf_counter() - t) * 1000
+            top = results[0].path if results else "-"
+            print(f"  {query:<16} {ms:6.2f} ms  top: {top}")
+
+
+if __name__ == "__main__":
+    _benchmark()
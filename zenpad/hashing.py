@@ -0,0 +1,166 @@
+"""
+Chunked multi-algorithm hashing.
+
+A document is read once, chunk by chunk (text encoded a slice at a time,
+or a file's bytes as stored on disk), and every chunk is handed to all
+selected algorithms. Each algorithm runs on its own thread: hashlib and
+zlib release the GIL while digesting large buffers, so the digests are
+computed in parallel and the whole run takes about as long as the
+slowest algorithm alone.
+"""
+import os
+import zlib
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+# Bytes handed to the algorithms at a time
+CHUNK_SIZE = 1024 * 1024
+
+# Chunks read ahead of the slowest algorithm
+_QUEUE_DEPTH = 4
+
+
+class _Crc32:
+    """zlib.crc32 behind the hashlib update()/hexdigest() interface."""
+
+    def __init__(self, data: bytes = b""):
+        self.value = zlib.crc32(data)
+
+    def update(self, data: bytes):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self) -> str:
+        return f"{self.value:08x}"
+
+
+# Display name -> constructor, in dialog order
+ALGORITHMS = OrderedDict([
+    ("MD5", hashlib.md5),
+    ("SHA-1", hashlib.sha1),
+    ("SHA-256", hashlib.sha256),
+    ("SHA-512", hashlib.sha512),
+    ("SHA3-256", hashlib.sha3_256),
+    ("SHA3-512", hashlib.sha3_512),
+    ("BLAKE2b", hashlib.blake2b),
+    ("BLAKE2s", hashlib.blake2s),
+    ("CRC32", _Crc32),
+])
+
+# Computed unless the caller picks others
+DEFAULT_ALGORITHMS = ("MD5", "SHA-1", "SHA-256", "SHA-512")
+
+
+def iter_text_chunks(text: str, encoding: str = "utf-8", chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Encoded text, chunk_size characters at a time (never the whole encoded copy at once)."""
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size].encode(encoding)
+
+
+def iter_file_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """The bytes of a file as stored on disk."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _digest(hasher, chunks: "queue.Queue"):
+    """Algorithm thread body: update hasher until the None sentinel."""
+    while True:
+        chunk = chunks.get()
+        if chunk is None:
+            return
+        hasher.update(chunk)
+
+
+def hash_chunks(chunks: Iterable[bytes], algorithms: Sequence[str] = DEFAULT_ALGORITHMS,
+                total: Optional[int] = None, task=None) -> Dict[str, str]:
+    """
+    Feed chunks to every algorithm (names from ALGORITHMS), one thread each.
+
+    Args:
+        chunks: The data, in order
+        algorithms: Names from ALGORITHMS
+        total: Size of the data in units of len(chunk), for progress
+        task: Optional BackgroundTask for cancellation/progress
+
+    Returns:
+        OrderedDict {algorithm name: hex digest}, in the order given
+    """
+    hashers = OrderedDict((name, ALGORITHMS[name]()) for name in algorithms)
+    queues = [queue.Queue(_QUEUE_DEPTH) for _ in hashers]
+    threads = [threading.Thread(target=_digest, args=(hasher, chunk_queue), daemon=True)
+               for hasher, chunk_queue in zip(hashers.values(), queues)]
+    for thread in threads:
+        thread.start()
+
+    done = 0
+    try:
+        for chunk in chunks:
+            if task:
+                task.check_cancelled()
+                if total:
+                    task.report_progress(done / total)
+            for chunk_queue in queues:
+                chunk_queue.put(chunk)
+            done += len(chunk)
+    finally:
+        # Also on cancellation: the threads drain their queues and stop
+        for chunk_queue in queues:
+            chunk_queue.put(None)
+        for thread in threads:
+            thread.join()
+    return OrderedDict((name, hasher.hexdigest()) for name, hasher in hashers.items())
+
+
+def hash_text(text: str, algorithms: Sequence[str] = DEFAULT_ALGORITHMS,
+              encoding: str = "utf-8", task=None) -> Dict[str, str]:
+    """Digests of text encoded with encoding."""
+    def chunks():
+        # Progress in characters: the encoded size is only known once all of it is encoded
+        for start, chunk in zip(range(0, len(text), CHUNK_SIZE), iter_text_chunks(text, encoding)):
+            if task:
+                task.report_progress(start / len(text))
+            yield chunk
+
+    return hash_chunks(chunks(), algorithms, task=task)
+
+
+def hash_file(path: str, algorithms: Sequence[str] = DEFAULT_ALGORITHMS, task=None) -> Dict[str, str]:
+    """
+    Digests of a file's bytes on disk.
+
+    Raises:
+        OSError if the file cannot be read
+    """
+    return hash_chunks(iter_file_chunks(path), algorithms, os.path.getsize(path), task)
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m zenpad.hashing [megabytes]
+    import sys
+    import time
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    data = bytes(range(256)) * (size * 4096)
+    chunks = [data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+    print(f"{len(data) / 1e6:.0f} MB, {os.cpu_count()} CPUs")
+
+    started = time.perf_counter()
+    expected = OrderedDict()
+    for name in DEFAULT_ALGORITHMS:
+        expected[name] = ALGORITHMS[name](data).hexdigest()
+    print(f"sequential {', '.join(DEFAULT_ALGORITHMS)}: {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    result = hash_chunks(chunks, DEFAULT_ALGORITHMS)
+    print(f"threaded:   {time.perf_counter() - started:.2f}s, same digests: {result == expected}")
+
+    started = time.perf_counter()
+    hash_chunks(chunks, list(ALGORITHMS))
+    print(f"all {len(ALGORITHMS)} algorithms threaded: {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,249 @@
+"""
+.gitignore / .ignore support for Zenpad's project scanning.
+
+The patterns of each directory level are compiled into a single regex,
+so deciding whether a walked entry is ignored costs one fullmatch per
+level. Walkers carry an IgnoreStack down the tree and prune ignored
+directories instead of filtering their contents afterwards.
+"""
+import os
+import re
+import threading
+from typing import List, Optional, Tuple
+
+# Per-directory ignore files, lowest precedence first
+IGNORE_FILES = (".gitignore", ".ignore")
+
+# Repository-wide excludes, read at the project root
+GIT_INFO_EXCLUDE = os.path.join(".git", "info", "exclude")
+
+# Compiled levels kept across walks
+LEVEL_CACHE_SIZE = 1024
+
+# Appended to directory paths before matching; globs never match it
+_DIR_MARK = "\x00"
+
+
+def _translate_class(glob: str, start: int) -> Optional[Tuple[str, int]]:
+    """
+    Regex for the bracket expression opening at glob[start] and the index
+    of its "]", or None if it is never closed. Like git, a "]" right after
+    the opening bracket is literal, backslash escapes the next character
+    and a reversed range matches nothing.
+    """
+    n = len(glob)
+    i = start + 1
+    negated = glob[i:i + 1] in ("!", "^")
+    if negated:
+        i += 1
+    items = []
+    first = i
+    while i < n and (glob[i] != "]" or i == first):
+        low = glob[i]
+        if low == "\\" and i + 1 < n:
+            i += 1
+            low = glob[i]
+        if i + 2 < n and glob[i + 1] == "-" and glob[i + 2] != "]":
+            i += 2
+            high = glob[i]
+            if high == "\\" and i + 1 < n:
+                i += 1
+                high = glob[i]
+            if low <= high:
+                items.append(re.escape(low) + "-" + re.escape(high))
+        else:
+            items.append(re.escape(low))
+        i += 1
+    if i >= n:
+        return None
+    if negated:
+        return "[^/\\x00" + "".join(items) + "]", i
+    return ("[" + "".join(items) + "]" if items else "(?!)"), i
+
+
+def _translate_glob(glob: str) -> str:
+    """Translate gitignore glob syntax (no leading ! or trailing /) to regex."""
+    parts = []
+    i = 0
+    n = len(glob)
+    while i < n:
+        c = glob[i]
+        if c == "*":
+            if glob.startswith("**", i) and (i == 0 or glob[i - 1] == "/"):
+                if glob.startswith("**/", i):
+                    parts.append("(?:.*/)?")  # Zero or more directories
+                    i += 3
+                    continue
+                if i + 2 == n:
+                    parts.append(".*")  # Everything inside
+                    break
+            parts.append("[^/\\x00]*")
+            while i < n and glob[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            parts.append("[^/\\x00]")
+        elif c == "[":
+            bracket = _translate_class(glob, i)
+            if bracket is None:
+                parts.append(re.escape(c))  # Never closed: a literal "["
+            else:
+                parts.append(bracket[0])
+                i = bracket[1]
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(glob[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+
+def parse_pattern(line: str) -> Optional[Tuple[str, bool]]:
+    """
+    Convert one ignore-file line to (regex source, negated).
+
+    The regex is matched against a path relative to the ignore file's
+    directory, using "/" separators and _DIR_MARK appended for directories.
+    Returns None for blank lines and comments.
+    """
+    line = line.rstrip("\r\n")
+    # Trailing spaces are ignored unless escaped
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    if not line or line.startswith("#"):
+        return None
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith(("\\!", "\\#")):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to this directory
+    anchored = "/" in line
+    line = line.lstrip("/")
+    source = _translate_glob(line)
+    if not anchored:
+        source = "(?:.*/)?" + source
+    return source + (_DIR_MARK if dir_only else _DIR_MARK + "?"), negated
+
+
+class IgnoreLevel:
+    """The ignore rules of one directory, compiled into a single regex."""
+
+    def __init__(self, base: str, lines: List[str]):
+        self.base = base  # Directory relative to the project root ("" or "dir/")
+        rules = []
+        for rule in map(parse_pattern, lines):
+            if rule is None:
+                continue
+            try:
+                re.compile(rule[0])
+            except re.error:
+                continue  # Skipped, as git skips patterns it cannot parse
+            rules.append(rule)
+        # Later rules win: list them first so the first alternative that
+        # matches is the last matching line
+        rules.reverse()
+        self.negated = [negated for _, negated in rules]
+        self.regex = re.compile("|".join("(" + source + ")" for source, _ in rules)) if rules else None
+
+    def match(self, rel_path: str) -> Optional[bool]:
+        """True if ignored, False if re-included by a negation, None if no rule matches."""
+        if self.regex is None:
+            return None
+        m = self.regex.fullmatch(rel_path)
+        if m is None:
+            return None
+        return not self.negated[m.lastindex - 1]
+
+
+_level_cache = {}  # file set key -> IgnoreLevel
+_level_lock = threading.Lock()
+
+
+def load_level(dir_path: str, base: str, names: List[str], is_root: bool = False) -> Optional[IgnoreLevel]:
+    """
+    Compile the ignore files of one directory.
+
+    Args:
+        dir_path: Absolute directory path
+        base: Directory relative to the project root
+        names: File names in the directory (avoids stat'ing absent files)
+        is_root: Also read .git/info/exclude
+    """
+    paths = [os.path.join(dir_path, name) for name in IGNORE_FILES if name in names]
+    if is_root:
+        paths.insert(0, os.path.join(dir_path, GIT_INFO_EXCLUDE))
+
+    key = [base]
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        key.append((path, st.st_mtime_ns, st.st_size))
+    if len(key) == 1:
+        return None
+    key = tuple(key)
+
+    with _level_lock:
+        level = _level_cache.get(key)
+    if level is not None:
+        return level
+
+    lines = []
+    for path, _, _ in key[1:]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                lines.extend(f.readlines())
+        except OSError:
+            continue
+    level = IgnoreLevel(base, lines)
+    with _level_lock:
+        if len(_level_cache) >= LEVEL_CACHE_SIZE:
+            _level_cache.clear()  # Stale versions of edited files pile up
+        _level_cache[key] = level
+    return level
+
+
+class IgnoreStack:
+    """The ignore levels in effect for one directory, root first."""
+    __slots__ = ("levels",)
+
+    def __init__(self, levels: Tuple[IgnoreLevel, ...] = ()):
+        self.levels = levels
+
+    def child(self, dir_path: str, rel_dir: str, file_names: List[str]) -> "IgnoreStack":
+        """Stack for the directory rel_dir, given the file names it contains."""
+        level = load_level(dir_path, rel_dir, file_names, is_root=(rel_dir == ""))
+        if level is None or level.regex is None:
+            return self
+        return IgnoreStack(self.levels + (level,))
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Deeper ignore files take precedence over their parents."""
+        if not self.levels:
+            return False
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+        if is_dir:
+            rel_path += _DIR_MARK
+        for level in reversed(self.levels):
+            result = level.match(rel_path[len(level.base):])
+            if result is not None:
+                return result
+        return False
+
+    def filter(self, rel_dir: str, files: List[str], subdirs: List[str]) -> Tuple[List[str], List[str]]:
+        """Drop the ignored entries of one directory listing."""
+        if not self.levels:
+            return files, subdirs
+        return ([name for name in files if not self.is_ignored(rel_dir + name)],
+                [name for name in subdirs if not self.is_ignored(rel_dir + name, True)])
@@ -0,0 +1,418 @@
+"""
+Streaming JSON reformatting.
+
+Re-indents JSON by scanning its tokens instead of building Python objects
+with json.loads(), so memory stays flat however big the document is and
+the work can run on a worker that writes the output block by block.
+
+For valid input the output is the same as
+json.dumps(json.loads(text), indent=..., separators=...): strings are
+re-escaped and numbers normalized the way json would, the only difference
+being that duplicate object keys are kept as written. Invalid input
+raises json.JSONDecodeError with json's message, line and column.
+
+validate() only checks a document, with json's own decoder in a helper
+process; validate_lines() checks NDJSON line by line.
+"""
+import re
+import json
+import json.decoder
+import json.encoder
+import operator
+from typing import Callable, Optional, Tuple
+
+from zenpad.tasks import HelperProcess
+
+# Characters of input tokenized per batch
+_BATCH_SIZE = 1024 * 1024
+
+# One token per match, whitespace after brackets, commas and colons included,
+# so the tokens of a batch concatenate back to the input. A key and its colon
+# are one token.
+_TOKEN = re.compile(r'''
+    [{}\[\],:][ \t\n\r]*
+  | "[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"(?:[ \t\n\r]*:[ \t\n\r]*)?
+  | -?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?
+  | true|false|null|NaN|-?Infinity
+  | [ \t\n\r]+
+  | .                   # Anything else (a string cut short leaves its quote alone)
+''', re.VERBOSE | re.DOTALL)
+
+_LITERALS = frozenset(["true", "false", "null", "NaN", "Infinity", "-Infinity"])
+
+# What may come next
+_VALUE, _FIRST_VALUE, _KEY, _FIRST_KEY, _COLON, _NEXT, _DONE = range(7)
+
+# json.loads' message when something else comes
+_EXPECTING = {
+    _VALUE: "Expecting value",
+    _FIRST_VALUE: "Expecting value",
+    _KEY: "Expecting property name enclosed in double quotes",
+    _FIRST_KEY: "Expecting property name enclosed in double quotes",
+    _COLON: "Expecting ':' delimiter",
+    _NEXT: "Expecting ',' delimiter",
+    _DONE: "Extra data",
+}
+
+_INFINITY = float("inf")
+
+_first = operator.itemgetter(0)
+
+# Smaller documents are validated in-process (GIL held only briefly)
+INLINE_VALIDATE_SIZE = 1024 * 1024
+
+
+def _number_text(token: str) -> str:
+    """json.dumps() of the number json.loads() reads from token."""
+    if "." not in token and "e" not in token and "E" not in token:
+        return "0" if token == "-0" else token
+    value = float(token)
+    if value == _INFINITY:
+        return "Infinity"
+    if value == -_INFINITY:
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def _safe_cut(tokens) -> int:
+    """Number of leading tokens not affected by the batch ending where it does."""
+    try:
+        return tokens.index('"')  # A string cut short
+    except ValueError:
+        pass
+    # Numbers, literals and whitespace after the last delimiter may be cut short
+    for index in range(len(tokens) - 1, -1, -1):
+        if tokens[index][0] in "{}[],:":
+            return index + 1
+    return 0
+
+
+def _token_batches(text: str):
+    """Yield (offset, tokens) for consecutive runs of whole tokens."""
+    pos = 0
+    end = len(text)
+    size = _BATCH_SIZE
+    findall = _TOKEN.findall
+    while pos < end:
+        stop = min(pos + size, end)
+        tokens = findall(text, pos, stop)
+        if stop < end:
+            cut = _safe_cut(tokens)
+            if not cut:
+                # The first token is longer than the batch
+                if tokens[0] == '"':
+                    try:
+                        stop = json.decoder.scanstring(text, pos + 1)[1]
+                    except json.JSONDecodeError:
+                        yield pos, ['"']  # Invalid string: report it
+                        return
+                    size = stop - pos + _BATCH_SIZE
+                else:
+                    size *= 2
+                continue
+            del tokens[cut:]
+        yield pos, tokens
+        pos += sum(map(len, tokens))
+        size = _BATCH_SIZE
+
+
+def _error(message: str, text: str, offset: int, tokens, index: int) -> json.JSONDecodeError:
+    """message about tokens[index] of the batch starting at offset."""
+    return json.JSONDecodeError(message, text, offset + sum(map(len, tokens[:index])))
+
+
+def _key_error(state: int, depth: int, text: str, offset: int, tokens, index: int) -> json.JSONDecodeError:
+    """Error for a "key": token where no key may come."""
+    if state == _VALUE or state == _FIRST_VALUE:
+        # The string is a fine value; its colon is not
+        token = tokens[index]
+        index_pos = offset + sum(map(len, tokens[:index]))
+        colon = token.index(":", token.rindex('"'))
+        return json.JSONDecodeError(_EXPECTING[_NEXT if depth else _DONE], text, index_pos + colon)
+    return _error(_EXPECTING[state], text, offset, tokens, index)
+
+
+def _string_error(text: str, pos: int, state: int) -> json.JSONDecodeError:
+    """The error json.loads reports for the stray quote at pos."""
+    if state in (_VALUE, _FIRST_VALUE, _KEY, _FIRST_KEY):
+        try:
+            json.decoder.scanstring(text, pos + 1)
+        except json.JSONDecodeError as e:
+            return e
+    return json.JSONDecodeError(_EXPECTING[state], text, pos)
+
+
+def reformat(text: str, write: Callable[[str], None], indent: Optional[int] = 4,
+             separators: Optional[Tuple[str, str]] = None, sort_keys: bool = False, task=None):
+    """
+    Write text re-indented, in blocks, through write().
+
+    indent, separators and sort_keys work as in json.dumps(): indent=None
+    puts everything on one line, separators is (item separator, key
+    separator). With sort_keys each object is held until it closes, so
+    memory grows with the largest object instead of staying flat.
+
+    Raises:
+        json.JSONDecodeError (output written so far stops at a batch boundary)
+    """
+    if text.startswith("\ufeff"):
+        raise json.JSONDecodeError("Unexpected UTF-8 BOM (decode using utf-8-sig)", text, 0)
+    if separators is None:
+        separators = (", ", ": ") if indent is None else (",", ": ")
+    item_sep, key_sep = separators
+    step = "" if indent is None else " " * indent
+    # Line break + indentation before an item at each depth
+    breaks = [""] if indent is None else ["\n"]
+
+    scanstring = json.decoder.scanstring
+    encode = json.encoder.encode_basestring_ascii
+    stack = []  # Closing bracket of each open container
+    depth = 0
+    state = _VALUE
+    total = max(len(text), 1)
+    out = []
+    append = out.append  # Where output goes: out, or the member being sorted
+    members = None  # With sort_keys: [(key, output pieces)] of the innermost object
+    frames = []  # ... and (append, members) of the objects around it
+
+    for offset, tokens in _token_batches(text):
+        if task:
+            task.check_cancelled()
+            task.report_progress(offset / total)
+        for index, token in enumerate(tokens):
+            c = token[0]
+
+            if c == '"':
+                colon = token[-1] != '"'  # A key and its colon are one token
+                if colon:
+                    if state != _KEY and state != _FIRST_KEY:
+                        raise _key_error(state, depth, text, offset, tokens, index)
+                    token = token[:token.rindex('"') + 1]
+                elif len(token) == 1:
+                    raise _string_error(text, offset + sum(map(len, tokens[:index])), state)
+                value = scanstring(token, 1)[0] if "\\" in token else token[1:-1]
+                token = encode(value)  # Re-escaped like json.dumps (ensure_ascii)
+                if state == _KEY or state == _FIRST_KEY:  # Without colon, it is in the next batch
+                    if sort_keys:
+                        pieces = []
+                        members.append((value, pieces))
+                        append = pieces.append
+                    elif state == _FIRST_KEY:
+                        append(breaks[depth])
+                    append(token)
+                    if colon:
+                        append(key_sep)
+                        state = _VALUE
+                    else:
+                        state = _COLON
+                    continue
+            elif c == "," or c == ":":
+                if c == "," and state == _NEXT:
+                    if stack[-1] == "}":
+                        state = _KEY
+                        if sort_keys:
+                            continue  # Separators are added once sorted
+                    else:
+                        state = _VALUE
+                    append(item_sep)
+                    append(breaks[depth])
+                elif c == ":" and state == _COLON:
+                    append(key_sep)
+                    state = _VALUE
+                else:
+                    raise _error(_EXPECTING[state], text, offset, tokens, index)
+                continue
+            elif c == "{" or c == "[":
+                if state == _FIRST_VALUE:
+                    append(breaks[depth])
+                elif state != _VALUE:
+                    raise _error(_EXPECTING[state], text, offset, tokens, index)
+                if c == "{":
+                    stack.append("}")
+                    state = _FIRST_KEY
+                    if sort_keys:
+                        frames.append((append, members))
+                        members = []
+                    else:
+                        append(c)
+                else:
+                    stack.append("]")
+                    state = _FIRST_VALUE
+                    append(c)
+                depth += 1
+                if len(breaks) <= depth:
+                    breaks.append(breaks[-1] + step)
+                continue
+            elif c == "}" or c == "]":
+                if depth and stack[-1] == c and (
+                        state == _NEXT or state == (_FIRST_KEY if c == "}" else _FIRST_VALUE)):
+                    stack.pop()
+                    depth -= 1
+                    if sort_keys and c == "}":
+                        append, parent_members = frames.pop()
+                        if members:
+                            members.sort(key=_first)
+                            inner = item_sep + breaks[depth + 1]
+                            append("{" + breaks[depth + 1]
+                                   + inner.join("".join(pieces) for _, pieces in members)
+                                   + breaks[depth] + "}")
+                        else:
+                            append("{}")
+                        members = parent_members
+                    else:
+                        if state == _NEXT:
+                            append(breaks[depth])
+                        append(c)
+                    state = _NEXT if depth else _DONE
+                    continue
+                raise _error(_EXPECTING[state], text, offset, tokens, index)
+            elif c in " \t\n\r":
+                continue
+            elif token in _LITERALS:
+                pass
+            elif (c == "-" or c in "0123456789") and token != "-":
+                token = _number_text(token)
+            else:
+                raise _error(_EXPECTING[state], text, offset, tokens, index)
+
+            # A value
+            if state == _VALUE:
+                append(token)
+            elif state == _FIRST_VALUE:
+                append(breaks[depth])
+                append(token)
+            else:
+                raise _error(_EXPECTING[state], text, offset, tokens, index)
+            state = _NEXT if depth else _DONE
+        if out:
+            write("".join(out))
+            del out[:]
+
+    if state != _DONE:
+        raise json.JSONDecodeError(_EXPECTING[state], text, len(text))
+
+
+def format_text(text: str, indent: Optional[int] = 4, separators: Optional[Tuple[str, str]] = None,
+                sort_keys: bool = False) -> str:
+    """reformat() into a string."""
+    parts = []
+    reformat(text, parts.append, indent, separators, sort_keys)
+    return "".join(parts)
+
+
+def _discard(pairs):
+    return None
+
+
+def _decode_error(text: str):
+    """None, (message, pos) of json's error, or "fallback" if json gave up."""
+    try:
+        json.JSONDecoder(object_pairs_hook=_discard).decode(text)
+    except json.JSONDecodeError as e:
+        return e.msg, e.pos
+    except (RecursionError, MemoryError):
+        return "fallback"
+    return None
+
+
+def _validate_loop(conn):
+    """Validator process body: answer each document with its _decode_error()."""
+    conn.send("ready")
+    while True:
+        try:
+            text = conn.recv()
+        except EOFError:
+            return
+        conn.send(_decode_error(text))
+
+
+_validator = HelperProcess(_validate_loop, "JSON validator")
+
+
+def _resolve(text: str, result, task=None) -> Optional[json.JSONDecodeError]:
+    """Turn a _decode_error() result into the error (or None)."""
+    if result is None:
+        return None
+    if result != "fallback":
+        return json.JSONDecodeError(result[0], text, result[1])
+    try:
+        reformat(text, lambda block: None, None, task=task)
+    except json.JSONDecodeError as e:
+        return e
+    return None
+
+
+def validate(text: str, task=None) -> Optional[json.JSONDecodeError]:
+    """
+    The error json.loads() raises for text, or None if it is valid JSON.
+
+    json's C decoder is several times faster than the token scanner, but
+    it holds the GIL and cannot be interrupted, so it runs in a validator
+    process (spawned once, kept for the next check) that is killed if
+    task is cancelled. Objects are dropped as soon as they are decoded;
+    documents below INLINE_VALIDATE_SIZE are decoded in-process.
+    Documents the decoder cannot handle (nested too deeply) are checked
+    with reformat() instead.
+    """
+    if text.startswith("\ufeff"):
+        return json.JSONDecodeError("Unexpected UTF-8 BOM (decode using utf-8-sig)", text, 0)
+    if len(text) < INLINE_VALIDATE_SIZE:
+        return _resolve(text, _decode_error(text), task)
+    try:
+        result = _validator.call(text, task)
+    except EOFError:
+        result = "fallback"  # The validator died on it
+    return _resolve(text, result, task)
+
+
+# NDJSON lines validated between cancellation checks
+_LINES_PER_CHECK = 4096
+
+
+def validate_lines(text: str, task=None) -> Optional[json.JSONDecodeError]:
+    """
+    The first error of NDJSON text (one JSON document per line, blank
+    lines allowed), positioned in the whole text, or None. Lines are
+    short, so they are decoded in-process one at a time.
+    """
+    if text.startswith("\ufeff"):
+        return json.JSONDecodeError("Unexpected UTF-8 BOM (decode using utf-8-sig)", text, 0)
+    offset = 0
+    for number, line in enumerate(text.split("\n")):
+        if task and not number % _LINES_PER_CHECK:
+            task.check_cancelled()
+        if line.strip():
+            error = _resolve(line, _decode_error(line), task)
+            if error is not None:
+                return json.JSONDecodeError(error.msg, text, offset + error.pos)
+        offset += len(line) + 1
+    return None
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m zenpad.json_stream [records]
+    import sys
+    import time
+    import random
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = random.Random(1)
+    records = [{"id": i, "name": "user %d" % i, "score": rng.random() * 100, "active": i % 3 == 0,
+                "tags": ["a", "bé", "c\n"][:i % 4], "address": {"city": "Zürich", "zip": None}}
+               for i in range(count)]
+    text = json.dumps(records)
+    print(f"{len(text) / 1e6:.1f} MB")
+
+    started = time.perf_counter()
+    expected = json.dumps(json.loads(text), indent=4)
+    print(f"json.loads + json.dumps: {time.perf_counter() - started:.2f}s")
+    started = time.perf_counter()
+    result = format_text(text)
+    print(f"reformat: {time.perf_counter() - started:.2f}s, identical: {result == expected}")
+    started = time.perf_counter()
+    result = format_text(text, None, (",", ":"), sort_keys=True)
+    print(f"reformat (minified, sorted keys): {time.perf_counter() - started:.2f}s")
+    started = time.perf_counter()
+    error = validate(text[:-1])
+    print(f"validate: {time.perf_counter() - started:.2f}s, {error}")
+
@@ -0,0 +1,464 @@
+"""
+Line diff engine for Compare Tabs.
+
+difflib's SequenceMatcher looks for the longest matching block again in
+every gap, and its "popular line" junk heuristic makes repetitive files
+(logs, generated JSON) both slow and oddly aligned. This engine works on
+lines interned to integers, trims the common prefix and suffix, then
+runs a histogram diff (as in git): the anchor of a region is the common
+line with the fewest occurrences, extended to the longest run around it,
+and the gaps on either side are diffed the same way. Regions whose
+common lines are all too frequent to anchor on go to Myers' O(ND) diff,
+which stops after a cost cap and starts again from the furthest point it
+reached. A work cap bounds the whole run: once it is spent, regions left
+are reported as changed.
+
+The result is a list of difflib-style opcodes: format_unified() writes
+them exactly as difflib.unified_diff() does, SideBySide maps them to the
+rows of a two-pane view and intraline() finds the changed words of a
+replaced line.
+
+Run `python -m zenpad.line_diff` for a benchmark against difflib.
+"""
+import re
+import array
+import bisect
+import itertools
+from typing import Iterator, List, Sequence, Tuple
+
+# Lines occurring more often than this in a region are not used as anchors
+MAX_CHAIN = 64
+
+# Edit distance after which Myers' diff settles for the furthest point reached
+MAX_COST = 1024
+
+# Histogram work allowed per line of input; past it, regions left are
+# reported as changes without looking for anchors
+MAX_WORK_PER_LINE = 32
+
+# Lines compared between two cancellation checks
+_CHECK_INTERVAL = 1 << 16
+
+# Lines longer than this get no intraline ranges
+INTRALINE_MAX_LENGTH = 4000
+
+# Units compared by intraline(): words, runs of spaces, single other characters
+_TOKEN = re.compile(r"\w+|\s+|[^\w\s]")
+
+# (tag, i1, i2, j1, j2) as in difflib.SequenceMatcher.get_opcodes()
+Opcode = Tuple[str, int, int, int, int]
+
+
+def intern_lines(lines_a: Sequence[str], lines_b: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """Both sides as lists of line IDs (equal lines share an ID)."""
+    ids = {}
+    a = [ids.setdefault(line, len(ids)) for line in lines_a]
+    b = [ids.setdefault(line, len(ids)) for line in lines_b]
+    return a, b
+
+
+class _Budget:
+    """Counts comparisons, for the work cap and so a task can be cancelled mid-diff."""
+    __slots__ = ("task", "left", "limit")
+
+    def __init__(self, task, limit: int):
+        self.task = task
+        self.left = _CHECK_INTERVAL
+        self.limit = limit
+
+    def spend(self, amount: int):
+        self.left -= amount
+        if self.left <= 0:
+            self.limit -= _CHECK_INTERVAL - self.left
+            self.left = _CHECK_INTERVAL
+            if self.task:
+                self.task.check_cancelled()
+
+    @property
+    def exhausted(self) -> bool:
+        return self.limit <= 0
+
+
+def _myers_step(a, b, alo, ahi, blo, bhi, matches, budget, max_cost):
+    """
+    Myers' greedy diff of a[alo:ahi] and b[blo:bhi], adding its matching
+    runs to matches. Returns the end of the path found: (ahi, bhi), or
+    after max_cost edits the point the path got furthest to.
+    """
+    n, m = ahi - alo, bhi - blo
+    offset = max_cost + 1
+    v = [0] * (2 * max_cost + 3)
+    trace = []  # v[offset - d:offset + d + 1] before step d
+    end = None
+    for d in range(min(max_cost, n + m) + 1):
+        trace.append(v[offset - d:offset + d + 1])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                end = (d, x, y)
+                break
+        budget.spend(d + 1)
+        if end:
+            break
+    if end is None:
+        # Too costly: keep the path that got furthest along both sides
+        d = len(trace) - 1
+        reached = [k for k in range(-d, d + 1, 2) if v[offset + k] <= n and v[offset + k] - k <= m]
+        if not reached:
+            return ahi, bhi
+        k = max(reached, key=lambda k: 2 * v[offset + k] - k)
+        end = (d, v[offset + k], v[offset + k] - k)
+
+    d, x, y = end
+    end = (alo + x, blo + y)
+    for d in range(d, 0, -1):
+        prev = trace[d]  # prev[k + d] is v[k] before step d
+        k = x - y
+        if k == -d or (k != d and prev[k - 1 + d] < prev[k + 1 + d]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = prev[prev_k + d]
+        prev_y = prev_x - prev_k
+        run = min(x - prev_x, y - prev_y)
+        if run > 0:
+            matches.append((alo + x - run, blo + y - run, run))
+        x, y = prev_x, prev_y
+    if x > 0:
+        matches.append((alo, blo, x))
+    return end
+
+
+def _myers(a, b, alo, ahi, blo, bhi, matches, budget, max_cost):
+    """
+    Myers' diff of a region, max_cost edits at a time: each step continues
+    from where the previous one got furthest, until the region is done or
+    the work budget is spent (the rest is then left unmatched).
+    """
+    while alo < ahi and blo < bhi and not budget.exhausted:
+        alo, blo = _myers_step(a, b, alo, ahi, blo, bhi, matches, budget, max_cost)
+
+
+def _diff_regions(a, b, matches, budget, max_cost):
+    """Histogram diff of a and b, adding matching runs (i, j, size) to matches."""
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        # Common prefix and suffix
+        start = alo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        if alo > start:
+            matches.append((start, blo - (alo - start), alo - start))
+        end = ahi
+        while ahi > alo and bhi > blo and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        if ahi < end:
+            matches.append((ahi, bhi, end - ahi))
+        if alo == ahi or blo == bhi or budget.exhausted:
+            continue
+
+        occurrences = {}
+        for i in range(alo, ahi):
+            positions = occurrences.get(a[i])
+            if positions is None:
+                occurrences[a[i]] = [i]
+            else:
+                positions.append(i)
+        budget.spend(ahi - alo)
+
+        # Anchor: the rarest common line, extended to its longest run
+        best = None  # (i, j, size)
+        best_count = MAX_CHAIN
+        common = False
+        j = blo
+        while j < bhi:
+            positions = occurrences.get(b[j])
+            if positions is None:
+                j += 1
+                continue
+            common = True
+            count = len(positions)
+            if count > best_count:
+                j += 1
+                continue
+            next_j = j + 1
+            for i in positions:
+                si, sj = i, j
+                while si > alo and sj > blo and a[si - 1] == b[sj - 1]:
+                    si -= 1
+                    sj -= 1
+                ei, ej = i + 1, j + 1
+                while ei < ahi and ej < bhi and a[ei] == b[ej]:
+                    ei += 1
+                    ej += 1
+                if best is None or count < best_count or ei - si > best[2]:
+                    best = (si, sj, ei - si)
+                    best_count = count
+                if ej > next_j:
+                    next_j = ej
+            budget.spend(next_j - j + count)
+            j = next_j
+
+        if best is not None:
+            i, j, size = best
+            matches.append(best)
+            stack.append((i + size, ahi, j + size, bhi))
+            stack.append((alo, i, blo, j))
+        elif common:
+            _myers(a, b, alo, ahi, blo, bhi, matches, budget, max_cost)
+
+
+def diff_opcodes(a: Sequence, b: Sequence, max_cost: int = MAX_COST, task=None) -> List[Opcode]:
+    """
+    Opcodes turning a into b (hashable items, e.g. lines or intern_lines() IDs).
+
+    Args:
+        a, b: The two sequences
+        max_cost: Edit distance after which Myers' diff (for regions
+            without rare common lines) keeps the furthest path so far and
+            starts a new search from its end
+        task: Optional BackgroundTask for cancellation
+
+    Returns:
+        [(tag, i1, i2, j1, j2), ...] like SequenceMatcher.get_opcodes()
+    """
+    matches = []
+    budget = _Budget(task, MAX_WORK_PER_LINE * (len(a) + len(b)) + _CHECK_INTERVAL)
+    _diff_regions(a, b, matches, budget, max_cost)
+    matches.sort()
+
+    opcodes = []
+    i = j = 0
+    for ai, bj, size in matches + [(len(a), len(b), 0)]:
+        if i < ai and j < bj:
+            opcodes.append(("replace", i, ai, j, bj))
+        elif i < ai:
+            opcodes.append(("delete", i, ai, j, bj))
+        elif j < bj:
+            opcodes.append(("insert", i, ai, j, bj))
+        if size:
+            if opcodes and opcodes[-1][0] == "equal":
+                # Runs found separately but adjacent (e.g. trimmed suffix)
+                opcodes[-1] = ("equal", opcodes[-1][1], ai + size, opcodes[-1][3], bj + size)
+            else:
+                opcodes.append(("equal", ai, ai + size, bj, bj + size))
+        i, j = ai + size, bj + size
+    return opcodes
+
+
+def diff_lines(lines_a: Sequence[str], lines_b: Sequence[str], max_cost: int = MAX_COST,
+               task=None) -> List[Opcode]:
+    """diff_opcodes() of two lists of lines, compared as interned IDs."""
+    a, b = intern_lines(lines_a, lines_b)
+    return diff_opcodes(a, b, max_cost, task)
+
+
+def group_opcodes(opcodes: List[Opcode], n: int = 3) -> Iterator[List[Opcode]]:
+    """Hunks with up to n lines of context, like SequenceMatcher.get_grouped_opcodes()."""
+    codes = list(opcodes)
+    if not codes:
+        codes = [("equal", 0, 1, 0, 1)]
+    # Fixup leading and trailing groups if they show no changes
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    nn = n + n
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # End the current group and start a new one whenever there is a
+        # large range with no changes
+        if tag == "equal" and i2 - i1 > nn:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Unified diff range, as in difflib"""
+    beginning = start + 1  # Lines start numbering with one
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1  # Empty ranges begin at line just before the range
+    return f"{beginning},{length}"
+
+
+def format_unified(a: Sequence[str], b: Sequence[str], opcodes: List[Opcode], fromfile: str = "",
+                   tofile: str = "", fromfiledate: str = "", tofiledate: str = "", n: int = 3,
+                   lineterm: str = "\n") -> Iterator[str]:
+    """Opcodes of a and b formatted like difflib.unified_diff()."""
+    started = False
+    for group in group_opcodes(opcodes, n):
+        if not started:
+            started = True
+            fromdate = f"\t{fromfiledate}" if fromfiledate else ""
+            todate = f"\t{tofiledate}" if tofiledate else ""
+            yield f"--- {fromfile}{fromdate}{lineterm}"
+            yield f"+++ {tofile}{todate}{lineterm}"
+
+        first, last = group[0], group[-1]
+        file1_range = _format_range(first[1], last[2])
+        file2_range = _format_range(first[3], last[4])
+        yield f"@@ -{file1_range} +{file2_range} @@{lineterm}"
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield "+" + line
+
+
+def unified_diff(a: Sequence[str], b: Sequence[str], fromfile: str = "", tofile: str = "",
+                 fromfiledate: str = "", tofiledate: str = "", n: int = 3, lineterm: str = "\n",
+                 task=None) -> Iterator[str]:
+    """difflib.unified_diff() on top of diff_lines()."""
+    return format_unified(a, b, diff_lines(a, b, task=task), fromfile, tofile,
+                          fromfiledate, tofiledate, n, lineterm)
+
+
+class SideBySide:
+    """
+    Rows of a side-by-side view of opcodes, looked up without materializing
+    them: each opcode covers a run of rows (a replace as many as its longer
+    side), and a row is found by bisecting the runs' first rows.
+    """
+
+    def __init__(self, opcodes: List[Opcode]):
+        self.opcodes = opcodes
+        self.starts = array.array("q")  # First row of each opcode
+        self.changes = array.array("q")  # First row of each change, for navigation
+        rows = 0
+        for tag, i1, i2, j1, j2 in opcodes:
+            self.starts.append(rows)
+            if tag != "equal":
+                self.changes.append(rows)
+            rows += max(i2 - i1, j2 - j1)
+        self.count = rows
+
+    def __len__(self) -> int:
+        return self.count
+
+    def row(self, row: int) -> Tuple[str, int, int]:
+        """(tag, line of a or -1, line of b or -1) shown on row."""
+        index = bisect.bisect_right(self.starts, row) - 1
+        tag, i1, i2, j1, j2 = self.opcodes[index]
+        offset = row - self.starts[index]
+        return (tag, i1 + offset if offset < i2 - i1 else -1,
+                j1 + offset if offset < j2 - j1 else -1)
+
+    def next_change(self, row: int) -> int:
+        """First row of the first change after row, or -1."""
+        index = bisect.bisect_right(self.changes, row)
+        return self.changes[index] if index < len(self.changes) else -1
+
+    def previous_change(self, row: int) -> int:
+        """First row of the last change before row, or -1."""
+        index = bisect.bisect_left(self.changes, row)
+        return self.changes[index - 1] if index else -1
+
+
+def intraline(line_a: str, line_b: str, task=None) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+    """
+    Changed character ranges [(start, end), ...] of two versions of a
+    line, from a diff of their words, spaces and punctuation. Lines longer
+    than INTRALINE_MAX_LENGTH get no ranges.
+    """
+    if len(line_a) > INTRALINE_MAX_LENGTH or len(line_b) > INTRALINE_MAX_LENGTH:
+        return [], []
+    tokens_a = _TOKEN.findall(line_a)
+    tokens_b = _TOKEN.findall(line_b)
+    offsets_a = [0] + list(itertools.accumulate(map(len, tokens_a)))
+    offsets_b = [0] + list(itertools.accumulate(map(len, tokens_b)))
+    spans_a, spans_b = [], []
+    for tag, i1, i2, j1, j2 in diff_opcodes(tokens_a, tokens_b, task=task):
+        if tag == "equal":
+            continue
+        if i2 > i1:
+            spans_a.append((offsets_a[i1], offsets_a[i2]))
+        if j2 > j1:
+            spans_b.append((offsets_b[j1], offsets_b[j2]))
+    return spans_a, spans_b
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m zenpad.line_diff [lines]
+    import sys
+    import time
+    import random
+    import difflib
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(1)
+
+    def log_lines():
+        levels = ["INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR"]
+        return [f"2024-05-01 12:{i // 6000 % 60:02}:{i // 100 % 60:02} {rng.choice(levels)} "
+                f"worker-{rng.randrange(8)} request handled status={rng.choice([200, 200, 404, 500])}\n"
+                for i in range(size)]
+
+    def json_lines():
+        lines = ["[\n"]
+        while len(lines) < size:
+            lines += ["  {\n", f'    "id": {rng.randrange(50)},\n', '    "tags": [\n', '      "a",\n',
+                      '      "b"\n', "    ],\n", '    "ok": true\n', "  },\n"]
+        return lines[:size] + ["]\n"]
+
+    def edit(lines, changes):
+        lines = list(lines)
+        for _ in range(changes):
+            i = rng.randrange(len(lines))
+            choice = rng.random()
+            if choice < 0.4:
+                lines[i] = "changed " + lines[i]
+            elif choice < 0.7:
+                del lines[i]
+            else:
+                lines.insert(i, "inserted line\n")
+        return lines
+
+    def apply(a, b, opcodes):
+        result = []
+        for tag, i1, i2, j1, j2 in opcodes:
+            result += a[i1:i2] if tag == "equal" else b[j1:j2]
+        return result == b
+
+    for name, make in (("log", log_lines), ("json", json_lines)):
+        for changes in (10, 1000):
+            a = make()
+            b = edit(a, changes)
+            started = time.perf_counter()
+            ours = "".join(unified_diff(a, b, "a", "b"))
+            ours_time = time.perf_counter() - started
+            correct = apply(a, b, diff_lines(a, b))
+            started = time.perf_counter()
+            theirs = "".join(difflib.unified_diff(a, b, "a", "b"))
+            difflib_time = time.perf_counter() - started
+            print(f"{name:4} {size:,} lines, {changes:5} edits: line_diff {ours_time:6.2f}s "
+                  f"({ours.count(chr(10)):,} lines, applies: {correct}), "
+                  f"difflib {difflib_time:6.2f}s ({theirs.count(chr(10)):,} lines)")
@@ -0,0 +1,148 @@
+"""
+Time histogram and aggregates of a parsed log (see log_table.LogTable).
+
+Counts events per time bucket and level plus the most frequent programs,
+client IPs and status codes, in a single pass over the table's column
+codes. Timestamps are converted to buckets once per distinct value, so the
+pass itself is integer lookups into fixed-size arrays.
+"""
+import array
+import math
+from typing import Optional
+
+# Bucket widths offered, in seconds
+RESOLUTIONS = (("Second", 1), ("Minute", 60), ("Hour", 3600), ("Day", 86400))
+
+# Automatic resolution picks the finest width with at most this many buckets
+MAX_BUCKETS = 1440
+
+# Any resolution is coarsened so that the histogram keeps fewer buckets than this
+BUCKET_LIMIT = 86400
+
+# Fields aggregated alongside the histogram (absent ones are skipped)
+AGGREGATE_FIELDS = (("program", "Top programs"), ("ip", "Top IPs"), ("status", "Status codes"))
+
+# Values listed per aggregate
+TOP_VALUES = 10
+
+# Display order of known levels, most severe first; others follow by name
+LEVEL_ORDER = ("FATAL", "CRITICAL", "ERROR", "WARN", "WARNING", "NOTICE", "INFO", "DEBUG", "TRACE")
+
+
+def _level_key(level: str):
+    if level in LEVEL_ORDER:
+        return 0, LEVEL_ORDER.index(level), level
+    return 1, 0, level  # Unknown levels (and "") after the known ones
+
+
+class LogHistogram:
+    """
+    Events per bucket of `resolution` seconds, per level.
+
+    counts[i][b] is the number of events of levels[i] in bucket b, which
+    starts at start + b * resolution. first_rows[b] is the table row of the
+    first event in bucket b (-1 when empty). Events without a usable
+    timestamp are only counted in `untimed`. A resolution too fine for the
+    time span is replaced by the finest offered one below BUCKET_LIMIT
+    buckets (a multiple of days past that); `coarsened` then says so.
+    """
+
+    def __init__(self, table, resolution: Optional[int] = None, task=None):
+        ts_column = table.columns["@timestamp"]
+        seconds = [None if s is None else math.floor(s) for s in table.timestamp_seconds()]
+        known = [s for s in seconds if s is not None]
+        self.start = min(known) if known else 0
+        span = max(known) - self.start if known else 0
+        if resolution is None:
+            resolution = next((width for _, width in RESOLUTIONS if span // width < MAX_BUCKETS),
+                              RESOLUTIONS[-1][1])
+        self.coarsened = span // resolution >= BUCKET_LIMIT
+        if self.coarsened:
+            day = RESOLUTIONS[-1][1]
+            resolution = next((width for _, width in RESOLUTIONS
+                               if width > resolution and span // width < BUCKET_LIMIT),
+                              day * (span // (day * BUCKET_LIMIT) + 1))
+        self.resolution = resolution
+        self.start -= self.start % resolution
+        size = (span + resolution) // resolution if known else 0
+        # Timestamp code -> bucket (-1: no timestamp)
+        bucket_of = array.array("l", (-1 if s is None else (s - self.start) // resolution for s in seconds))
+
+        level_column = table.columns["level"]
+        self.levels = sorted(level_column.values, key=_level_key)
+        slot = {level: i for i, level in enumerate(self.levels)}
+        # Level code -> index into counts
+        level_slot = array.array("l", (slot[value] for value in level_column.values))
+
+        self.counts = [array.array("I", bytes(4 * size)) for _ in self.levels]
+        self.totals = array.array("I", bytes(4 * size))
+        self.first_rows = array.array("l", [-1]) * size
+        self.untimed = 0
+
+        aggregates = [(field, label, table.columns[field]) for field, label in AGGREGATE_FIELDS
+                      if field in table.columns]
+        value_counts = [array.array("I", bytes(4 * len(column.values))) for _, _, column in aggregates]
+
+        counts, totals, first_rows = self.counts, self.totals, self.first_rows
+        streams = [ts_column.codes, level_column.codes] + [column.codes for _, _, column in aggregates]
+        for row, codes in enumerate(zip(*streams)):
+            if task and not row & 0xFFFF:
+                task.check_cancelled()
+            for i, code in enumerate(codes[2:]):
+                value_counts[i][code] += 1
+            bucket = bucket_of[codes[0]]
+            if bucket < 0:
+                self.untimed += 1
+                continue
+            counts[level_slot[codes[1]]][bucket] += 1
+            totals[bucket] += 1
+            if first_rows[bucket] < 0:
+                first_rows[bucket] = row
+
+        # field -> (label, [(value, count)] most frequent first)
+        self.aggregates = {}
+        for (field, label, column), field_counts in zip(aggregates, value_counts):
+            top = sorted(((column.values[code], n) for code, n in enumerate(field_counts) if code and n),
+                         key=lambda item: -item[1])[:TOP_VALUES]
+            if top:
+                self.aggregates[field] = (label, top)
+
+    def __len__(self):
+        return len(self.totals)
+
+    def bucket_start(self, bucket: int) -> int:
+        """Epoch seconds at which bucket starts."""
+        return self.start + bucket * self.resolution
+
+    def first_row_from(self, bucket: int) -> int:
+        """Row of the first event in bucket or, if it is empty, in the next non-empty one (-1: none)."""
+        for index in range(max(bucket, 0), len(self.first_rows)):
+            if self.first_rows[index] >= 0:
+                return self.first_rows[index]
+        return -1
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m zenpad.log_histogram [events]
+    import sys
+    import time
+    import random
+    from zenpad import analysis
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = random.Random(1)
+    lines = []
+    for i in range(count):
+        seconds = i * 86400 // count
+        lines.append('10.0.%d.%d - - [27/Oct/2023:%02d:%02d:%02d +0000] "GET /page/%d HTTP/1.1" %s 512' % (
+            rng.randrange(4), rng.randrange(50), seconds // 3600, seconds // 60 % 60, seconds % 60,
+            i % 100, rng.choice(["200"] * 8 + ["404", "500"])))
+    table = analysis.build_log_table("\n".join(lines))
+
+    for resolution in (None, 1, 3600):
+        started = time.perf_counter()
+        histogram = LogHistogram(table, resolution)
+        print(f"{table.count} events -> {len(histogram)} buckets of {histogram.resolution}s "
+              f"in {time.perf_counter() - started:.2f}s")
+    for field, (label, top) in histogram.aggregates.items():
+        print(label, top[:3])
@@ -0,0 +1,350 @@
+"""
+Query language for parsed logs (see log_table.LogTable).
+
+    level:ERROR,WARN program:sshd @timestamp>2023-10-27T10:00 message~"timed out" -host:db1
+
+Terms are separated by spaces and must all match. Field names are the
+to_ecs_dict() names:
+
+    field:a,b     value is a or b (any case); on message: contains a or b
+    field=a,b     value is exactly a or b
+    field~regex   regex search (case-insensitive)
+    field>x       also >=, <, <=; numeric when both sides are numbers.
+                  @timestamp compares points in time by prefix:
+                  >2023-10-27T10:00 starts after that minute and
+                  <=2023-10-27T10:00 ends with it (UTC unless the value
+                  ends with Z or an offset such as +02:00, like the
+                  timestamps); events whose timestamp was not parsed
+                  never match a range
+    -term         negation
+    word          bare words (or "quoted phrases") search the message
+
+Terms on dictionary-encoded columns are decided once per distinct value
+and expanded through the inverted indexes; @timestamp ranges bisect the
+sorted timestamp index. Evaluation starts from the most selective term and
+only tests the remaining rows against the others, so message searches
+scan just the rows the indexed terms let through.
+"""
+import re
+import math
+import array
+import bisect
+import calendar
+import dataclasses
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from zenpad import log_table
+
+# Rows tested between cancellation checks
+_CHECK_EVERY = 65536
+
+# Prefix of a point in time, from the year down to fractions of a second
+_TIME_PREFIX = re.compile(r"(\d{4})(?:-(\d\d)(?:-(\d\d)(?:[T ](\d\d)(?::(\d\d)(?::(\d\d)(\.\d+)?)?)?)?)?)?"
+                          r"(Z|[+-]\d\d:?\d\d)?\Z")
+
+_TOKEN = re.compile(r'(-?)(?:([\w@.]+)(:|=|~|>=|<=|>|<))?("(?:[^"\\]|\\.)*"|\S+)')
+
+_RANGE_OPS = (">", ">=", "<", "<=")
+
+
+class QueryError(ValueError):
+    """A query could not be parsed or does not fit the table."""
+
+
+@dataclasses.dataclass
+class Term:
+    """One query term, e.g. Term("level", ":", ("ERROR",))."""
+    field: str
+    op: str
+    values: Tuple[str, ...]
+    negate: bool = False
+    pattern: Optional["re.Pattern"] = None  # For ~ and message=
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        return value[1:-1].replace('\\"', '"')
+    return value
+
+
+def parse_query(text: str) -> List[Term]:
+    """Parse a query string into Terms. Raises QueryError."""
+    terms = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        negate, field, op, raw = m.groups()
+        pos = m.end()
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+
+        if field is None:
+            field, op = "message", ":"  # Bare word
+        value = _unquote(raw)
+        if op in _RANGE_OPS:
+            values = (value,)
+        else:
+            values = tuple(v for v in (value.split(",") if not raw.startswith('"') else [value]) if v)
+        if not values:
+            raise QueryError(f"Missing value after '{field}{op}'")
+
+        pattern = None
+        try:
+            if op == "~":
+                pattern = re.compile(value, re.IGNORECASE)
+            elif field == "message" and op == "=":
+                pattern = re.compile("|".join("^" + re.escape(v) + r"\Z" for v in values))
+        except re.error as e:
+            raise QueryError(f"Invalid regex '{value}': {e}")
+        if field == "message" and op in _RANGE_OPS:
+            raise QueryError("message does not support range comparisons")
+        terms.append(Term(field, op, values, bool(negate), pattern))
+    return terms
+
+
+def _number(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _value_matcher(term: Term) -> Callable[[str], bool]:
+    """Test for one distinct column value (negation not applied)."""
+    if term.op == "~":
+        search = term.pattern.search
+        return lambda value: search(value) is not None
+    if term.op == ":":
+        wanted = {v.casefold() for v in term.values}
+        return lambda value: value.casefold() in wanted
+    if term.op == "=":
+        wanted = set(term.values)
+        return wanted.__contains__
+
+    bound = term.values[0]
+    number = _number(bound)
+
+    def key(value):
+        # Numbers compare as numbers, everything else as text
+        if number is not None:
+            value_number = _number(value)
+            if value_number is not None:
+                return value_number, number
+        return value, bound
+
+    compare = {
+        ">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+        "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+    }[term.op]
+    return lambda value: value != "" and compare(*key(value))
+
+
+def _time_span(value: str) -> Tuple[float, float]:
+    """[start, end) in epoch seconds of the period a timestamp prefix names. Raises QueryError."""
+    match = _TIME_PREFIX.match(value)
+    if match is None:
+        raise QueryError(f"Invalid timestamp '{value}' (expected e.g. 2023-10-27T10:00)")
+    year, month, day, hours, minutes, seconds, fraction, offset = match.groups()
+    parts = [int(part) for part in (year, month, day, hours, minutes, seconds) if part is not None]
+    fields = parts + [1, 1, 0, 0, 0][len(parts) - 1:]
+    try:
+        if not (1 <= fields[1] <= 12 and 1 <= fields[2] <= calendar.monthrange(fields[0], fields[1])[1]
+                and fields[3] <= 23 and fields[4] <= 59 and fields[5] <= 60):
+            raise ValueError
+        start = calendar.timegm(tuple(fields))
+    except ValueError:
+        raise QueryError(f"Invalid timestamp '{value}'")
+    if fraction:
+        start += float(fraction)
+        end = start + 10.0 ** (1 - len(fraction))
+    elif len(parts) > 3:
+        end = start + (3600, 60, 1)[len(parts) - 4]
+    elif len(parts) == 3:
+        end = start + 86400
+    elif len(parts) == 2:
+        end = calendar.timegm((fields[0] + fields[1] // 12, fields[1] % 12 + 1, 1, 0, 0, 0))
+    else:
+        end = calendar.timegm((fields[0] + 1, 1, 1, 0, 0, 0))
+    shift = log_table.offset_seconds(offset)
+    return start - shift, end - shift
+
+
+def _time_bounds(term: Term) -> Tuple[float, float]:
+    """[lo, hi) bounds in epoch seconds of an @timestamp range term."""
+    start, end = _time_span(term.values[0])
+    if term.op == ">":
+        return end, math.inf
+    if term.op == ">=":
+        return start, math.inf
+    if term.op == "<":
+        return -math.inf, start
+    return -math.inf, end
+
+
+class _IndexedTerm:
+    """A term answered from an index: knows its size, its rows and a row test."""
+
+    def __init__(self, size: int, rows: Callable[[], Sequence[int]], test: Callable[[int], bool]):
+        self.size = size
+        self.rows = rows
+        self.test = test
+
+
+def _codes_term(column, term: Term) -> _IndexedTerm:
+    matches = _value_matcher(term)
+    codes = {code for code, value in enumerate(column.values) if matches(value) != term.negate}
+    postings = column.postings()
+    size = sum(len(postings[code]) for code in codes)
+    column_codes = column.codes
+
+    def rows():
+        # Copy: a single value's posting list grows with the table
+        return array.array("I", column.rows_with(column.values[code] for code in codes))
+
+    if len(codes) == 1:
+        code = next(iter(codes))
+        return _IndexedTerm(size, rows, lambda row: column_codes[row] == code)
+    return _IndexedTerm(size, rows, lambda row: column_codes[row] in codes)
+
+
+def _time_term(table, lo: float, hi: float, negate: bool = False) -> _IndexedTerm:
+    # Only rows with a parsed timestamp are in the index, negated or not
+    order, keys = table.time_index()
+    seconds = table.timestamp_seconds()
+    codes = table.columns["@timestamp"].codes
+    start = bisect.bisect_left(keys, lo)
+    end = max(start, bisect.bisect_left(keys, hi))
+
+    def inside(row):
+        value = seconds[codes[row]]
+        return value is not None and lo <= value < hi
+
+    if negate:
+        size = len(keys) - (end - start)
+        rows = lambda: array.array("I", sorted(order[:start] + order[end:]))
+
+        def test(row):
+            value = seconds[codes[row]]
+            return value is not None and not lo <= value < hi
+    else:
+        size = end - start
+        rows = lambda: array.array("I", sorted(order[start:end]))
+        test = inside
+    return _IndexedTerm(size, rows, test)
+
+
+def _message_test(table, term: Term) -> Callable[[int], bool]:
+    messages = table.messages
+    if term.op == ":":
+        # Plain substrings: lower() + "in" is several times faster than re.IGNORECASE
+        needles = [value.lower() for value in term.values]
+        if len(needles) == 1:
+            needle = needles[0]
+            found = lambda row: needle in messages[row].lower()
+        else:
+            found = lambda row: any(needle in messages[row].lower() for needle in needles)
+    else:
+        search = term.pattern.search
+        found = lambda row: search(messages[row]) is not None
+    if term.negate:
+        return lambda row: not found(row)
+    return found
+
+
+def _filter_rows(rows: Sequence[int], test: Callable[[int], bool], task=None) -> array.array:
+    result = array.array("I")
+    for start in range(0, len(rows), _CHECK_EVERY):
+        if task:
+            task.check_cancelled()
+        result.extend(filter(test, rows[start:start + _CHECK_EVERY]))
+    return result
+
+
+def evaluate(table, terms: List[Term], task=None) -> array.array:
+    """
+    Rows of table matching every term, in source order.
+
+    Raises:
+        QueryError for fields the table does not have
+    """
+    indexed = []
+    scans = []
+    time_range = None  # Positive @timestamp ranges narrow one interval
+    for term in terms:
+        if term.field == "message":
+            scans.append(_message_test(table, term))
+            continue
+        column = table.columns.get(term.field)
+        if column is None:
+            raise QueryError(f"Unknown field '{term.field}' (fields: {', '.join(table.fields)})")
+        if term.field == "@timestamp" and term.op in _RANGE_OPS:
+            lo, hi = _time_bounds(term)
+            if term.negate:
+                indexed.append(_time_term(table, lo, hi, negate=True))
+            elif time_range is None:
+                time_range = (lo, hi)
+            else:
+                time_range = (max(lo, time_range[0]), min(hi, time_range[1]))
+        else:
+            indexed.append(_codes_term(column, term))
+    if time_range is not None:
+        indexed.append(_time_term(table, *time_range))
+
+    if indexed:
+        indexed.sort(key=lambda item: item.size)
+        if not indexed[0].size:
+            return array.array("I")
+        rows = indexed[0].rows()
+        tests = [item.test for item in indexed[1:]]
+    else:
+        rows = range(table.count)
+        tests = []
+    for test in tests + scans:
+        rows = _filter_rows(rows, test, task)
+    if not isinstance(rows, array.array):
+        rows = array.array("I", rows)
+    return rows
+
+
+def query(table, text: str, task=None) -> array.array:
+    """parse_query() and evaluate() in one call."""
+    return evaluate(table, parse_query(text), task)
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m zenpad.log_query [events]
+    import sys
+    import time
+    import random
+    from zenpad import analysis
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = random.Random(1)
+    programs = ["sshd", "cron", "kernel", "systemd", "nginx", "postfix"]
+    levels = ["info"] * 8 + ["warn", "error"]
+    lines = []
+    for i in range(count):
+        # Apache error log layout: the only built-in one with both a level and a program
+        seconds = i * 86400 // count
+        lines.append("[2023-10-27 %02d:%02d:%02d] [%s:%s] [pid %d] request %d %s" % (
+            seconds // 3600, seconds // 60 % 60, seconds % 60, rng.choice(programs), rng.choice(levels),
+            1000 + i % 50, i, "timed out" if rng.random() < 0.01 else "ok"))
+
+    started = time.perf_counter()
+    table = analysis.build_log_table("\n".join(lines))
+    print(f"built {table.count} rows in {time.perf_counter() - started:.2f}s, fields {table.fields}")
+
+    queries = [
+        "level:ERROR",
+        "level:ERROR program:sshd",
+        "@timestamp>=2023-10-27T10:00 @timestamp<2023-10-27T11:00",
+        "level:ERROR @timestamp>2023-10-27T10:00 message~\"timed out\"",
+        "-level:INFO,WARN",
+        "\"timed out\"",
+    ]
+    for text in queries:
+        query(table, text)  # Build indexes
+        started = time.perf_counter()
+        rows = query(table, text)
+        print(f"{(time.perf_counter() - started) * 1000:8.1f} ms {len(rows):8d}  {text}")
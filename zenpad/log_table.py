@@ -0,0 +1,357 @@
+"""
+Columnar storage for parsed log events.
+
+Instead of one dict per event, every ECS field is a column. Repetitive
+fields (level, host, program, ...) are dictionary-encoded: each distinct
+value is stored once and rows hold an integer code in an array. Inverted
+indexes (code -> rows) are built on demand for filtering.
+
+Tables are filled on one thread; once shared with worker threads they
+are only read, and the on-demand indexes are built under _index_lock.
+"""
+import re
+import array
+import datetime
+import functools
+import threading
+import collections
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Dictionary-encoded fields every table has, in display order
+INDEXED_FIELDS = ("@timestamp", "level", "source_type", "host", "program", "pid")
+
+# LogEntry attribute behind each indexed field
+_ENTRY_ATTRS = {
+    "@timestamp": "timestamp",
+    "level": "level",
+    "source_type": "source_type",
+    "host": "host",
+    "program": "program",
+    "pid": "pid",
+}
+
+
+# A normalized timestamp: TimestampParser output, optionally with an offset
+_ISO_TIMESTAMP = re.compile(r"(\d{4}-\d\d-\d\d)T(\d\d):(\d\d):(\d\d)(\.\d+)?(Z|[+-]\d\d:?\d\d)?\Z")
+
+# Guards the indexes built on demand by whichever thread asks first
+_index_lock = threading.RLock()
+
+_EPOCH_DAY = datetime.date(1970, 1, 1).toordinal()
+
+
+@functools.lru_cache(maxsize=4096)
+def _day_seconds(date: str) -> int:
+    """Epoch seconds at the start of a YYYY-MM-DD day (raises ValueError)."""
+    day = datetime.date(int(date[0:4]), int(date[5:7]), int(date[8:10]))
+    return (day.toordinal() - _EPOCH_DAY) * 86400
+
+
+def offset_seconds(offset: Optional[str]) -> int:
+    """Seconds east of UTC of an ISO offset ("Z", "+02:00", "-0700"; None: UTC)."""
+    if not offset or offset == "Z":
+        return 0
+    seconds = int(offset[1:3]) * 3600 + int(offset[-2:]) * 60
+    return -seconds if offset[0] == "-" else seconds
+
+
+def epoch_seconds(timestamp: str) -> Optional[float]:
+    """
+    Seconds since the epoch of a normalized ISO timestamp, or None for
+    anything else (raw syslog dates, kernel uptime offsets, ...).
+    The UTC offset is applied; timestamps without one count as UTC.
+    """
+    match = _ISO_TIMESTAMP.match(timestamp)
+    if match is None:
+        return None
+    date, hours, minutes, seconds, fraction, offset = match.groups()
+    hours, minutes, seconds = int(hours), int(minutes), int(seconds)
+    if hours > 23 or minutes > 59 or seconds > 60:
+        return None
+    try:
+        result = _day_seconds(date) + hours * 3600 + minutes * 60 + seconds
+    except ValueError:
+        return None
+    if fraction:
+        result += float(fraction)
+    return result - offset_seconds(offset)
+
+
+class Column:
+    """A dictionary-encoded string column; code 0 is the empty string."""
+    __slots__ = ("values", "codes", "_lookup", "_postings", "_indexed")
+
+    def __init__(self, rows: int = 0):
+        self.values = [""]  # code -> value
+        self._lookup = {"": 0}  # value -> code
+        self.codes = array.array("I", bytes(4 * rows))
+        self._postings = []  # code -> array of rows, filled up to _indexed
+        self._indexed = 0
+
+    def code(self, value: str) -> int:
+        """Code of value, interning it if new."""
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._lookup[value] = code
+        return code
+
+    def append(self, value: str):
+        self.codes.append(self.code(value or ""))
+
+    def pad(self, rows: int):
+        """Grow to rows entries with empty values."""
+        if len(self.codes) < rows:
+            self.codes.extend(bytes(4 * (rows - len(self.codes))))
+
+    def get(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+    def code_of(self, value: str) -> Optional[int]:
+        """Code of an existing value, or None."""
+        return self._lookup.get(value)
+
+    def postings(self) -> List[array.array]:
+        """Rows holding each code, in row order (extended incrementally after appends)."""
+        with _index_lock:
+            codes = self.codes
+            postings = self._postings
+            while len(postings) < len(self.values):
+                postings.append(array.array("I"))
+            for row in range(self._indexed, len(codes)):
+                postings[codes[row]].append(row)
+            self._indexed = len(codes)
+            return postings
+
+    def rows_with(self, values: Iterable[str]) -> array.array:
+        """Sorted rows whose value is one of values."""
+        postings = self.postings()
+        lists = [postings[code] for code in map(self.code_of, values) if code is not None]
+        if len(lists) == 1:
+            return lists[0]
+        rows = array.array("I", sorted(row for rows in lists for row in rows))
+        return rows
+
+    def counts(self) -> Dict[str, int]:
+        """Rows per value (empty value excluded), most frequent first."""
+        postings = self.postings()
+        counts = [(self.values[code], len(rows)) for code, rows in enumerate(postings) if code and rows]
+        counts.sort(key=lambda item: -item[1])
+        return collections.OrderedDict(counts)
+
+    def ranks(self) -> List[int]:
+        """Sort key of each code: the position of its value in sorted order."""
+        ranks = [0] * len(self.values)
+        for rank, code in enumerate(sorted(range(len(self.values)), key=self.values.__getitem__)):
+            ranks[code] = rank
+        return ranks
+
+    def truncate(self, rows: int):
+        """Drop the rows from rows on (values stay interned)."""
+        del self.codes[rows:]
+        for posting in self._postings:
+            while posting and posting[-1] >= rows:
+                posting.pop()
+        self._indexed = min(self._indexed, rows)
+
+    def copy(self) -> "Column":
+        """A copy of the values and rows (its index is rebuilt on demand)."""
+        column = Column()
+        column.values = self.values[:]
+        column._lookup = dict(self._lookup)
+        column.codes = array.array("I", self.codes)
+        return column
+
+    def extend_from(self, other: "Column"):
+        """Append the rows of other, re-coding its values."""
+        remap = array.array("I", (self.code(value) for value in other.values))
+        self.codes.extend(remap[code] for code in other.codes)
+
+
+class LogTable:
+    """
+    Parsed log events stored column by column.
+
+    Fields are the to_ecs_dict() names: INDEXED_FIELDS plus one column per
+    extra field (ip, status, thread, ...) and the free-text message. Each
+    row also records the source line its event starts on, and keeps the
+    timestamp_raw and raw_log values that event() returns but the table
+    does not display.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.columns = collections.OrderedDict((name, Column()) for name in INDEXED_FIELDS)
+        self._extra_names = []  # Columns beyond INDEXED_FIELDS, in creation order
+        self.messages = []  # Free text, one str per row
+        self.raw_timestamps = Column()  # timestamp_raw of each row
+        self.raw_logs = []  # raw_log of each row
+        self.lines = array.array("I")  # 0-based source line of each event
+        self._time_index = None  # (rows sorted by @timestamp, their epoch seconds), cached
+        self._seconds = []  # epoch_seconds() of each @timestamp value, by code
+
+    @property
+    def fields(self) -> List[str]:
+        """All field names in display order (message last)."""
+        return list(self.columns) + ["message"]
+
+    def _column(self, name: str) -> Column:
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = Column(self.count)  # Earlier rows are empty
+            self._extra_names.append(name)
+        return column
+
+    def append(self, entry, line: int = 0):
+        """Add a LogEntry that starts on source line `line`."""
+        columns = self.columns
+        for name, attr in _ENTRY_ATTRS.items():
+            columns[name].append(getattr(entry, attr))
+        extra = entry.extra
+        for name in self._extra_names:
+            columns[name].append(extra.get(name, ""))
+        for name, value in extra.items():
+            if name not in columns:
+                self._column(name).append(value)  # First row with this field
+        self.messages.append(entry.message)
+        self.raw_timestamps.append(entry.timestamp_raw)
+        self.raw_logs.append(entry.raw_log)
+        self.lines.append(line)
+        self.count += 1
+        self._time_index = None
+
+    def extend(self, other: "LogTable", line_offset: int = 0):
+        """Append all rows of other (e.g. a chunk parsed by a worker process)."""
+        for name, column in other.columns.items():
+            self._column(name).pad(self.count)
+            self.columns[name].extend_from(column)
+        self.count += other.count
+        for column in self.columns.values():
+            column.pad(self.count)
+        self.messages.extend(other.messages)
+        self.raw_timestamps.extend_from(other.raw_timestamps)
+        self.raw_logs.extend(other.raw_logs)
+        self.lines.extend(line + line_offset for line in other.lines)
+        self._time_index = None
+
+    def truncate(self, count: int):
+        """Keep only the first count rows (e.g. to re-parse a last event that kept growing)."""
+        if count >= self.count:
+            return
+        for column in self.columns.values():
+            column.truncate(count)
+        del self.messages[count:]
+        self.raw_timestamps.truncate(count)
+        del self.raw_logs[count:]
+        del self.lines[count:]
+        self.count = count
+        self._time_index = None
+
+    def copy(self) -> "LogTable":
+        """A copy to grow while readers of this table carry on (indexes are rebuilt on demand)."""
+        table = LogTable()
+        table.count = self.count
+        table.columns = collections.OrderedDict((name, column.copy()) for name, column in self.columns.items())
+        table._extra_names = self._extra_names[:]
+        table.messages = self.messages[:]
+        table.raw_timestamps = self.raw_timestamps.copy()
+        table.raw_logs = self.raw_logs[:]
+        table.lines = array.array("I", self.lines)
+        with _index_lock:
+            table._seconds = self._seconds[:]
+        return table
+
+    def value(self, row: int, field: str) -> str:
+        if field == "message":
+            return self.messages[row]
+        column = self.columns.get(field)
+        return column.get(row) if column else ""
+
+    def event(self, row: int) -> Dict[str, str]:
+        """The row as an ECS dict, with the fields and key order of to_ecs_dict()."""
+        columns = self.columns
+        values = [("@timestamp", columns["@timestamp"].get(row)),
+                  ("timestamp_raw", self.raw_timestamps.get(row)),
+                  ("source_type", columns["source_type"].get(row)),
+                  ("level", columns["level"].get(row)),
+                  ("host", columns["host"].get(row)),
+                  ("program", columns["program"].get(row)),
+                  ("pid", columns["pid"].get(row)),
+                  ("message", self.messages[row])]
+        values.extend((name, columns[name].get(row)) for name in self._extra_names)
+        values.append(("raw_log", self.raw_logs[row]))
+        return collections.OrderedDict((name, value) for name, value in values if value)
+
+    def filter(self, criteria: Dict[str, Iterable[str]], rows: Optional[Iterable[int]] = None) -> array.array:
+        """
+        Rows whose field values are in the given sets, e.g. {"level": ["ERROR"]}.
+
+        Starts from the most selective field's inverted index and checks
+        the other fields by code, so cost follows the result size.
+        """
+        if not criteria:
+            return array.array("I", range(self.count)) if rows is None else array.array("I", rows)
+        candidates = []
+        for name, values in criteria.items():
+            column = self.columns.get(name)
+            if column is None:
+                return array.array("I")
+            codes = {code for code in map(column.code_of, values) if code is not None}
+            postings = column.postings()
+            candidates.append((sum(len(postings[code]) for code in codes), column, codes))
+        candidates.sort(key=lambda item: item[0])
+
+        _, column, codes = candidates[0]
+        result = column.rows_with(column.values[code] for code in codes)
+        for _, column, codes in candidates[1:]:
+            column_codes = column.codes
+            result = array.array("I", (row for row in result if column_codes[row] in codes))
+        if rows is not None:
+            allowed = set(rows)
+            result = array.array("I", (row for row in result if row in allowed))
+        return result
+
+    def sorted_rows(self, rows: Iterable[int], field: str, descending: bool = False) -> array.array:
+        """rows ordered by field (stable, so ties keep source order)."""
+        if field == "message":
+            key = self.messages.__getitem__
+        else:
+            column = self.columns[field]
+            ranks = column.ranks()
+            codes = column.codes
+            key = lambda row: ranks[codes[row]]
+        return array.array("I", sorted(rows, key=key, reverse=descending))
+
+    def timestamp_seconds(self) -> List[Optional[float]]:
+        """epoch_seconds() of every @timestamp value, indexed by code (None: not a parsed timestamp)."""
+        values = self.columns["@timestamp"].values
+        with _index_lock:
+            seconds = self._seconds
+            if len(seconds) < len(values):
+                seconds.extend(map(epoch_seconds, values[len(seconds):]))
+            return seconds
+
+    def time_index(self) -> Tuple[array.array, List[float]]:
+        """
+        Rows with a parsed @timestamp sorted by time (ties in source order),
+        with the epoch seconds of each sorted row for bisecting (cached until
+        the table grows). Events without a parsed timestamp are left out.
+        """
+        with _index_lock:
+            if self._time_index is None:
+                seconds = self.timestamp_seconds()
+                postings = self.columns["@timestamp"].postings()
+                codes = sorted((code for code, value in enumerate(seconds) if value is not None and postings[code]),
+                               key=seconds.__getitem__)
+                order = array.array("I")
+                keys = []
+                for code in codes:
+                    order.extend(postings[code])
+                    keys.extend([seconds[code]] * len(postings[code]))
+                self._time_index = (order, keys)
+            return self._time_index
+
+    def time_order(self) -> array.array:
+        """Rows with a parsed @timestamp sorted by time (cached until the table grows)."""
+        return self.time_index()[0]
@@ -0,0 +1,560 @@
+"""
+Log table viewer for Zenpad.
+Shows a columnar LogTable in a Gtk.TreeView that only ever holds the rows
+on screen, so a million events scroll as fast as fifty, under a histogram
+of events over time.
+"""
+import bisect
+import time
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk, GLib, Pango
+
+from zenpad import analysis
+from zenpad import log_query
+from zenpad import log_histogram
+from zenpad.tasks import BackgroundTask
+
+# Fields offered in the filter bar, with the "no filter" label
+FILTER_FIELDS = (("level", "All levels"), ("program", "All programs"), ("host", "All hosts"))
+
+# Values listed per filter (most frequent first)
+FILTER_CHOICES = 200
+
+# Initial column widths in pixels
+COLUMN_WIDTHS = {"@timestamp": 190, "message": 600}
+DEFAULT_COLUMN_WIDTH = 110
+
+# Rows moved per mouse wheel step
+SCROLL_STEP = 3
+
+# Histogram bar colors (RGB) by level; other levels use DEFAULT_LEVEL_COLOR
+LEVEL_COLORS = {
+    "FATAL": (0.55, 0.0, 0.0), "CRITICAL": (0.55, 0.0, 0.0),
+    "ERROR": (0.85, 0.2, 0.2), "WARN": (0.95, 0.6, 0.1), "WARNING": (0.95, 0.6, 0.1),
+    "NOTICE": (0.3, 0.7, 0.4), "INFO": (0.25, 0.5, 0.85),
+    "DEBUG": (0.6, 0.6, 0.6), "TRACE": (0.75, 0.75, 0.75),
+}
+DEFAULT_LEVEL_COLOR = (0.55, 0.4, 0.75)
+
+HISTOGRAM_HEIGHT = 110
+
+
+class LogTableView(Gtk.Box):
+    """
+    A LogTable with a query entry, a filter bar and sortable columns.
+
+    The TreeView's ListStore holds one page of rows; a separate scrollbar
+    moves the page over the (filtered, sorted) row order. Queries and
+    sorting run on a BackgroundTask.
+    """
+
+    def __init__(self, table, on_activate=None, on_open=None, on_refresh=None):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.set_border_width(6)
+        self.table = table
+        self.on_activate = on_activate  # Called with (table, row) of an activated line
+        self.on_open = on_open  # Called with (table, rows, query text) to open the matches elsewhere
+        self.on_refresh = on_refresh  # Called to re-read a grown log file
+        # Columns that hold at least one value
+        self.fields = [f for f in table.fields if f == "message" or len(table.columns[f].values) > 1]
+        self.rows = range(table.count)  # Visible row order
+        self.offset = 0
+        self.page_size = 1
+        self.filters = {}  # field -> value
+        self.query_terms = []
+        self.sort_field = None
+        self.sort_descending = False
+        self.task = None
+
+        # Query bar
+        query_bar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        self.query_entry = Gtk.SearchEntry()
+        self.query_entry.set_placeholder_text('Query, e.g. level:ERROR program:sshd @timestamp>2023-10-27T10:00 message~"timed out"')
+        self.query_entry.connect("activate", self.on_query_activate)
+        query_bar.pack_start(self.query_entry, True, True, 0)
+        if on_open:
+            open_button = Gtk.Button(label="Open in Tab")
+            open_button.set_tooltip_text("Open the matching events as NDJSON in a new tab")
+            open_button.connect("clicked", self.on_open_clicked)
+            query_bar.pack_start(open_button, False, False, 0)
+        self.refresh_button = None
+        if on_refresh:
+            self.refresh_button = Gtk.Button(label="Refresh")
+            self.refresh_button.set_tooltip_text("Parse what was appended to the log file")
+            self.refresh_button.connect("clicked", lambda button: self.on_refresh())
+            query_bar.pack_start(self.refresh_button, False, False, 0)
+        self.pack_start(query_bar, False, False, 0)
+
+        # Filter bar
+        bar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        for field, label in FILTER_FIELDS:
+            counts = table.columns[field].counts()
+            if not counts:
+                continue
+            combo = Gtk.ComboBoxText()
+            combo.append("", label)
+            for value, n in list(counts.items())[:FILTER_CHOICES]:
+                combo.append(value, f"{value} ({n:,})")
+            combo.set_active(0)
+            combo.connect("changed", self.on_filter_changed, field)
+            bar.pack_start(combo, False, False, 0)
+        self.count_label = Gtk.Label()
+        bar.pack_end(self.count_label, False, False, 0)
+        self.pack_start(bar, False, False, 0)
+
+        # One page of rows: a string per field, then the table row
+        self.store = Gtk.ListStore(*([str] * len(self.fields) + [int]))
+        self.view = Gtk.TreeView(model=self.store)
+        self.view.set_fixed_height_mode(True)
+        for index, field in enumerate(self.fields):
+            renderer = Gtk.CellRendererText()
+            renderer.set_property("ellipsize", Pango.EllipsizeMode.END)
+            column = Gtk.TreeViewColumn(field, renderer, text=index)
+            column.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+            column.set_fixed_width(COLUMN_WIDTHS.get(field, DEFAULT_COLUMN_WIDTH))
+            column.set_resizable(True)
+            column.set_expand(field == "message")
+            column.set_clickable(True)
+            column.connect("clicked", self.on_header_clicked, field)
+            self.view.append_column(column)
+        self.view.connect("scroll-event", self.on_scroll)
+        self.view.connect("key-press-event", self.on_key_press)
+        self.view.connect("row-activated", self.on_row_activated)
+
+        # The TreeView never scrolls vertically itself
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.EXTERNAL)
+        scrolled.add(self.view)
+        scrolled.connect("size-allocate", self.on_size_allocate)
+
+        self.adjustment = Gtk.Adjustment(value=0, lower=0, upper=len(self.rows),
+                                         step_increment=1, page_increment=1, page_size=1)
+        self.adjustment.connect("value-changed", self.on_adjustment_changed)
+        scrollbar = Gtk.Scrollbar(orientation=Gtk.Orientation.VERTICAL, adjustment=self.adjustment)
+
+        hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        hbox.pack_start(scrolled, True, True, 0)
+        hbox.pack_start(scrollbar, False, False, 0)
+        self.pack_start(hbox, True, True, 0)
+
+        self.update_count_label()
+
+    @staticmethod
+    def prepare(table):
+        """Build the indexes the view and queries need up front (call on a worker thread)."""
+        for field, _ in FILTER_FIELDS + (("source_type", None),):
+            table.columns[field].postings()
+        table.time_index()
+
+    # --- Paging ---
+
+    def row_height(self):
+        if len(self.store):
+            rect = self.view.get_background_area(Gtk.TreePath(0), self.view.get_column(0))
+            if rect.height > 0:
+                return rect.height
+        _, natural = self.view.get_column(0).get_cells()[0].get_preferred_height(self.view)
+        return natural + 2
+
+    def on_size_allocate(self, widget, allocation):
+        _, header = self.view.convert_bin_window_to_widget_coords(0, 0)
+        page_size = max(1, (allocation.height - header) // self.row_height())
+        if page_size != self.page_size:
+            self.page_size = page_size
+            GLib.idle_add(self.update_adjustment)  # Don't touch widgets mid-allocation
+
+    def update_adjustment(self):
+        n = len(self.rows)
+        self.adjustment.configure(min(self.offset, max(0, n - self.page_size)), 0, n,
+                                  1, self.page_size, self.page_size)
+        self.fill_page()
+        return False
+
+    def on_adjustment_changed(self, adjustment):
+        offset = int(adjustment.get_value())
+        if offset != self.offset:
+            self.offset = offset
+            self.fill_page()
+
+    def scroll_to(self, offset):
+        self.adjustment.set_value(max(0, min(offset, len(self.rows) - self.page_size)))
+
+    def fill_page(self):
+        """Load the rows of the current page into the store, keeping the cursor row."""
+        cursor_row = self.get_cursor_row()
+        self.offset = int(self.adjustment.get_value())
+        table = self.table
+        fields = self.fields
+        self.store.clear()
+        for row in self.rows[self.offset:self.offset + self.page_size]:
+            values = [table.value(row, field) for field in fields]
+            if fields[-1] == "message":
+                values[-1] = values[-1].partition("\n")[0]  # Keep rows one line high
+            self.store.append(values + [row])
+        if cursor_row is not None:
+            self.set_cursor_row(cursor_row)
+
+    def get_cursor_row(self):
+        path, _ = self.view.get_cursor()
+        if path is None:
+            return None
+        return self.store[path][len(self.fields)]
+
+    def set_cursor_row(self, row):
+        for index, item in enumerate(self.store):
+            if item[len(self.fields)] == row:
+                self.view.set_cursor(Gtk.TreePath(index), None, False)
+                return
+
+    def reveal_row(self, row):
+        """Scroll to table row (or the next visible one when the query hides it) and select it."""
+        rows = self.rows
+        if self.sort_field is None:  # Source order
+            index = bisect.bisect_left(rows, row)
+        else:
+            try:
+                index = rows.index(row)
+            except ValueError:
+                return
+        if index >= len(rows):
+            return
+        self.scroll_to(index - self.page_size // 3)
+        self.set_cursor_row(rows[index])
+        self.view.grab_focus()
+
+    def on_scroll(self, widget, event):
+        ok, _, dy = event.get_scroll_deltas()
+        if not ok:
+            dy = {Gdk.ScrollDirection.UP: -1, Gdk.ScrollDirection.DOWN: 1}.get(event.direction, 0)
+        if dy:
+            self.scroll_to(self.offset + int(round(dy * SCROLL_STEP)) or (1 if dy > 0 else -1))
+        return True
+
+    def on_key_press(self, widget, event):
+        path, _ = self.view.get_cursor()
+        index = path.get_indices()[0] if path else 0
+        last = len(self.store) - 1
+        key = event.keyval
+        if key == Gdk.KEY_Down and index >= last:
+            self.scroll_to(self.offset + 1)
+        elif key == Gdk.KEY_Up and index <= 0:
+            self.scroll_to(self.offset - 1)
+        elif key == Gdk.KEY_Page_Down:
+            self.scroll_to(self.offset + self.page_size)
+        elif key == Gdk.KEY_Page_Up:
+            self.scroll_to(self.offset - self.page_size)
+        elif key == Gdk.KEY_Home and event.state & Gdk.ModifierType.CONTROL_MASK:
+            self.scroll_to(0)
+        elif key == Gdk.KEY_End and event.state & Gdk.ModifierType.CONTROL_MASK:
+            self.scroll_to(len(self.rows))
+        else:
+            return False
+        return True
+
+    def on_row_activated(self, view, path, column):
+        if self.on_activate:
+            self.on_activate(self.table, self.store[path][len(self.fields)])
+
+    # --- Filtering and sorting ---
+
+    def on_query_activate(self, entry):
+        try:
+            self.query_terms = log_query.parse_query(entry.get_text())
+        except log_query.QueryError as e:
+            self.count_label.set_text(str(e))
+            return
+        self.refresh_rows()
+
+    def on_open_clicked(self, button):
+        self.on_open(self.table, self.rows, self.query_entry.get_text().strip())
+
+    def on_filter_changed(self, combo, field):
+        value = combo.get_active_id()
+        if value:
+            self.filters[field] = value
+        else:
+            self.filters.pop(field, None)
+        self.refresh_rows()
+
+    def on_header_clicked(self, column, field):
+        if self.sort_field == field:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_field = field
+            self.sort_descending = False
+        for other in self.view.get_columns():
+            other.set_sort_indicator(other is column)
+        column.set_sort_order(Gtk.SortType.DESCENDING if self.sort_descending else Gtk.SortType.ASCENDING)
+        self.refresh_rows()
+
+    def set_table(self, table):
+        """Show a grown copy of the table (tasks still reading the old one are left to it)."""
+        self.table = table
+        self.refresh_rows()
+
+    def refresh_rows(self):
+        """Recompute the row order on a worker thread."""
+        if self.task:
+            self.task.cancel()
+        table = self.table
+        terms = self.query_terms + [log_query.Term(field, "=", (value,)) for field, value in self.filters.items()]
+        sort_field, descending = self.sort_field, self.sort_descending
+
+        def run(task):
+            rows = log_query.evaluate(table, terms, task) if terms else range(table.count)
+            task.check_cancelled()
+            if sort_field:
+                rows = table.sorted_rows(rows, sort_field, descending)
+            return rows
+
+        self.count_label.set_text("Updating...")
+        self.task = BackgroundTask(run, on_done=self.on_rows_ready, on_error=self.on_rows_failed).start()
+
+    def on_rows_ready(self, rows):
+        self.task = None
+        self.rows = rows
+        self.offset = 0
+        self.update_adjustment()
+        self.update_count_label()
+
+    def on_rows_failed(self, error):
+        self.task = None
+        self.count_label.set_text(str(error))  # e.g. a field this log does not have
+
+    def update_count_label(self):
+        if len(self.rows) == self.table.count:
+            self.count_label.set_text(f"{self.table.count:,} events")
+        else:
+            self.count_label.set_text(f"{len(self.rows):,} of {self.table.count:,} events")
+
+
+class LogHistogramView(Gtk.Box):
+    """
+    Stacked per-level bars of a LogHistogram with its aggregates beside it.
+    Clicking a bar calls on_bucket with the row of the first event in it.
+    """
+
+    def __init__(self, table, histogram, on_bucket=None):
+        super().__init__(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        self.set_border_width(6)
+        self.table = table
+        self.histogram = histogram
+        self.on_bucket = on_bucket
+        self.task = None
+        self._columns = None  # (column count, per-column level sums) of the last draw
+
+        left = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        header.pack_start(Gtk.Label(label="Events per"), False, False, 0)
+        self.resolution_combo = Gtk.ComboBoxText()
+        self.resolution_combo.append("", "Auto")
+        for name, width in log_histogram.RESOLUTIONS:
+            self.resolution_combo.append(str(width), name.lower())
+        self.resolution_combo.set_active(0)
+        self.resolution_combo.connect("changed", self.on_resolution_changed)
+        header.pack_start(self.resolution_combo, False, False, 0)
+        self.summary_label = Gtk.Label()
+        self.summary_label.get_style_context().add_class("dim-label")
+        header.pack_start(self.summary_label, False, False, 0)
+        left.pack_start(header, False, False, 0)
+
+        self.area = Gtk.DrawingArea()
+        self.area.set_size_request(-1, HISTOGRAM_HEIGHT)
+        self.area.add_events(Gdk.EventMask.BUTTON_PRESS_MASK)
+        self.area.set_has_tooltip(True)
+        self.area.connect("draw", self.on_draw)
+        self.area.connect("button-press-event", self.on_button_press)
+        self.area.connect("query-tooltip", self.on_query_tooltip)
+        left.pack_start(self.area, True, True, 0)
+        self.pack_start(left, True, True, 0)
+
+        self.aggregate_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        self.pack_start(self.aggregate_box, False, False, 0)
+        self.set_histogram(histogram)
+
+    def set_histogram(self, histogram):
+        self.histogram = histogram
+        self._columns = None
+        notes = []
+        if histogram.coarsened:
+            names = {width: name.lower() for name, width in log_histogram.RESOLUTIONS}
+            per = names.get(histogram.resolution, f"{histogram.resolution // 86400} days")
+            notes.append(f"counted per {per}: too many buckets")
+        if histogram.untimed:
+            notes.append(f"{histogram.untimed:,} events without a timestamp")
+        self.summary_label.set_text(", ".join(notes))
+
+        for child in self.aggregate_box.get_children():
+            self.aggregate_box.remove(child)
+        for label, top in histogram.aggregates.values():
+            lines = [f"<b>{GLib.markup_escape_text(label)}</b>"]
+            lines.extend(f"{GLib.markup_escape_text(value)}  <span alpha='60%'>{n:,}</span>"
+                         for value, n in top)
+            column = Gtk.Label()
+            column.set_markup("\n".join(lines))
+            column.set_xalign(0)
+            column.set_yalign(0)
+            self.aggregate_box.pack_start(column, False, False, 0)
+        self.aggregate_box.show_all()
+        self.area.queue_draw()
+
+    def set_table(self, table):
+        """Recount a grown copy of the table at the current resolution."""
+        self.table = table
+        self.on_resolution_changed(self.resolution_combo)
+
+    def on_resolution_changed(self, combo):
+        if self.task:
+            self.task.cancel()
+        width = combo.get_active_id()
+        resolution = int(width) if width else None
+        table = self.table
+
+        def on_done(histogram):
+            self.task = None
+            self.set_histogram(histogram)
+
+        self.task = BackgroundTask(lambda task: log_histogram.LogHistogram(table, resolution, task),
+                                   on_done=on_done).start()
+
+    # --- Drawing ---
+
+    def column_sums(self, columns):
+        """Per-level event counts of each of `columns` bar columns (buckets merged when there are more)."""
+        if self._columns and self._columns[0] == columns:
+            return self._columns[1]
+        histogram = self.histogram
+        n = len(histogram)
+        sums = []
+        for counts in histogram.counts:
+            level_sums = []
+            for c in range(columns):
+                level_sums.append(sum(counts[c * n // columns:(c + 1) * n // columns]))
+            sums.append(level_sums)
+        self._columns = (columns, sums)
+        return sums
+
+    def bucket_range(self, x):
+        """Buckets under pixel x, as (first, end)."""
+        n = len(self.histogram)
+        width = self.area.get_allocated_width()
+        columns = min(n, max(width, 1))
+        c = min(int(x * columns / max(width, 1)), columns - 1)
+        return c * n // columns, (c + 1) * n // columns
+
+    def on_draw(self, widget, cr):
+        histogram = self.histogram
+        width = widget.get_allocated_width()
+        height = widget.get_allocated_height()
+        if not len(histogram) or width <= 0:
+            return False
+        columns = min(len(histogram), width)
+        sums = self.column_sums(columns)
+        peak = max(sum(level[c] for level in sums) for c in range(columns)) or 1
+        bar = width / columns
+        for c in range(columns):
+            y = height
+            for level, level_sums in zip(histogram.levels, sums):
+                if not level_sums[c]:
+                    continue
+                h = level_sums[c] * height / peak
+                y -= h
+                cr.set_source_rgb(*LEVEL_COLORS.get(level, DEFAULT_LEVEL_COLOR))
+                cr.rectangle(c * bar, y, max(bar - (1 if bar > 3 else 0), 1), h)
+                cr.fill()
+        return False
+
+    def on_query_tooltip(self, widget, x, y, keyboard_mode, tooltip):
+        histogram = self.histogram
+        if not len(histogram):
+            return False
+        first, end = self.bucket_range(x)
+        start_text = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(histogram.bucket_start(first)))
+        end_text = time.strftime("%H:%M:%S", time.gmtime(histogram.bucket_start(end)))
+        lines = [f"{start_text} - {end_text}"]
+        for level, counts in zip(histogram.levels, histogram.counts):
+            n = sum(counts[first:end])
+            if n:
+                lines.append(f"{level or '(no level)'}: {n:,}")
+        tooltip.set_text("\n".join(lines))
+        return True
+
+    def on_button_press(self, widget, event):
+        if event.button != 1 or not len(self.histogram) or not self.on_bucket:
+            return False
+        first, _ = self.bucket_range(event.x)
+        row = self.histogram.first_row_from(first)
+        if row >= 0:
+            self.on_bucket(row)
+        return True
+
+
+class LogTableWindow(Gtk.Window):
+    """
+    Utility window hosting a LogTableView, under a LogHistogramView when a
+    histogram is given. With a checkpoint (see analysis.log_checkpoint),
+    Refresh appends what was written to the log file since.
+
+    A table is never modified once shown, since queries, histograms and
+    exports read it on worker threads: Refresh grows a copy and swaps it in.
+    """
+
+    def __init__(self, parent, table, title, on_activate=None, on_open=None, histogram=None,
+                 checkpoint=None):
+        super().__init__(title=title)
+        self.set_default_size(1000, 700)
+        self.set_transient_for(parent)
+        self.table = table
+        self.checkpoint = checkpoint
+        self.refresh_task = None
+        self.table_view = LogTableView(table, on_activate, on_open,
+                                       on_refresh=self.on_refresh if checkpoint else None)
+        self.histogram_view = None
+        if histogram is None:
+            self.add(self.table_view)
+        else:
+            self.histogram_view = LogHistogramView(table, histogram, on_bucket=self.table_view.reveal_row)
+            paned = Gtk.Paned(orientation=Gtk.Orientation.VERTICAL)
+            paned.pack1(self.histogram_view, False, False)
+            paned.pack2(self.table_view, True, False)
+            self.add(paned)
+        self.connect("destroy", self.on_destroy)
+
+    def on_refresh(self):
+        if self.refresh_task or self.checkpoint is None:
+            return
+        checkpoint, table = self.checkpoint, self.table
+        self.table_view.refresh_button.set_sensitive(False)
+        self.table_view.count_label.set_text("Reading new events...")
+
+        def run(task):
+            rows, new_checkpoint = analysis.resume_log_table(checkpoint, task)
+            grown = table.copy()
+            # The last row was the pending event, parsed again with what followed it
+            grown.truncate(grown.count - 1)
+            grown.extend(rows)
+            LogTableView.prepare(grown)
+            return grown, new_checkpoint
+
+        def on_done(result):
+            self.table, self.checkpoint = result
+            self.refresh_task = None
+            self.table_view.set_table(self.table)
+            if self.histogram_view:
+                self.histogram_view.set_table(self.table)
+            self.table_view.refresh_button.set_sensitive(self.checkpoint is not None)
+
+        def on_error(error):
+            self.refresh_task = None
+            self.table_view.count_label.set_text(str(error))
+
+        self.refresh_task = BackgroundTask(run, on_done=on_done, on_error=on_error).start()
+
+    def on_destroy(self, widget):
+        tasks = [self.table_view.task, self.refresh_task]
+        if self.histogram_view:
+            tasks.append(self.histogram_view.task)
+        for task in tasks:
+            if task:
+                task.cancel()
@@ -0,0 +1,464 @@
+"""
+Structural outline of JSON and XML documents.
+
+A scanner that only looks at brackets, keys and tags records every
+container (JSON object or array, XML element) with its start and end
+offsets, key or tag, parent and child count. Nodes live in flat arrays
+in document order, so millions of them stay cheap: the first child of
+node i is i + 1 and after[i] is the node following its subtree, so the
+children of a node are listed without visiting its grandchildren.
+
+The scanner is lenient: unclosed containers end where the text ends and
+stray closing brackets are skipped, so a document being typed still has
+an outline. After an edit, update() rescans only the innermost container
+enclosing the edited range and splices its nodes in.
+"""
+import re
+import array
+import bisect
+import dataclasses
+import json.decoder
+from typing import Iterator, Optional, Tuple
+
+# Document kinds with an outline, by GtkSource language id
+LANGUAGE_KINDS = {"json": "json", "xml": "xml"}
+
+# Scanner matches between cancellation checks
+_CHECK_EVERY = 65536
+
+# Longest scalar value shown in a child label
+VALUE_PREVIEW = 60
+
+# Characters of JSON scanned per batch
+_BATCH_SIZE = 1024 * 1024
+
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_STRING_RE = re.compile(_STRING, re.DOTALL)
+
+# Tokens that concatenate back to the input: a closing bracket, everything
+# up to the next bracket or key of a container, an opening bracket with the
+# key before it, and a lone quote for a string left open
+_JSON_TOKEN = re.compile(r'''
+    [}}\]]
+  | (?:[^"{{}}\[\]]+|{string}(?![ \t\n\r]*:[ \t\n\r]*[{{\[]))+
+  | (?:{string}[ \t\n\r]*:[ \t\n\r]*)?[{{\[]
+  | "
+'''.format(string=_STRING), re.VERBOSE | re.DOTALL)
+
+# Start, end and empty-element tags by name; comments, CDATA, PIs and
+# declarations are matched whole so the tags inside them are skipped.
+# A "<" matching none of them starts markup left open.
+_XML_STRUCTURE = re.compile(r'''<(?:
+    (/?)([^\s/>!?]+)(?:[^>"']|"[^"]*"|'[^']*')*?(/?)>
+  | !--.*?-->
+  | !\[CDATA\[.*?\]\]>
+  | \?.*?\?>
+  | ![A-Za-z](?:[^>\[]|\[[^\]]*\])*>
+  | ()
+)''', re.VERBOSE | re.DOTALL)
+
+_SPACE = re.compile(r"[ \t\n\r]*")
+
+# Up to and including the comma after a member
+_JSON_NEXT = re.compile(r"[ \t\n\r]*,?")
+
+# Optional key of a member, then the start of its value
+_JSON_MEMBER = re.compile(r"[ \t\n\r]*(?:(" + _STRING + r")[ \t\n\r]*:[ \t\n\r]*)?", re.DOTALL)
+
+# A scalar value and the comma after it
+_JSON_SCALAR = re.compile("(" + _STRING + r'|[^,\]}"\s]+)[ \t\n\r]*,?', re.DOTALL)
+
+
+def kind_for_language(language_id: Optional[str]) -> Optional[str]:
+    """'json' or 'xml' for languages with an outline, else None."""
+    return LANGUAGE_KINDS.get(language_id)
+
+
+def _key_text(token: str) -> str:
+    """Decoded key of a '"key":' token (anything after the colon is ignored)."""
+    token = token[:token.rindex('"') + 1]
+    if "\\" not in token:
+        return token[1:-1]
+    try:
+        return json.decoder.scanstring(token, 1)[0]
+    except json.JSONDecodeError:
+        return token[1:-1]
+
+
+@dataclasses.dataclass
+class OutlineItem:
+    """One child row: a container node, or a scalar member (node -1)."""
+    label: str
+    offset: int
+    node: int = -1
+    value: str = ""
+
+
+class _Nodes:
+    """Columns filled by a scan, with parents and after relative to the scan."""
+
+    def __init__(self):
+        self.starts = array.array("q")
+        self.ends = array.array("q")
+        self.parents = array.array("i")
+        self.after = array.array("I")
+        self.counts = array.array("I")
+        self.labels = []
+        self.balanced = True  # Every container closed, nothing stray
+
+
+def _json_batches(text: str, start: int, end: int):
+    """Yield (offset, tokens) for consecutive runs of whole tokens of text[start:end]."""
+    pos = start
+    size = _BATCH_SIZE
+    findall = _JSON_TOKEN.findall
+    while pos < end:
+        stop = min(pos + size, end)
+        tokens = findall(text, pos, stop)
+        if stop < end:
+            # A string cut short leaves a lone quote; text after the last
+            # bracket may belong to a longer token
+            try:
+                cut = tokens.index('"')
+            except ValueError:
+                cut = len(tokens)
+                while cut and tokens[cut - 1][-1] not in "{}[]":
+                    cut -= 1
+            if not cut:
+                if tokens[0] == '"':
+                    # A string longer than the batch
+                    string = _STRING_RE.match(text, pos, end)
+                    if string is None:
+                        yield pos, tokens[:1]  # Unterminated: report it
+                        return
+                    size = string.end() - pos + _BATCH_SIZE
+                else:
+                    size *= 2
+                continue
+            del tokens[cut:]
+        yield pos, tokens
+        pos += sum(map(len, tokens))
+        size = _BATCH_SIZE
+
+
+def _scan_json(text: str, start: int, end: int, task=None) -> _Nodes:
+    nodes = _Nodes()
+    starts, ends, parents, after, counts, labels = (
+        nodes.starts, nodes.ends, nodes.parents, nodes.after, nodes.counts, nodes.labels)
+    stack = []  # [node, is array, commas, has content] of each open container
+    strip_strings = _STRING_RE.sub
+    for offset, tokens in _json_batches(text, start, end):
+        if task:
+            task.check_cancelled()
+            task.report_progress((offset - start) / max(end - start, 1))
+        pos = offset
+        for token in tokens:
+            size = len(token)
+            last = token[-1]
+            if last == "{" or last == "[":
+                label = None
+                parent = -1
+                if stack:
+                    frame = stack[-1]
+                    frame[3] = True
+                    parent = frame[0]
+                    if size == 1 and frame[1]:
+                        label = f"[{frame[2]}]"
+                if size > 1:
+                    label = _key_text(token)
+                node = len(starts)
+                starts.append(pos + size - 1)
+                ends.append(end)
+                parents.append(parent)
+                after.append(0)
+                counts.append(0)
+                labels.append(label)
+                stack.append([node, last == "[", 0, False])
+            elif size == 1 and (last == "}" or last == "]"):
+                if stack:
+                    node, _, commas, content = stack.pop()
+                    ends[node] = pos + 1
+                    after[node] = len(starts)
+                    if content:
+                        counts[node] = commas + 1
+                else:
+                    nodes.balanced = False  # Stray closing bracket
+            elif token == '"':
+                nodes.balanced = False  # The rest is inside an unterminated string
+                break
+            elif stack:
+                frame = stack[-1]
+                if "," in token:
+                    frame[2] += (strip_strings("", token) if '"' in token else token).count(",")
+                if not frame[3] and not token.isspace():
+                    frame[3] = True
+            pos += size
+        else:
+            continue
+        break
+    if stack:
+        nodes.balanced = False
+        for node, _, commas, content in stack:
+            after[node] = len(starts)  # ends[node] is already end
+            if content:
+                counts[node] = commas + 1
+    return nodes
+
+
+def _scan_xml(text: str, start: int, end: int, task=None) -> _Nodes:
+    nodes = _Nodes()
+    starts, ends, parents, after, counts, labels = (
+        nodes.starts, nodes.ends, nodes.parents, nodes.after, nodes.counts, nodes.labels)
+    stack = []  # [node, tag, element children] of each open element
+    names = []  # Tags of the open elements
+    seen = 0
+    for match in _XML_STRUCTURE.finditer(text, start, end):
+        closing, name, empty, unclosed = match.groups()
+        if name is None:
+            if unclosed is not None:
+                nodes.balanced = False
+            continue  # Comment, CDATA, processing instruction or declaration
+        if closing:
+            if name not in names:
+                nodes.balanced = False  # Stray end tag
+                continue
+            if names[-1] != name:
+                nodes.balanced = False  # Elements left open inside this one
+            while True:
+                node, tag, count = stack.pop()
+                names.pop()
+                ends[node] = match.end() if tag == name else match.start()
+                after[node] = len(starts)
+                counts[node] = count
+                if tag == name:
+                    break
+        else:
+            parent = -1
+            if stack:
+                parent = stack[-1][0]
+                stack[-1][2] += 1
+            node = len(starts)
+            starts.append(match.start())
+            ends.append(match.end())
+            parents.append(parent)
+            after.append(node + 1)
+            counts.append(0)
+            labels.append(name)
+            if not empty:
+                stack.append([node, name, 0])
+                names.append(name)
+        seen += 1
+        if task and seen % _CHECK_EVERY == 0:
+            task.check_cancelled()
+            task.report_progress((match.start() - start) / max(end - start, 1))
+    if stack:
+        nodes.balanced = False
+        for node, _, count in stack:
+            ends[node] = end
+            after[node] = len(starts)
+            counts[node] = count
+    return nodes
+
+
+_SCANNERS = {"json": _scan_json, "xml": _scan_xml}
+
+
+def merge_edit(dirty: Optional[Tuple[int, int, int]], start: int, old_end: int,
+               new_end: int) -> Tuple[int, int, int]:
+    """
+    Fold an edit into the range changed since an index was built.
+
+    dirty is (start, end in the current text, length change) or None;
+    the edit replaced [start, old_end) of the current text by
+    [start, new_end). Returns the new dirty range.
+    """
+    if dirty is None:
+        return start, new_end, new_end - old_end
+    dirty_start, dirty_end, delta = dirty
+    change = new_end - old_end
+    return min(dirty_start, start), max(dirty_end, old_end) + change, delta + change
+
+
+class OutlineIndex:
+    """Containers of a document (see the module docstring)."""
+
+    def __init__(self, kind: str, length: int, nodes: _Nodes):
+        self.kind = kind
+        self.length = length
+        self.starts = nodes.starts
+        self.ends = nodes.ends
+        self.parents = nodes.parents
+        self.after = nodes.after
+        self.counts = nodes.counts
+        self.labels = nodes.labels
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def children(self, node: int = -1) -> Iterator[int]:
+        """Container children of node (-1: the top-level nodes)."""
+        child = node + 1
+        stop = self.after[node] if node >= 0 else len(self.starts)
+        after = self.after
+        while child < stop:
+            yield child
+            child = after[child]
+
+    def is_array(self, text: str, node: int) -> bool:
+        return self.kind == "json" and text[self.starts[node]] == "["
+
+    def items(self, text: str, node: int = -1) -> Iterator[OutlineItem]:
+        """
+        Children of node to show in a tree, in document order: containers
+        and, for JSON, scalar members with a preview of their value.
+        Only the text of node itself is read; nested containers are
+        skipped over by their recorded ends.
+        """
+        if self.kind != "json" or node < 0:
+            for child in self.children(node):
+                yield OutlineItem(self.labels[child] or "", self.starts[child], child)
+            return
+
+        is_array = self.is_array(text, node)
+        pos = self.starts[node] + 1
+        end = self.ends[node]
+        if text[end - 1] in "]}":
+            end -= 1  # Its closing bracket, or that of a last child left open like itself
+        containers = self.children(node)
+        child = next(containers, -1)
+        index = 0
+        while pos < end:
+            member = _JSON_MEMBER.match(text, pos, end)
+            key = member.group(1)
+            pos = member.end()
+            if pos >= end:
+                break
+            label = f"[{index}]" if is_array or key is None else _key_text(key + ":")
+            if child >= 0 and self.starts[child] == pos:
+                yield OutlineItem(label, pos, child)
+                if self.ends[child] > end:
+                    break  # Left open: runs to the end of the text
+                pos = _JSON_NEXT.match(text, self.ends[child], end).end()
+                child = next(containers, -1)
+            else:
+                scalar = _JSON_SCALAR.match(text, pos, end)
+                if scalar is None:
+                    break  # Not JSON from here on
+                value = scalar.group(1)
+                if len(value) > VALUE_PREVIEW:
+                    value = value[:VALUE_PREVIEW - 1] + "…"
+                yield OutlineItem(label, pos, -1, value)
+                pos = scalar.end()
+            index += 1
+
+    def enclosing(self, start: int, end: int) -> int:
+        """Innermost node whose brackets or tags contain [start, end), or -1."""
+        node = bisect.bisect_left(self.starts, start) - 1
+        while node >= 0 and self.ends[node] <= end:
+            node = self.parents[node]
+        return node
+
+    def update(self, text: str, start: int, old_end: int, new_end: int, task=None) -> "OutlineIndex":
+        """
+        The index of text, where [start, old_end) of the indexed text was
+        replaced by [start, new_end).
+
+        Rescans the innermost container enclosing the edit; when the edit
+        unbalanced it, its parent and so on up to the whole document.
+        """
+        delta = new_end - old_end
+        scan = _SCANNERS[self.kind]
+        node = self.enclosing(start, old_end)
+        while node >= 0:
+            node_start, node_end = self.starts[node], self.ends[node] + delta
+            nodes = scan(text, node_start, node_end, task)
+            if nodes.balanced and len(nodes.starts) and nodes.after[0] == len(nodes.starts) \
+                    and nodes.ends[0] == node_end:
+                return self._splice(node, nodes, delta, len(text))
+            node = self.parents[node]
+        return build(text, self.kind, task)
+
+    def _splice(self, node: int, nodes: _Nodes, delta: int, length: int) -> "OutlineIndex":
+        """A new index with nodes replacing the subtree of node."""
+        old_after = self.after[node]
+        diff = len(nodes.starts) - (old_after - node)
+        if nodes.labels[0] is None:
+            nodes.labels[0] = self.labels[node]  # JSON keys sit outside the rescanned text
+
+        result = _Nodes()
+        result.starts = self.starts[:node] + nodes.starts
+        result.ends = self.ends[:node] + nodes.ends
+        result.parents = self.parents[:node]
+        result.parents.append(self.parents[node])
+        result.parents.extend(parent + node for parent in nodes.parents[1:])
+        result.after = self.after[:node]
+        result.after.extend(after + node for after in nodes.after)
+        result.counts = self.counts[:node] + nodes.counts
+        result.labels = self.labels[:node] + nodes.labels
+
+        # Ancestors now end delta further and hold diff more nodes
+        parent = self.parents[node]
+        while parent >= 0:
+            result.ends[parent] += delta
+            result.after[parent] += diff
+            parent = self.parents[parent]
+
+        tail_starts = self.starts[old_after:]
+        tail_ends = self.ends[old_after:]
+        tail_parents = self.parents[old_after:]
+        tail_after = self.after[old_after:]
+        if delta:
+            tail_starts = array.array("q", map(delta.__add__, tail_starts))
+            tail_ends = array.array("q", map(delta.__add__, tail_ends))
+        if diff:
+            tail_after = array.array("I", map(diff.__add__, tail_after))
+            tail_parents = array.array("i", (parent + diff if parent >= old_after else parent
+                                             for parent in tail_parents))
+        result.starts.extend(tail_starts)
+        result.ends.extend(tail_ends)
+        result.parents.extend(tail_parents)
+        result.after.extend(tail_after)
+        result.counts.extend(self.counts[old_after:])
+        result.labels.extend(self.labels[old_after:])
+        return OutlineIndex(self.kind, length, result)
+
+
+def build(text: str, kind: str, task=None) -> OutlineIndex:
+    """Scan a whole document ('json' or 'xml')."""
+    return OutlineIndex(kind, len(text), _SCANNERS[kind](text, 0, len(text), task))
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m zenpad.outline [records]
+    import sys
+    import time
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    text = "[" + ",\n".join(f'{{"id": {i}, "name": "user {i}", "tags": ["a", "b"], '
+                             f'"address": {{"city": "x{i % 100}", "zip": {i % 90000}}}}}'
+                             for i in range(count)) + "]"
+    print(f"JSON: {len(text) / 1e6:.1f} MB")
+    started = time.perf_counter()
+    index = build(text, "json")
+    print(f"build: {len(index)} nodes in {time.perf_counter() - started:.2f}s")
+
+    middle = index.starts[len(index) // 2]
+    inside = text.index('"user', middle) + 1
+    edited = text[:inside] + "renamed " + text[inside:]
+    started = time.perf_counter()
+    updated = index.update(edited, inside, inside, inside + len("renamed "))
+    elapsed = time.perf_counter() - started
+    same = list(updated.starts) == list(build(edited, "json").starts)
+    print(f"update after a one-line edit: {elapsed * 1000:.1f} ms, same as a full scan: {same}")
+
+    started = time.perf_counter()
+    rows = list(index.items(text, 0))
+    print(f"children of the top array: {len(rows)} in {time.perf_counter() - started:.2f}s")
+
+    xml_text = "<rows>" + "".join(f'<row id="{i}"><name>user {i}</name><tags><tag>a</tag>'
+                                  f'<tag>b</tag></tags><!-- <not-a-tag> --></row>'
+                                  for i in range(count)) + "</rows>"
+    print(f"XML: {len(xml_text) / 1e6:.1f} MB")
+    started = time.perf_counter()
+    xml_index = build(xml_text, "xml")
+    print(f"build: {len(xml_index)} nodes in {time.perf_counter() - started:.2f}s")
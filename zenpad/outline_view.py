@@ -0,0 +1,244 @@
+"""
+Outline panel for Zenpad.
+Shows the structure of a JSON or XML buffer as a tree built from an
+outline.OutlineIndex. Rows are only created when their parent is
+expanded, and after an edit only the container around it is rescanned,
+on a BackgroundTask.
+"""
+import itertools
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, GLib, Pango
+
+from zenpad import outline
+from zenpad.tasks import BackgroundTask
+
+# Pause in typing before the outline is updated (ms)
+OUTLINE_UPDATE_DELAY = 300
+
+# Children added per expansion; a "more" row adds the next page
+OUTLINE_PAGE_SIZE = 500
+
+PANEL_WIDTH = 260
+
+# TreeStore columns: label, offset in the buffer, node, rest of the children (on "more" rows)
+COL_LABEL, COL_OFFSET, COL_NODE, COL_MORE = range(4)
+
+# COL_NODE of rows that are not containers
+_SCALAR = -1
+_PLACEHOLDER = -2  # Makes a collapsed container expandable
+_MORE = -3
+
+
+class OutlinePanel(Gtk.Box):
+    """Tree of the containers of the active editor's JSON or XML document."""
+
+    def __init__(self):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        self.set_border_width(4)
+        self.set_size_request(PANEL_WIDTH, -1)
+        self.editor = None
+        self.handlers = []  # (object, handler id) connected on the editor
+        self.index = None  # outline.OutlineIndex of self.text
+        self.text = ""
+        self.dirty = None  # Edits since self.text (see outline.merge_edit)
+        self.timer = 0
+        self.task = None
+
+        self.status_label = Gtk.Label(xalign=0)
+        self.status_label.set_ellipsize(Pango.EllipsizeMode.END)
+        self.pack_start(self.status_label, False, False, 0)
+
+        self.store = Gtk.TreeStore(str, int, int, object)
+        self.tree = Gtk.TreeView(model=self.store)
+        self.tree.set_headers_visible(False)
+        self.tree.set_enable_search(False)
+        self.tree.set_activate_on_single_click(True)
+        renderer = Gtk.CellRendererText()
+        renderer.set_property("ellipsize", Pango.EllipsizeMode.END)
+        self.tree.append_column(Gtk.TreeViewColumn("Outline", renderer, text=COL_LABEL))
+        self.tree.connect("test-expand-row", self.on_test_expand_row)
+        self.tree.connect("row-activated", self.on_row_activated)
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+        scrolled.add(self.tree)
+        self.pack_start(scrolled, True, True, 0)
+        for child in self.get_children():
+            child.show_all()
+        self.connect("destroy", lambda widget: self.set_editor(None))
+
+    def set_editor(self, editor):
+        """Follow editor (None: stop tracking)"""
+        if editor is self.editor:
+            return
+        for obj, handler in self.handlers:
+            obj.disconnect(handler)
+        self.handlers = []
+        self._cancel()
+        self.editor = editor
+        self.index = None
+        self.text = ""
+        self.dirty = None
+        self.store.clear()
+        self.status_label.set_text("")
+        if editor is None:
+            return
+        buff = editor.buffer
+        # Connected before the default handlers, so offsets are those before the edit
+        self.handlers = [
+            (buff, buff.connect("insert-text", self.on_insert_text)),
+            (buff, buff.connect("delete-range", self.on_delete_range)),
+            (buff, buff.connect("notify::language", lambda *args: self.rebuild())),
+            (editor, editor.connect("destroy", lambda widget: self.set_editor(None))),
+        ]
+        self.rebuild()
+
+    def rebuild(self):
+        """Scan the whole document again"""
+        self.index = None
+        self.dirty = None
+        self._schedule(0)
+
+    def _cancel(self):
+        if self.timer:
+            GLib.source_remove(self.timer)
+            self.timer = 0
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def _schedule(self, delay=OUTLINE_UPDATE_DELAY):
+        self._cancel()
+        self.timer = GLib.timeout_add(delay, self._start_update)
+
+    def _edited(self, start, old_end, new_end):
+        if self.index is not None:
+            self.dirty = outline.merge_edit(self.dirty, start, old_end, new_end)
+        self._schedule()
+
+    def on_insert_text(self, buff, location, text, length):
+        start = location.get_offset()
+        self._edited(start, start, start + len(text))
+
+    def on_delete_range(self, buff, start, end):
+        self._edited(start.get_offset(), end.get_offset(), start.get_offset())
+
+    def _start_update(self):
+        editor = self.editor
+        if editor.bulk_editing:
+            return True  # Update once the bulk edit is done
+        self.timer = 0
+        language = editor.buffer.get_language()
+        kind = outline.kind_for_language(language.get_id() if language else None)
+        if kind is None:
+            self.index = None
+            self.store.clear()
+            self.status_label.set_text("Outline is available for JSON and XML")
+            return False
+
+        text = editor.get_text()
+        index, dirty = self.index, self.dirty
+        if index is not None and index.kind == kind:
+            if dirty is None:
+                return False  # Up to date
+            start, end, delta = dirty
+            work = lambda task: index.update(text, start, end - delta, end, task)
+        else:
+            self.status_label.set_text("Scanning...")
+            work = lambda task: outline.build(text, kind, task)
+
+        def on_done(result):
+            self.task = None
+            self.index = result
+            self.text = text
+            self.dirty = None
+            self._populate()
+
+        def on_progress(fraction, message):
+            self.status_label.set_text(f"Scanning... {fraction:.0%}")
+
+        def on_error(e):
+            self.task = None
+            self.status_label.set_text("Outline failed")
+            print(f"[Outline] Scan failed: {e}")
+
+        self.task = BackgroundTask(work, on_done=on_done, on_progress=on_progress,
+                                   on_error=on_error).start()
+        return False
+
+    # --- Tree ---
+
+    def _label(self, item):
+        if item.node == _SCALAR:
+            return f"{item.label}: {item.value}"
+        index = self.index
+        count = index.counts[item.node]
+        if index.kind == "xml":
+            return f"<{item.label}> ({count:,})" if count else f"<{item.label}>"
+        label = item.label or "root"
+        if index.is_array(self.text, item.node):
+            return f"{label} [{count:,}]"
+        return f"{label} {{{count:,}}}"
+
+    def _add_items(self, parent, items, total=None):
+        """Add a page of items under parent, and a "more" row if there are others"""
+        store = self.store
+        for item in itertools.islice(items, OUTLINE_PAGE_SIZE):
+            row = store.append(parent, [self._label(item), item.offset, item.node, None])
+            if item.node >= 0 and self.index.counts[item.node]:
+                store.append(row, ["", item.offset, _PLACEHOLDER, None])
+        following = next(items, None)
+        if following is not None:
+            shown = store.iter_n_children(parent)
+            label = f"... {total - shown:,} more" if total is not None and total > shown else "... more"
+            store.append(parent, [label, following.offset, _MORE, itertools.chain([following], items)])
+
+    def _populate(self):
+        """Refill the tree from a new index, keeping expanded rows expanded"""
+        expanded = []
+        self.tree.map_expanded_rows(lambda tree, path: expanded.append(path.to_string()))
+        self.store.clear()
+        self._add_items(None, self.index.items(self.text))
+        if not expanded and self.store.iter_n_children(None) == 1:
+            expanded = ["0"]  # Open the document's root
+        for path in expanded:
+            self.tree.expand_row(Gtk.TreePath.new_from_string(path), False)
+        self.status_label.set_text(f"{len(self.index):,} nodes")
+
+    def on_test_expand_row(self, tree, it, path):
+        child = self.store.iter_children(it)
+        if child is not None and self.store[child][COL_NODE] == _PLACEHOLDER:
+            self.store.remove(child)
+            node = self.store[it][COL_NODE]
+            self._add_items(it, self.index.items(self.text, node), self.index.counts[node])
+        return False  # Let it expand
+
+    def on_row_activated(self, tree, path, column):
+        row = self.store[path]
+        if row[COL_NODE] == _MORE:
+            it = self.store.get_iter(path)
+            parent = self.store.iter_parent(it)
+            items = row[COL_MORE]
+            self.store.remove(it)
+            total = self.index.counts[self.store[parent][COL_NODE]] if parent is not None else None
+            self._add_items(parent, items, total)
+            return
+        self.jump_to(row[COL_OFFSET])
+
+    def jump_to(self, offset):
+        """Put the editor's cursor at offset and scroll it into view"""
+        editor = self.editor
+        if editor is None:
+            return
+        if self.dirty is not None:
+            # Edited since the last scan: map the offset past the edits
+            start, end, delta = self.dirty
+            if offset >= end - delta:
+                offset += delta
+            elif offset > start:
+                offset = start
+        buff = editor.buffer
+        buff.place_cursor(buff.get_iter_at_offset(offset))
+        # Scrolling to the mark lets the view lay out only the lines it lands on
+        editor.view.scroll_to_mark(buff.get_insert(), 0.0, True, 0.0, 0.2)
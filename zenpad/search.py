@@ -0,0 +1,363 @@
+"""
+Search helpers for Zenpad.
+Pure-Python pattern compilation and bulk replace that can run off the main thread.
+"""
+import re
+import threading
+import dataclasses
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from zenpad.tasks import HelperProcess
+
+# Above this many matches Replace All swaps the whole matched span at once
+# instead of editing each hunk (keeps "changed" emissions constant).
+MAX_REPLACE_HUNKS = 32
+
+# How often (in matches) the worker polls for cancellation/progress
+_CHECK_EVERY = 1024
+
+# Number of compiled queries kept by the shared PatternCache
+PATTERN_CACHE_SIZE = 64
+
+# Wall-clock budget for evaluating a risky regex against a document (seconds)
+SEARCH_TIME_BUDGET = 1.0
+
+# Budget for a risky regex about to be highlighted: GtkSource then runs
+# it again on the main loop, which freezes about as long (seconds)
+HIGHLIGHT_TIME_BUDGET = 0.2
+
+
+class SearchTimeout(Exception):
+    """A regex did not finish within SEARCH_TIME_BUDGET."""
+
+
+@dataclasses.dataclass
+class ReplaceResult:
+    """Outcome of a bulk replace computed on a text snapshot."""
+    count: int = 0
+    span_start: int = 0         # Char offset of the first match
+    span_end: int = 0           # Char offset just after the last match
+    span_text: str = ""         # Replacement for text[span_start:span_end]
+    # Individual (start, end, replacement) hunks, or None when there are too many
+    hunks: Optional[List[Tuple[int, int, str]]] = None
+
+
+def options_from_settings(search_settings) -> Tuple[str, bool, bool, bool]:
+    """
+    Read (text, case_sensitive, at_word_boundaries, regex_enabled)
+    from a GtkSource.SearchSettings instance.
+    """
+    return (
+        search_settings.get_search_text() or "",
+        search_settings.get_case_sensitive(),
+        search_settings.get_at_word_boundaries(),
+        search_settings.get_regex_enabled(),
+    )
+
+
+def compile_search_pattern(text: str, case_sensitive: bool = False,
+                           at_word_boundaries: bool = False,
+                           regex_enabled: bool = False) -> "re.Pattern":
+    """
+    Compile a Python regex with the same semantics as GtkSource search.
+    Raises re.error for invalid user patterns.
+    """
+    source = text if regex_enabled else re.escape(text)
+    if at_word_boundaries:
+        source = r"(?<!\w)(?:" + source + r")(?!\w)"
+
+    # GtkSource compiles with G_REGEX_MULTILINE
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(source, flags)
+
+
+@dataclasses.dataclass
+class CompiledQuery:
+    """A validated search query as stored in the PatternCache."""
+    text: str
+    pattern: Optional["re.Pattern"] = None
+    error: Optional[str] = None     # Compile error for invalid regexes
+    risky: bool = False             # Prone to catastrophic backtracking
+    # (document key, finished in time) of the last time-budget probe
+    verdict: Optional[Tuple[object, bool]] = None
+
+
+class PatternCache:
+    """Thread-safe LRU cache of compiled search queries."""
+
+    def __init__(self, max_size: int = PATTERN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str, case_sensitive: bool = False,
+            at_word_boundaries: bool = False, regex_enabled: bool = False) -> CompiledQuery:
+        key = (text, case_sensitive, at_word_boundaries, regex_enabled)
+        with self._lock:
+            query = self._entries.get(key)
+            if query is not None:
+                self._entries.move_to_end(key)
+                return query
+
+        query = CompiledQuery(text=text)
+        try:
+            query.pattern = compile_search_pattern(text, case_sensitive, at_word_boundaries, regex_enabled)
+            query.risky = regex_enabled and looks_catastrophic(text)
+        except re.error as e:
+            query.error = str(e)
+
+        with self._lock:
+            self._entries[key] = query
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return query
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_pattern_cache = PatternCache()
+
+
+def get_pattern_cache() -> PatternCache:
+    """Return the cache shared by all windows."""
+    return _pattern_cache
+
+
+# Bounded repetitions up to this count ({3}, {1,4}, ?) cannot blow up
+MAX_BOUNDED_REPEAT = 10
+
+_BRACES_RE = re.compile(r"\{(\d*)(,?)(\d*)\}")
+
+
+def _quantifier_at(source: str, pos: int) -> Optional[Tuple[bool, bool]]:
+    """
+    The quantifier starting at source[pos] as (unbounded, variable), or
+    None. *, +, {m,} and a large {m,n} are unbounded; a small {m,n} is
+    variable (it can split the same text in several ways); {n} and ? are
+    neither.
+    """
+    if pos >= len(source):
+        return None
+    c = source[pos]
+    if c in "*+":
+        return True, True
+    if c == "?":
+        return False, False
+    if c != "{":
+        return None
+    m = _BRACES_RE.match(source, pos)
+    if m is None or not (m.group(1) or m.group(2)):
+        return None  # Literal brace, as in re ("{}", "{x}")
+    low, comma, high = m.groups()
+    if not comma:
+        return False, False
+    if not high or int(high) > MAX_BOUNDED_REPEAT:
+        return True, True
+    return False, int(high) > int(low or 0)
+
+
+def looks_catastrophic(source: str) -> bool:
+    """
+    Heuristic check for patterns prone to exponential backtracking: groups
+    repeated without bound that contain an unbounded quantifier, an
+    alternation or a variable bounded repeat, e.g. (a+)+, (\\w*)*, (a|aa)+,
+    (\\w{1,3})+, ((a+){2})*, and backreferences. Small bounded repetition
+    of such groups, as in (\\d{1,3}\\.){3} or (?:\\d+\\.){3}, is fine.
+    """
+    # One [has_unbounded_quantifier, is_ambiguous] pair per open group
+    stack = [[False, False]]
+    in_class = False
+    i = 0
+    while i < len(source):
+        c = source[i]
+        if c == "\\":
+            if not in_class and source[i + 1:i + 2].isdigit() and source[i + 1] != "0":
+                return True  # Backreference
+            i += 2
+            continue
+        if in_class:
+            if c == "]":
+                in_class = False
+        elif c == "[":
+            in_class = True
+            # A leading ] (or ^]) is literal inside a class
+            if source[i + 1:i + 2] == "^":
+                i += 1
+            if source[i + 1:i + 2] == "]":
+                i += 1
+        elif c == "(":
+            stack.append([False, False])
+        elif c == ")" and len(stack) > 1:
+            has_unbounded, ambiguous = stack.pop()
+            quantifier = _quantifier_at(source, i + 1)
+            if quantifier and quantifier[0]:
+                if has_unbounded or ambiguous:
+                    return True
+                stack[-1][0] = True
+            else:
+                # A bounded repeat of the group only matters inside an unbounded one
+                stack[-1][0] |= has_unbounded
+                stack[-1][1] |= ambiguous or bool(quantifier and quantifier[1])
+        elif c == "|":
+            stack[-1][1] = True
+        else:
+            quantifier = _quantifier_at(source, i)
+            if quantifier:
+                stack[-1][0] |= quantifier[0]
+                stack[-1][1] |= quantifier[1]
+        i += 1
+    return False
+
+
+def gregex_source(text: str, at_word_boundaries: bool = False) -> str:
+    """The pattern GtkSource hands to GRegex for a regex query."""
+    source = text
+    if at_word_boundaries:
+        source = r"\b" + source + r"\b"
+    return source
+
+
+def _count_gregex(gregex, text: str) -> int:
+    """Matches of a (source, case_sensitive) GRegex query, compiled like GtkSource does."""
+    from gi.repository import GLib
+
+    source, case_sensitive = gregex
+    flags = GLib.RegexCompileFlags.MULTILINE
+    if not case_sensitive:
+        flags |= GLib.RegexCompileFlags.CASELESS
+    regex = GLib.Regex.new(source, flags, 0)
+    _, match_info = regex.match_full(text, -1, 0, 0)
+    count = 0
+    while match_info.matches():
+        count += 1
+        match_info.next()
+    return count
+
+
+def _probe_loop(conn):
+    """
+    Probe process body: count matches of each request's pattern in its
+    texts, with Python's re and, when given, with GRegex (the engine
+    GtkSource searches with).
+    """
+    conn.send("ready")
+    while True:
+        try:
+            pattern, texts, gregex = conn.recv()
+        except EOFError:
+            return
+        try:
+            count = 0
+            for text in texts:
+                count += sum(1 for _ in pattern.finditer(text))
+                if gregex is not None:
+                    try:
+                        _count_gregex(gregex, text)
+                    except ImportError:
+                        gregex = None  # No PyGObject here: re alone
+            conn.send((count, None))
+        except Exception as e:
+            conn.send((None, str(e)))
+
+
+_prober = HelperProcess(_probe_loop, "search probe")
+
+
+def run_with_time_budget(pattern: "re.Pattern", texts: Iterable[str],
+                         budget: float = SEARCH_TIME_BUDGET, task=None,
+                         gregex: Optional[Tuple[str, bool]] = None) -> int:
+    """
+    Count matches of pattern in each of texts in a helper process.
+
+    CPython's re holds the GIL while matching, so a runaway pattern
+    cannot be interrupted from a thread; the helper is killed instead.
+
+    Args:
+        pattern: Compiled Python pattern
+        texts: Documents to search (e.g. the active tab)
+        budget: Seconds allowed for all of them
+        task: Optional BackgroundTask for cancellation
+        gregex: (gregex_source(), case_sensitive) to also run the query
+            through GRegex, which backtracks differently
+
+    Returns:
+        Number of matches of pattern
+    Raises:
+        SearchTimeout if the budget is exceeded
+    """
+    try:
+        count, error = _prober.call((pattern, list(texts), gregex), task, budget)
+    except TimeoutError:
+        raise SearchTimeout("search timed out")
+    except EOFError:
+        raise SearchTimeout("search aborted")
+    if error is not None:
+        raise RuntimeError(error)
+    return count
+
+
+def to_python_template(replacement: str) -> str:
+    """
+    Convert a GtkSource/GRegex replacement string to a re template.
+    GRegex uses \\0 for the whole match, Python needs \\g<0>.
+    """
+    return re.sub(r"\\(\\|0(?![0-7]))",
+                  lambda m: "\\\\" if m.group(1) == "\\" else r"\g<0>",
+                  replacement)
+
+
+def compute_replacements(text: str, pattern: "re.Pattern", replacement: str,
+                         expand: bool = False, task=None,
+                         max_hunks: int = MAX_REPLACE_HUNKS) -> ReplaceResult:
+    """
+    Compute every replacement of pattern in text without touching a buffer.
+
+    Args:
+        text: Snapshot of the document
+        pattern: Compiled pattern (see compile_search_pattern)
+        replacement: Replacement text (a re template when expand is True)
+        expand: Expand backreferences (regex mode)
+        task: Optional BackgroundTask-like object used for cancellation/progress
+        max_hunks: Keep individual hunks only up to this many matches
+
+    Returns:
+        ReplaceResult. hunks is None when count exceeds max_hunks.
+    """
+    template = to_python_template(replacement) if expand else None
+    result = ReplaceResult(hunks=[])
+    pieces = []
+    prev_end = 0
+    total = max(len(text), 1)
+
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        rep = match.expand(template) if expand else replacement
+
+        if result.count == 0:
+            result.span_start = start
+        else:
+            pieces.append(text[prev_end:start])
+        pieces.append(rep)
+        prev_end = end
+        result.count += 1
+
+        if result.hunks is not None:
+            if len(result.hunks) < max_hunks:
+                result.hunks.append((start, end, rep))
+            else:
+                result.hunks = None
+
+        if task and result.count % _CHECK_EVERY == 0:
+            task.check_cancelled()
+            task.report_progress(start / total)
+
+    result.span_end = prev_end
+    result.span_text = "".join(pieces)
+    if not result.count:
+        result.hunks = []
+    return result
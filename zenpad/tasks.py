@@ -0,0 +1,177 @@
+"""
+Background tasks for Zenpad.
+Runs heavy work on a daemon thread and hands progress/results back to the GTK main loop.
+HelperProcess runs work that holds the GIL (and cannot be interrupted) in a process.
+"""
+import multiprocessing
+import threading
+import time
+from typing import Optional
+
+from gi.repository import GLib
+
+
+class TaskCancelled(Exception):
+    """Raised inside a worker to abandon a task that is no longer wanted."""
+
+
+class BackgroundTask:
+    """
+    A cancellable unit of work executed off the main thread.
+
+    The worker function receives the task itself so it can poll
+    is_cancelled() and call report_progress(). All callbacks
+    (on_progress, on_done, on_error) run on the GTK main loop and are
+    suppressed once the task has been cancelled.
+    """
+
+    # Minimum delay between two progress callbacks (seconds)
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, func, on_done=None, on_progress=None, on_error=None):
+        self._func = func
+        self._on_done = on_done
+        self._on_progress = on_progress
+        self._on_error = on_error
+        self._cancel_event = threading.Event()
+        self._last_progress = 0.0
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if cancel() was called (worker side)."""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, fraction, message=None, force=False):
+        """Throttled progress notification (worker side)."""
+        if not self._on_progress or self._cancel_event.is_set():
+            return
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        GLib.idle_add(self._dispatch, self._on_progress, fraction, message)
+
+    def post(self, callback, *args):
+        """Run callback(*args) on the main loop unless cancelled (worker side)."""
+        if not self._cancel_event.is_set():
+            GLib.idle_add(self._dispatch, callback, *args)
+
+    def _run(self):
+        try:
+            result = self._func(self)
+        except TaskCancelled:
+            return
+        except Exception as e:
+            if self._on_error:
+                GLib.idle_add(self._dispatch, self._on_error, e)
+            else:
+                print(f"[Tasks] Background task failed: {e}")
+            return
+        if self._on_done:
+            GLib.idle_add(self._dispatch, self._on_done, result)
+
+    def _dispatch(self, callback, *args):
+        if not self._cancel_event.is_set():
+            callback(*args)
+        return False  # Don't repeat
+
+
+class HelperProcess:
+    """
+    A long-lived helper process running target(conn), started with spawn:
+    forking the multithreaded GTK process could copy a lock held by
+    another thread. target must be a module-level function that sends
+    "ready", then answers each request it receives on conn.
+
+    A helper still working when its task is cancelled or its time runs
+    out is killed (the only way to interrupt it) and started again for
+    the next request.
+    """
+
+    # Time allowed for the process to start up (seconds)
+    START_TIMEOUT = 30.0
+
+    # Delay between two checks for a reply or a cancellation (seconds)
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, target, name: str):
+        self.target = target
+        self.name = name
+        self._lock = threading.Lock()
+        self._proc = None
+        self._conn = None
+
+    def _start(self):
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        self._proc = ctx.Process(target=self.target, args=(child,), daemon=True)
+        self._proc.start()
+        child.close()
+        try:
+            if not self._conn.poll(self.START_TIMEOUT):
+                raise EOFError
+            self._conn.recv()
+        except EOFError:
+            self._stop()
+            raise RuntimeError(f"{self.name} did not start")
+
+    def _stop(self):
+        if self._proc is not None:
+            if self._proc.is_alive():
+                self._proc.terminate()
+            self._proc.join(1.0)
+            self._conn.close()
+        self._proc = self._conn = None
+
+    def call(self, request, task=None, timeout: Optional[float] = None):
+        """
+        Send request to the helper and return its reply (one request at a time).
+
+        Raises:
+            TaskCancelled if task is cancelled first
+            TimeoutError after timeout seconds without a reply
+            EOFError if the helper died on the request
+            RuntimeError if the helper does not start
+        """
+        with self._lock:
+            if task:
+                task.check_cancelled()
+            if self._proc is None or not self._proc.is_alive():
+                self._stop()
+                self._start()
+            finished = False
+            try:
+                self._conn.send(request)
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while True:
+                    wait = self.POLL_INTERVAL
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"{self.name} timed out")
+                        wait = min(remaining, wait)
+                    if self._conn.poll(wait):
+                        reply = self._conn.recv()
+                        finished = True
+                        return reply
+                    if task:
+                        task.check_cancelled()
+            finally:
+                if not finished:
+                    self._stop()
@@ -0,0 +1,251 @@
+"""
+Streaming text transforms: Base64, URL, hex, ROT13/ROT47 and
+quoted-printable.
+
+Each transform reads the text a block at a time and writes its output
+in blocks through write(), so a huge selection is converted on a worker
+with memory bounded by one block rather than by encoded copies of the
+whole text. Blocks are cut where the encoding allows it (whole Base64
+lines, whole %XX escapes, whole text lines for quoted-printable), so the
+output is the same as transforming everything at once. Decoded bytes are
+turned back into text with an incremental UTF-8 decoder.
+"""
+import re
+import codecs
+import string
+import binascii
+import urllib.parse
+from collections import OrderedDict
+from typing import Callable
+
+# Characters of input read per block
+BLOCK_SIZE = 1024 * 1024
+
+# Base64 output line width (as in MIME)
+BASE64_LINE = 76
+
+# Input bytes per Base64 output line
+_BASE64_LINE_BYTES = BASE64_LINE // 4 * 3
+
+# Characters a Base64 decoder skips besides whitespace
+_BASE64_JUNK = re.compile(r"[^A-Za-z0-9+/=]+")
+
+# Characters of input per URL-decoding block (unquote_to_bytes slows
+# down on long strings)
+_URL_BLOCK_SIZE = 64 * 1024
+
+# ROT tables on UTF-8 bytes: multi-byte sequences are >= 0x80 and left alone
+_ROT13 = bytes.maketrans(
+    (string.ascii_lowercase + string.ascii_uppercase).encode("ascii"),
+    (string.ascii_lowercase[13:] + string.ascii_lowercase[:13]
+     + string.ascii_uppercase[13:] + string.ascii_uppercase[:13]).encode("ascii"))
+
+_ROT47 = bytes.maketrans(bytes(range(33, 127)),
+                         bytes(33 + (c - 33 + 47) % 94 for c in range(33, 127)))
+
+
+def _blocks(text: str, task=None, size: int = BLOCK_SIZE):
+    total = max(len(text), 1)
+    for start in range(0, len(text), size):
+        if task:
+            task.check_cancelled()
+            task.report_progress(start / total)
+        yield text[start:start + size]
+
+
+def _line_blocks(text: str, task=None, size: int = BLOCK_SIZE):
+    """Blocks of whole lines (the last one may lack its line break)."""
+    start = 0
+    total = max(len(text), 1)
+    while start < len(text):
+        if task:
+            task.check_cancelled()
+            task.report_progress(start / total)
+        end = text.find("\n", start + size) + 1 or len(text)
+        yield text[start:end]
+        start = end
+
+
+def base64_encode(text: str, write: Callable[[str], None], task=None):
+    """UTF-8 bytes of text in Base64, BASE64_LINE characters per line."""
+    pending = b""
+    line_bytes = _BASE64_LINE_BYTES
+    separator = ""  # Line break before the next block's lines
+    for block in _blocks(text, task):
+        data = pending + block.encode("utf-8")
+        cut = len(data) - len(data) % line_bytes
+        pending = data[cut:]
+        if cut:
+            encoded = binascii.b2a_base64(data[:cut], newline=False).decode("ascii")
+            write(separator + "\n".join(encoded[i:i + BASE64_LINE] for i in range(0, len(encoded), BASE64_LINE)))
+            separator = "\n"
+    if pending:
+        write(separator + binascii.b2a_base64(pending, newline=False).decode("ascii"))
+
+
+def base64_decode(text: str, write: Callable[[str], None], task=None):
+    """
+    Decode Base64 (line breaks and other stray characters are skipped)
+    into UTF-8 text.
+
+    Raises:
+        binascii.Error for bad padding, UnicodeDecodeError for non-UTF-8 data
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    for block in _blocks(text, task):
+        data = "".join(block.split())
+        if _BASE64_JUNK.search(data):
+            data = _BASE64_JUNK.sub("", data)
+        data = pending + data
+        cut = len(data) - len(data) % 4
+        pending = data[cut:]
+        if cut:
+            write(decoder.decode(binascii.a2b_base64(data[:cut])))
+    write(decoder.decode(binascii.a2b_base64(pending) if pending else b"", True))
+
+
+def url_encode(text: str, write: Callable[[str], None], task=None):
+    """Percent-encode text like urllib.parse.quote()."""
+    for block in _blocks(text, task):
+        write(urllib.parse.quote(block))
+
+
+def url_decode(text: str, write: Callable[[str], None], task=None):
+    """Decode %XX escapes like urllib.parse.unquote() (invalid UTF-8 becomes U+FFFD)."""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    pending = ""
+    for block in _blocks(text, task, _URL_BLOCK_SIZE):
+        data = pending + block
+        # Keep an escape cut short by the block end for the next block
+        cut = data.rfind("%", len(data) - 2)
+        if cut == -1:
+            cut = len(data)
+        pending = data[cut:]
+        write(decoder.decode(urllib.parse.unquote_to_bytes(data[:cut])))
+    write(decoder.decode(urllib.parse.unquote_to_bytes(pending), True))
+
+
+def hex_encode(text: str, write: Callable[[str], None], task=None):
+    """UTF-8 bytes of text as lowercase hex digits."""
+    for block in _blocks(text, task):
+        write(block.encode("utf-8").hex())
+
+
+def hex_decode(text: str, write: Callable[[str], None], task=None):
+    """
+    Decode hex digits (whitespace is skipped) into UTF-8 text.
+
+    Raises:
+        ValueError for non-hex characters or an odd digit count
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    for block in _blocks(text, task):
+        data = pending + "".join(block.split())
+        cut = len(data) - len(data) % 2
+        pending = data[cut:]
+        write(decoder.decode(bytes.fromhex(data[:cut])))
+    if pending:
+        raise ValueError("Odd number of hex digits")
+    write(decoder.decode(b"", True))
+
+
+def rot13(text: str, write: Callable[[str], None], task=None):
+    """Rotate ASCII letters by 13 places."""
+    for block in _blocks(text, task):
+        write(block.encode("utf-8").translate(_ROT13).decode("utf-8"))
+
+
+def rot47(text: str, write: Callable[[str], None], task=None):
+    """Rotate printable ASCII (! to ~) by 47 places."""
+    for block in _blocks(text, task):
+        write(block.encode("utf-8").translate(_ROT47).decode("utf-8"))
+
+
+def qp_encode(text: str, write: Callable[[str], None], task=None):
+    """
+    UTF-8 bytes of text in quoted-printable (soft line breaks at 76
+    characters). Like b2a_qp(), line breaks are written as CRLF when the
+    first line of a block ends in one, so only text with mixed line
+    endings can differ from encoding it in one go.
+    """
+    for block in _line_blocks(text, task):
+        write(binascii.b2a_qp(block.encode("utf-8")).decode("ascii"))
+
+
+def qp_decode(text: str, write: Callable[[str], None], task=None):
+    """
+    Decode quoted-printable into UTF-8 text.
+
+    Raises:
+        UnicodeDecodeError for non-UTF-8 data
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for block in _line_blocks(text, task):
+        write(decoder.decode(binascii.a2b_qp(block.encode("utf-8"))))
+    write(decoder.decode(b"", True))
+
+
+# Mode -> (menu label, transform)
+TRANSFORMS = OrderedDict([
+    ("base64_enc", ("Base64 Encode", base64_encode)),
+    ("base64_dec", ("Base64 Decode", base64_decode)),
+    ("url_enc", ("URL Encode", url_encode)),
+    ("url_dec", ("URL Decode", url_decode)),
+    ("hex_enc", ("Hex Encode", hex_encode)),
+    ("hex_dec", ("Hex Decode", hex_decode)),
+    ("qp_enc", ("Quoted-Printable Encode", qp_encode)),
+    ("qp_dec", ("Quoted-Printable Decode", qp_decode)),
+    ("rot13", ("ROT13", rot13)),
+    ("rot47", ("ROT47", rot47)),
+])
+
+
+def transform(text: str, mode: str, write: Callable[[str], None], task=None):
+    """
+    Run the transform named mode (a TRANSFORMS key) over text.
+
+    Raises:
+        KeyError for an unknown mode, ValueError (binascii.Error and
+        UnicodeDecodeError included) for input that cannot be decoded
+    """
+    TRANSFORMS[mode][1](text, write, task)
+
+
+def transform_text(text: str, mode: str) -> str:
+    """transform() into a string."""
+    parts = []
+    transform(text, mode, parts.append)
+    return "".join(parts)
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m zenpad.transforms [megabytes]
+    import sys
+    import time
+    import base64
+    import tracemalloc
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    text = ("Zenpad streams transforms: café ✓ 100% /path?q=1&r=2\n" * (size * 20000))[:size * 1000000]
+    print(f"{len(text) / 1e6:.0f} MB of text")
+
+    sample = text[:BLOCK_SIZE * 4]
+    for mode, (label, func) in TRANSFORMS.items():
+        source, sample_source = text, sample
+        if mode.endswith("_dec"):
+            source = transform_text(text, mode[:-4] + "_enc")
+            sample_source = transform_text(sample, mode[:-4] + "_enc")
+        started = time.perf_counter()
+        transform(source, mode, lambda block: None)
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        transform(sample_source, mode, lambda block: None)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:26} {elapsed:6.2f}s  peak {peak / 1e6:5.1f} MB over {len(sample_source) / 1e6:.0f} MB")
+
+    started = time.perf_counter()
+    base64.b64encode(text.encode("utf-8"))
+    print(f"{'base64.b64encode (whole)':26} {time.perf_counter() - started:6.2f}s")
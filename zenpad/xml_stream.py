@@ -0,0 +1,335 @@
+"""
+Streaming XML pretty-printing.
+
+Feeds the document to expat in chunks and writes indented output as
+events arrive, instead of building a minidom tree, so memory stays
+bounded and the work can run on a worker.
+
+Layout follows minidom's toprettyxml() as Format XML produced it: one
+node per line, children indented by one step, elements with only text
+inline (<a>text</a>, whitespace-only text included) and empty
+elements self-closed. Whitespace-only text between child nodes is layout
+and is replaced. An element with mixed content (text anywhere next to
+child elements) is written inline exactly as it is, so indentation never
+changes its text; when that text only comes after some children, their
+indented layout is held back (up to _MIXED_LOOKAHEAD characters) and
+replaced.
+"""
+import xml.parsers.expat
+from typing import Callable
+
+# Characters fed to the parser at a time
+_CHUNK_SIZE = 1024 * 1024
+
+# Characters of an indented element's content held back in case text follows its children
+_MIXED_LOOKAHEAD = 64 * 1024
+
+# Written when the document has no XML declaration (as minidom does)
+DEFAULT_DECLARATION = '<?xml version="1.0" ?>'
+
+
+def _escape_text(data: str) -> str:
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escape_attr(value: str) -> str:
+    # Whitespace characters are escaped so the parser does not normalize them away
+    return (_escape_text(value).replace('"', "&quot;")
+            .replace("\n", "&#10;").replace("\r", "&#13;").replace("\t", "&#9;"))
+
+
+class _Printer:
+    """expat handlers writing the indented document into out."""
+
+    def __init__(self, indent: str):
+        self.indent = indent
+        self.out = []
+        self.taken = 0  # Pieces of out already handed to write()
+        self.breaks = ["\n"]  # Line break + indentation per depth
+        self.depth = 0
+        self.declaration = None
+        self.started = False  # Anything written after the declaration
+        self.pending = None  # Start tag of the element just opened, until its content is known
+        self.pending_text = []  # Rendered text/CDATA read since that start tag
+        self.pending_blank = True  # ... all of it whitespace
+        self.inline_depth = 0  # > 0 inside a mixed-content element written as is
+        self.empty = False  # Nothing read since the last start tag
+        self.undecided = []  # [out position, raw position, depth] of indented elements text may still follow
+        self.raw = []  # Their content as written, to replace the indented layout with
+        self.raw_size = 0
+        self.in_cdata = False
+        self.cdata = []
+        self.doctype = None  # [start, internal subset pieces] while reading the DOCTYPE
+
+    def _line(self, depth: int) -> str:
+        while len(self.breaks) <= depth:
+            self.breaks.append(self.breaks[-1] + self.indent)
+        if not self.started:
+            self.started = True
+            if self.declaration is None:
+                self.out.append(DEFAULT_DECLARATION)
+                self.declaration = ""
+        return self.breaks[depth]
+
+    def _keep(self, piece: str):
+        """Record piece as written while an indented element may still turn out mixed."""
+        if not self.undecided:
+            return
+        self.raw.append(piece)
+        self.raw_size += len(piece)
+        if self.raw_size > _MIXED_LOOKAHEAD:
+            # Too large to hold back: the indented layout stays
+            self.undecided = []
+            self.raw = []
+            self.raw_size = 0
+
+    def _open_pending(self):
+        """A child node follows the pending start tag: write the tag for good."""
+        if self.pending is None:
+            return
+        self.out.append(self.pending + ">")
+        self.pending = None
+        if self.pending_blank:
+            self.undecided.append([self.taken + len(self.out), len(self.raw), self.depth])
+        else:
+            # Text next to a child: mixed content, written as is from here on
+            self.out.extend(self.pending_text)
+            self.inline_depth = 1
+        for piece in self.pending_text:
+            self._keep(piece)
+        self.pending_text = []
+        self.pending_blank = True
+
+    def _close_undecided(self):
+        if self.undecided and self.undecided[-1][2] == self.depth:
+            self.undecided.pop()
+            if not self.undecided:
+                self.raw = []
+                self.raw_size = 0
+
+    def _node(self, rendered: str):
+        """Write a comment, processing instruction or CDATA child."""
+        if not self.inline_depth:
+            self._open_pending()
+        self.empty = False
+        self._keep(rendered)
+        if self.inline_depth:
+            self.out.append(rendered)
+            return
+        self.out.append(self._line(self.depth))
+        self.out.append(rendered)
+
+    def take(self) -> str:
+        """Output that can no longer change, removed from out."""
+        end = self.undecided[0][0] - self.taken if self.undecided else len(self.out)
+        text = "".join(self.out[:end])
+        del self.out[:end]
+        self.taken += end
+        return text
+
+    # --- expat handlers ---
+
+    def xml_decl(self, version, encoding, standalone):
+        if self.started:
+            return
+        decl = f'<?xml version="{version or "1.0"}"'
+        if encoding:
+            decl += f' encoding="{encoding}"'
+        if standalone != -1:
+            decl += f' standalone="{"yes" if standalone else "no"}"'
+        self.declaration = decl + "?>"
+        self.out.append(self.declaration)
+
+    def start_doctype(self, name, system_id, public_id, has_internal_subset):
+        decl = f"<!DOCTYPE {name}"
+        if public_id:
+            decl += f' PUBLIC "{public_id}" "{system_id}"'
+        elif system_id:
+            decl += f' SYSTEM "{system_id}"'
+        self.doctype = [decl, []]
+
+    def default(self, data):
+        # Only called for what has no handler; kept inside the DOCTYPE's internal subset
+        if self.doctype is not None and data:
+            self.doctype[1].append(data)
+
+    def end_doctype(self):
+        decl, subset = self.doctype
+        self.doctype = None
+        subset = "".join(subset).strip()
+        if subset:
+            decl += f" [\n{subset}\n]"
+        self.out.append(self._line(0))
+        self.out.append(decl + ">")
+
+    def start_element(self, name, attributes):
+        tag = "<" + name
+        for i in range(0, len(attributes), 2):
+            tag += f' {attributes[i]}="{_escape_attr(attributes[i + 1])}"'
+        if not self.inline_depth:
+            self._open_pending()
+        self._keep(tag + ">")
+        self.empty = True
+        if self.inline_depth:
+            self.out.append(tag + ">")
+            self.inline_depth += 1
+            return
+        self.out.append(self._line(self.depth))
+        self.pending = tag
+        self.depth += 1
+
+    def end_element(self, name):
+        empty = self.empty
+        self.empty = False
+        if empty and self.raw:
+            self.raw[-1] = self.raw[-1][:-1] + "/>"
+        if self.inline_depth:
+            if empty:
+                self.out[-1] = self.out[-1][:-1] + "/>"
+            else:
+                self._keep(f"</{name}>")
+                self.out.append(f"</{name}>")
+            self.inline_depth -= 1
+            if self.inline_depth:
+                return
+            self.depth -= 1  # The mixed-content element itself closed
+            return
+        if self.pending is not None:
+            if self.pending_text:
+                # Text only, whitespace included: kept inline as written
+                self.out.append(self.pending + ">")
+                self.out.extend(self.pending_text)
+                self.out.append(f"</{name}>")
+            else:
+                self.out.append(self.pending + "/>")
+            for piece in self.pending_text:
+                self._keep(piece)
+            self.pending = None
+            self.pending_text = []
+            self.pending_blank = True
+        else:
+            self._close_undecided()
+            self.out.append(self._line(self.depth - 1))
+            self.out.append(f"</{name}>")
+        if not empty:
+            self._keep(f"</{name}>")
+        self.depth -= 1
+
+    def characters(self, data):
+        if self.in_cdata:
+            self.cdata.append(data)
+            return
+        self.empty = False
+        text = _escape_text(data)
+        if self.pending is not None and not self.inline_depth:
+            self.pending_text.append(text)
+            if self.pending_blank and not data.isspace():
+                self.pending_blank = False
+            return
+        self._keep(text)
+        if self.inline_depth:
+            self.out.append(text)
+        elif not data.isspace() and self.depth:
+            # Text after child elements: the element is mixed content after all.
+            # Its children are written again as they are, unless too large to hold back
+            # (then the text continues right after the last child).
+            if self.undecided and self.undecided[-1][2] == self.depth:
+                position, start, _ = self.undecided.pop()
+                del self.out[position - self.taken:]
+                self.out.extend(self.raw[start:])
+                if not self.undecided:
+                    self.raw = []
+                    self.raw_size = 0
+            else:
+                self.out.append(text)
+            self.inline_depth = 1
+
+    def start_cdata(self):
+        self.empty = False
+        self.in_cdata = True
+        self.cdata = []
+
+    def end_cdata(self):
+        self.in_cdata = False
+        rendered = "<![CDATA[" + "".join(self.cdata) + "]]>"
+        self.cdata = []
+        if self.pending is not None and not self.inline_depth:
+            self.pending_text.append(rendered)
+            self.pending_blank = False
+        else:
+            self._node(rendered)
+
+    def comment(self, data):
+        self._node(f"<!--{data}-->")
+
+    def processing_instruction(self, target, data):
+        self._node(f"<?{target} {data}?>" if data else f"<?{target}?>")
+
+
+def reformat(text: str, write: Callable[[str], None], indent: str = "  ", task=None):
+    """
+    Write text pretty-printed, in blocks, through write().
+
+    Raises:
+        xml.parsers.expat.ExpatError (with lineno and offset) for malformed XML
+    """
+    printer = _Printer(indent)
+    parser = xml.parsers.expat.ParserCreate()
+    parser.ordered_attributes = True
+    parser.specified_attributes = True  # Not the defaults a DTD adds
+    parser.buffer_text = True  # One characters() call per text node
+    parser.buffer_size = 65536
+    parser.XmlDeclHandler = printer.xml_decl
+    parser.StartDoctypeDeclHandler = printer.start_doctype
+    parser.EndDoctypeDeclHandler = printer.end_doctype
+    parser.DefaultHandlerExpand = printer.default
+    parser.StartElementHandler = printer.start_element
+    parser.EndElementHandler = printer.end_element
+    parser.CharacterDataHandler = printer.characters
+    parser.StartCdataSectionHandler = printer.start_cdata
+    parser.EndCdataSectionHandler = printer.end_cdata
+    parser.CommentHandler = printer.comment
+    parser.ProcessingInstructionHandler = printer.processing_instruction
+
+    total = max(len(text), 1)
+    for start in range(0, len(text), _CHUNK_SIZE):
+        if task:
+            task.check_cancelled()
+            task.report_progress(start / total)
+        parser.Parse(text[start:start + _CHUNK_SIZE], False)
+        done = printer.take()
+        if done:
+            write(done)
+    parser.Parse("", True)
+    done = printer.take()
+    if done:
+        write(done)
+
+
+def format_text(text: str, indent: str = "  ") -> str:
+    """reformat() into a string."""
+    parts = []
+    reformat(text, parts.append, indent)
+    return "".join(parts)
+
+
+if __name__ == "__main__":
+    # Benchmark against minidom: python -m zenpad.xml_stream [records]
+    import sys
+    import time
+    import xml.dom.minidom
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rows = "".join(f'<row id="{i}"><name>user {i}</name><score>{i * 7 % 100}</score><tags><tag>a</tag>'
+                   f'<tag>b</tag></tags><!-- row {i} --></row>' for i in range(count))
+    text = f'<?xml version="1.0"?><rows>{rows}</rows>'
+    print(f"{len(text) / 1e6:.1f} MB")
+
+    started = time.perf_counter()
+    pretty = xml.dom.minidom.parseString(text).toprettyxml(indent="  ")
+    expected = "\n".join(line for line in pretty.splitlines() if line.strip())
+    print(f"minidom: {time.perf_counter() - started:.2f}s")
+    started = time.perf_counter()
+    result = format_text(text)
+    same = result.split("\n", 1)[1] == expected.split("\n", 1)[1]  # The declaration is kept as written
+    print(f"reformat: {time.perf_counter() - started:.2f}s, same layout as minidom: {same}")